@@ -0,0 +1,55 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # scripts/
+sys.path.append(os.path.join(BASE_DIR, "..", "streamlit_app"))
+
+from scripts_app.artefatos import load_joblib  # noqa: E402
+from scripts_app.io_datasets import ler_dataset  # noqa: E402
+from scripts_app.preprocessamento import PipelineFeatures, preprocess_input  # noqa: E402
+
+ARTIFACTS_DIR = os.path.join(BASE_DIR, "..", "artifacts")
+SCALER_PATH = os.path.join(ARTIFACTS_DIR, "scaler", "standard_scaler_produtividade_estimada_story_points_previstos.pkl")
+ENCODER_PATH = os.path.join(ARTIFACTS_DIR, "encoder", "label_encoder_tipo_dominio.pkl")
+DATASET_PATH = os.path.join(BASE_DIR, "..", "datasets", "sprints_simuladas.parquet")
+
+
+def cronometrar(funcao, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara preprocess_input com o PipelineFeatures.")
+    parser.add_argument("--linhas", default="100000,1000000")
+    args = parser.parse_args()
+
+    scaler = load_joblib(SCALER_PATH)
+    label_encoder = load_joblib(ENCODER_PATH)
+    pipeline = PipelineFeatures(scaler, label_encoder)
+    base = ler_dataset(DATASET_PATH)
+    rng = np.random.default_rng(42)
+
+    print(f"{'linhas':>10} {'preprocess_input (s)':>21} {'pipeline (s)':>13} {'ganho':>7}")
+    for n in [int(v) for v in args.linhas.split(",")]:
+        data = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+
+        t_antigo, esperado = cronometrar(lambda: preprocess_input(data.copy(), scaler, label_encoder))
+        t_novo, (X, _) = cronometrar(lambda: pipeline.transform(data))
+
+        if not np.array_equal(esperado.to_numpy(dtype=np.float32), X):
+            raise SystemExit("❌ Matriz diferente da gerada por preprocess_input")
+
+        print(f"{n:>10} {t_antigo:>21.3f} {t_novo:>13.3f} {t_antigo / t_novo:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
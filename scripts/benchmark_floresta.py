@@ -0,0 +1,95 @@
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # scripts/
+sys.path.append(os.path.join(BASE_DIR, "..", "streamlit_app"))
+
+from scripts_app.floresta_compilada import LINHAS_SKLEARN, FlorestaCompilada  # noqa: E402
+from scripts_app.cache_matrizes import carregar_matriz  # noqa: E402
+
+MODEL_PATH = os.path.join(BASE_DIR, "..", "artifacts", "model", "agile_estimator.pkl")
+DATASET_PATH = os.path.join(BASE_DIR, "..", "datasets", "data_prepared_2.parquet")
+FEATURES_CACHE_DIR = os.path.join(BASE_DIR, "..", "artifacts", "cache", "features")
+
+
+# Matriz de features do modelo a partir do dataset preparado (mesma definição do app, em cache)
+def matriz_exemplo(path=DATASET_PATH):
+    X, _, _ = carregar_matriz(path, FEATURES_CACHE_DIR)
+    return np.array(X)
+
+
+def cronometrar(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara a floresta compilada com o predict do sklearn.")
+    parser.add_argument("--modelo", default=MODEL_PATH)
+    parser.add_argument("--linhas", default="1,1000,1000000",
+                        help="Tamanhos de lote separados por vírgula")
+    parser.add_argument("--sem-sklearn-acima", type=int, default=None,
+                        help="Pula o sklearn para lotes maiores que este valor")
+    args = parser.parse_args()
+
+    with open(args.modelo, "rb") as file:
+        model = pickle.load(file)
+
+    inicio = time.perf_counter()
+    floresta = FlorestaCompilada.compilar(model)
+    # A servida no app/CLI: arrays até LINHAS_SKLEARN linhas, sklearn acima disso
+    servida = floresta
+    print(f"Compilação: {time.perf_counter() - inicio:.2f}s "
+          f"({floresta.n_arvores} árvores, {len(floresta.feature)} nós, profundidade {floresta.profundidade})")
+
+    # Ida e volta pelo formato em arquivo, usando a versão mapeada em memória
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "agile_estimator.floresta")
+        floresta.salvar(caminho)
+        print(f"Arquivo compilado: {os.path.getsize(caminho) / 1e6:.1f} MB "
+              f"(pickle: {os.path.getsize(args.modelo) / 1e6:.1f} MB)")
+
+        inicio = time.perf_counter()
+        floresta = FlorestaCompilada.carregar(caminho)
+        print(f"Carga via mmap: {(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+        base = matriz_exemplo()
+        rng = np.random.default_rng(42)
+
+        # Conferência de equivalência com o sklearn
+        esperado = model.predict(base)
+        obtido = floresta.predict(base)
+        erro = np.abs(esperado - obtido).max()
+        print(f"Maior diferença para o sklearn: {erro:.2e}")
+        if not np.allclose(esperado, obtido, rtol=1e-5, atol=1e-6):
+            raise SystemExit("❌ Previsões divergem do sklearn")
+
+        print(f"\nServida: floresta compilada até {LINHAS_SKLEARN - 1:,} linhas, predict do sklearn a partir de {LINHAS_SKLEARN:,}")
+        print(f"\n{'linhas':>10} {'sklearn (s)':>12} {'compilada (s)':>14} {'servida (s)':>12} {'linhas/s':>12} {'ganho':>7}")
+        for n in [int(v) for v in args.linhas.split(",")]:
+            X = base[rng.integers(0, len(base), n)]
+            repeticoes = 5 if n <= 1000 else 1
+
+            t_compilada = cronometrar(lambda: floresta.predict(X), repeticoes)
+            t_servida = t_compilada if n < LINHAS_SKLEARN else cronometrar(lambda: servida.predict(X), repeticoes)
+            if args.sem_sklearn_acima is not None and n > args.sem_sklearn_acima:
+                t_sklearn = float("nan")
+            else:
+                t_sklearn = cronometrar(lambda: model.predict(X), repeticoes)
+
+            print(f"{n:>10} {t_sklearn:>12.4f} {t_compilada:>14.4f} {t_servida:>12.4f} "
+                  f"{n / t_servida:>12.0f} {t_sklearn / t_servida:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import argparse
+import csv
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from compactar_floresta import carregar_split_teste
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # scripts/
+RESULTADOS_PATH = os.path.join(BASE_DIR, "..", "datasets", "rf_halving_results.csv")
+
+# Mesmo espaço do notebook de treino (model_trainig_rf.ipynb); o número de
+# árvores deixa de ser um hiperparâmetro e passa a ser o orçamento das rodadas
+ESPACO = {
+    "max_depth": [7, 8],
+    "min_samples_leaf": [4, 5, 6],
+    "max_features": [20, 25, 30],
+    "ccp_alpha": [0.0005, 0.0009],
+}
+
+# Parâmetros fixos do notebook
+FIXOS = {
+    "bootstrap": True,
+    "max_samples": 0.8604699621260646,
+    "criterion": "friedman_mse",
+    "random_state": 1,
+}
+
+PARAMETROS = list(ESPACO)
+COLUNAS = (["rodada", "n_estimators"] + PARAMETROS
+           + ["MAE_oob", "RMSE_oob", "R2_oob", "MAE_test", "RMSE_test", "R2_test", "tempo_s"])
+
+
+# -------------------------------
+# Configurações
+# -------------------------------
+
+def configuracoes(espaco, n_features):
+    """
+    Combinações do espaço, com max_features limitado ao número de features
+    (acima disso o sklearn recusa o valor). Combinações que ficam iguais
+    depois do limite são avaliadas uma vez só.
+    """
+    vistas = []
+    for valores in product(*(espaco[nome] for nome in PARAMETROS)):
+        config = dict(zip(PARAMETROS, valores))
+        config["max_features"] = min(int(config["max_features"]), n_features)
+        if config not in vistas:
+            vistas.append(config)
+    return vistas
+
+
+def orcamentos(arvores_min, arvores_max, fator):
+    """Árvores por rodada: cresce `fator` vezes a cada rodada até `arvores_max`."""
+    rodadas = [arvores_min]
+    while rodadas[-1] < arvores_max:
+        rodadas.append(min(rodadas[-1] * fator, arvores_max))
+    return rodadas
+
+
+def chave(config):
+    return tuple(config[nome] for nome in PARAMETROS)
+
+
+# -------------------------------
+# Treino (um processo por configuração)
+# -------------------------------
+
+def _metricas(y, y_pred, sufixo):
+    return {
+        f"MAE_{sufixo}": mean_absolute_error(y, y_pred),
+        f"RMSE_{sufixo}": np.sqrt(mean_squared_error(y, y_pred)),
+        f"R2_{sufixo}": r2_score(y, y_pred),
+    }
+
+
+def avaliar_configuracao(config, n_estimators, modelo, X_train, y_train, X_test, y_test):
+    """
+    Cresce a floresta de `config` até `n_estimators` árvores e mede o erro
+    out-of-bag (sem ajustes extras de validação cruzada) e o erro no teste.
+    Com `modelo` da rodada anterior, só as árvores novas são treinadas
+    (warm_start); sem ele a floresta é treinada do zero, com as mesmas
+    árvores que o warm_start produziria (mesmo random_state).
+    """
+    inicio = time.perf_counter()
+    if modelo is None:
+        modelo = RandomForestRegressor(**config, **FIXOS, oob_score=True, warm_start=True, n_jobs=1)
+    modelo.set_params(n_estimators=n_estimators)
+    modelo.fit(X_train, y_train)
+
+    resultado = {"n_estimators": n_estimators, **config}
+    resultado.update(_metricas(y_train, modelo.oob_prediction_, "oob"))
+    resultado.update(_metricas(y_test, modelo.predict(X_test), "test"))
+    resultado["tempo_s"] = time.perf_counter() - inicio
+    return resultado, modelo
+
+
+# -------------------------------
+# Resultados (gravados linha a linha para retomar a busca)
+# -------------------------------
+
+def ler_resultados(caminho):
+    """Resultados já gravados, por (chave da configuração, n_estimators)."""
+    if not os.path.exists(caminho):
+        return {}
+    anteriores = pd.read_csv(caminho)
+    return {
+        (chave(linha), int(linha["n_estimators"])): linha
+        for linha in anteriores.to_dict("records")
+    }
+
+
+def gravar_resultado(caminho, linha):
+    novo = not os.path.exists(caminho)
+    with open(caminho, "a", newline="") as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=COLUNAS)
+        if novo:
+            escritor.writeheader()
+        escritor.writerow(linha)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+
+
+# -------------------------------
+# Successive halving
+# -------------------------------
+
+def busca_halving(X_train, y_train, X_test, y_test, espaco=ESPACO, arvores_min=150, arvores_max=1300,
+                  fator=3, processos=None, caminho=RESULTADOS_PATH):
+    """
+    Todas as configurações começam com `arvores_min` árvores; a cada rodada
+    só o melhor 1/`fator` (pelo MAE out-of-bag) segue, com `fator` vezes
+    mais árvores, até `arvores_max`. As configurações de uma rodada rodam em
+    paralelo e cada resultado vai para `caminho` assim que termina: rodando
+    de novo, o que já está no arquivo não é treinado outra vez.
+    """
+    X_train = np.asarray(X_train, dtype=np.float32)
+    X_test = np.asarray(X_test, dtype=np.float32)
+    y_train = np.asarray(y_train, dtype=np.float64)
+    y_test = np.asarray(y_test, dtype=np.float64)
+
+    vivas = configuracoes(espaco, X_train.shape[1])
+    rodadas = orcamentos(arvores_min, arvores_max, fator)
+    feitos = ler_resultados(caminho)
+    modelos = {}  # floresta de cada configuração viva, para crescer na próxima rodada
+    processos = processos or os.cpu_count() or 1
+
+    for rodada, n_estimators in enumerate(rodadas, start=1):
+        resultados = {}
+        pendentes = []
+        for config in vivas:
+            anterior = feitos.get((chave(config), n_estimators))
+            if anterior is not None:
+                resultados[chave(config)] = anterior
+            else:
+                pendentes.append(config)
+
+        print(f"Rodada {rodada}: {len(vivas)} configurações com {n_estimators} árvores "
+              f"({len(vivas) - len(pendentes)} já no arquivo)")
+
+        with ProcessPoolExecutor(max_workers=min(processos, max(len(pendentes), 1))) as executor:
+            futuros = {
+                executor.submit(avaliar_configuracao, config, n_estimators, modelos.pop(chave(config), None),
+                                X_train, y_train, X_test, y_test): config
+                for config in pendentes
+            }
+            for futuro in as_completed(futuros):
+                resultado, modelo = futuro.result()
+                resultado["rodada"] = rodada
+                gravar_resultado(caminho, resultado)
+                resultados[chave(futuros[futuro])] = resultado
+                modelos[chave(futuros[futuro])] = modelo
+                print(f"  {futuros[futuro]} -> MAE_oob {resultado['MAE_oob']:.4f} ({resultado['tempo_s']:.1f}s)")
+
+        # Ordem estável: empate no MAE mantém a ordem do espaço
+        vivas = sorted(vivas, key=lambda config: resultados[chave(config)]["MAE_oob"])
+        if rodada < len(rodadas):
+            vivas = vivas[:max(1, math.ceil(len(vivas) / fator))]
+            modelos = {chave(config): modelos[chave(config)] for config in vivas if chave(config) in modelos}
+
+    melhor = vivas[0]
+    return melhor, resultados[chave(melhor)]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Busca de hiperparâmetros da floresta com successive halving e erro out-of-bag."
+    )
+    parser.add_argument("--saida", default=RESULTADOS_PATH, help="CSV de resultados (retomado se já existir)")
+    parser.add_argument("--arvores-min", type=int, default=150)
+    parser.add_argument("--arvores-max", type=int, default=1300)
+    parser.add_argument("--fator", type=int, default=3, help="Fração (1/fator) que segue para a próxima rodada")
+    parser.add_argument("--processos", type=int, default=None)
+    args = parser.parse_args()
+
+    X_train, X_test, y_train, y_test = carregar_split_teste()
+
+    inicio = time.perf_counter()
+    melhor, resultado = busca_halving(
+        X_train, y_train, X_test, y_test, arvores_min=args.arvores_min, arvores_max=args.arvores_max,
+        fator=args.fator, processos=args.processos, caminho=args.saida,
+    )
+    print(f"\n✅ Melhor configuração: {melhor} com {int(resultado['n_estimators'])} árvores")
+    print(f"MAE OOB: {resultado['MAE_oob']:.4f} | MAE teste: {resultado['MAE_test']:.4f} | "
+          f"R² teste: {resultado['R2_test']:.3f} ({time.perf_counter() - inicio:.1f}s)")
+    print(f"Resultados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import argparse
+import copy
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # scripts/
+sys.path.append(os.path.join(BASE_DIR, "..", "streamlit_app"))
+
+from scripts_app.floresta_compilada import FlorestaCompilada  # noqa: E402
+from scripts_app.cache_matrizes import carregar_matriz  # noqa: E402
+from scripts_app.preprocessamento import FEATURES_MODELO  # noqa: E402
+
+MODEL_DIR = os.path.join(BASE_DIR, "..", "artifacts", "model")
+MODEL_PATH = os.path.join(MODEL_DIR, "agile_estimator.pkl")
+DATASET_PATH = os.path.join(BASE_DIR, "..", "datasets", "data_prepared_2.parquet")
+FEATURES_CACHE_DIR = os.path.join(BASE_DIR, "..", "artifacts", "cache", "features")
+
+
+# Reproduz o split de teste do notebook de treino (test_size=0.2, random_state=42)
+def carregar_split_teste(path=DATASET_PATH):
+    X, y, _ = carregar_matriz(path, FEATURES_CACHE_DIR)
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        pd.DataFrame(X, columns=FEATURES_MODELO), pd.Series(y, name="duracao_dias"), test_size=0.2, random_state=42
+    )
+    return X_train, X_test, y_train, y_test
+
+
+def selecao_gulosa(predicoes, y, tamanhos):
+    """
+    Seleção gulosa (forward) de árvores: a cada passo entra a árvore que mais
+    reduz o MAE da média do subconjunto. Retorna {tamanho: índices das árvores}.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    predicoes = predicoes.astype(np.float64)
+    disponiveis = np.ones(predicoes.shape[1], dtype=bool)
+    soma = np.zeros(len(y))
+    escolhidas = []
+    subconjuntos = {}
+
+    for k in range(1, max(tamanhos) + 1):
+        candidatas = (soma[:, None] + predicoes) / k
+        mae = np.abs(candidatas - y[:, None]).mean(axis=0)
+        mae[~disponiveis] = np.inf
+
+        melhor = int(np.argmin(mae))
+        escolhidas.append(melhor)
+        disponiveis[melhor] = False
+        soma += predicoes[:, melhor]
+
+        if k in tamanhos:
+            subconjuntos[k] = list(escolhidas)
+
+    return subconjuntos
+
+
+def subfloresta(model, indices):
+    """Cópia do RandomForestRegressor só com as árvores selecionadas."""
+    reduzido = copy.copy(model)
+    reduzido.estimators_ = [model.estimators_[i] for i in indices]
+    reduzido.n_estimators = len(indices)
+    return reduzido
+
+
+def destilar(model, X_train, max_depth=3, max_iter=300):
+    """Treina um único modelo boosting raso imitando as previsões da floresta."""
+    aluno = HistGradientBoostingRegressor(
+        max_depth=max_depth,
+        max_iter=max_iter,
+        learning_rate=0.1,
+        random_state=1,
+    )
+    aluno.fit(X_train, model.predict(X_train))
+    return aluno
+
+
+def latencia_ms(model, X, repeticoes=5):
+    """Melhor tempo de previsão em ms, usando a floresta compilada quando possível."""
+    if hasattr(model, "estimators_") and all(hasattr(e, "tree_") for e in model.estimators_):
+        model = FlorestaCompilada.compilar(model)
+
+    X = np.asarray(X, dtype=np.float32)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        model.predict(X)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos) * 1000
+
+
+def avaliar(nome, model, caminho, X_aval, y_aval, X_latencia):
+    y_pred = model.predict(np.asarray(X_aval, dtype=np.float32))
+    return {
+        "variante": nome,
+        "arquivo": os.path.basename(caminho),
+        "MAE": mean_absolute_error(y_aval, y_pred),
+        "RMSE": np.sqrt(mean_squared_error(y_aval, y_pred)),
+        "R2": r2_score(y_aval, y_pred),
+        "latencia_1_linha_ms": latencia_ms(model, X_latencia[:1]),
+        "latencia_1k_linhas_ms": latencia_ms(model, X_latencia[:1000]),
+        "tamanho_mb": os.path.getsize(caminho) / 1e6,
+    }
+
+
+def marcar_pareto(relatorio):
+    """Marca as variantes que nenhuma outra supera em MAE, latência e tamanho ao mesmo tempo."""
+    objetivos = relatorio[["MAE", "latencia_1k_linhas_ms", "tamanho_mb"]].to_numpy()
+    pareto = []
+    for i, linha in enumerate(objetivos):
+        dominada = np.any(np.all(objetivos <= linha, axis=1) & np.any(objetivos < linha, axis=1))
+        pareto.append(not dominada)
+    relatorio["pareto"] = pareto
+    return relatorio
+
+
+def salvar_modelo(model, caminho):
+    with open(caminho, "wb") as file:
+        pickle.dump(model, file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera variantes compactas do modelo e um relatório de Pareto.")
+    parser.add_argument("--modelo", default=MODEL_PATH)
+    parser.add_argument("--saida", default=MODEL_DIR, help="Pasta onde as variantes são salvas")
+    parser.add_argument("--tamanhos", default="10,25,50,100,200,400",
+                        help="Quantidades de árvores a manter, separadas por vírgula")
+    parser.add_argument("--destilar", action="store_true",
+                        help="Também gera um modelo boosting raso destilado da floresta")
+    args = parser.parse_args()
+
+    with open(args.modelo, "rb") as file:
+        model = pickle.load(file)
+
+    X_train, X_test, y_train, y_test = carregar_split_teste()
+
+    # Metade do teste escolhe as árvores, a outra metade mede o resultado
+    X_sel, X_aval, y_sel, y_aval = train_test_split(X_test, y_test, test_size=0.5, random_state=42)
+
+    tamanhos = sorted(int(t) for t in args.tamanhos.split(",") if int(t) < len(model.estimators_))
+    floresta = FlorestaCompilada.compilar(model)
+
+    inicio = time.perf_counter()
+    subconjuntos = selecao_gulosa(floresta.predicoes_arvores(X_sel), y_sel, tamanhos)
+    print(f"Seleção gulosa: {time.perf_counter() - inicio:.1f}s")
+
+    X_latencia = X_train.to_numpy(dtype=np.float32)[np.random.default_rng(42).integers(0, len(X_train), 1000)]
+    nome_base = os.path.splitext(os.path.basename(args.modelo))[0]
+    os.makedirs(args.saida, exist_ok=True)
+
+    linhas = [avaliar("completo", model, args.modelo, X_aval, y_aval, X_latencia)]
+
+    for k, indices in subconjuntos.items():
+        caminho = os.path.join(args.saida, f"{nome_base}_arvores{k}.pkl")
+        reduzido = subfloresta(model, indices)
+        salvar_modelo(reduzido, caminho)
+        linhas.append(avaliar(f"{k} árvores", reduzido, caminho, X_aval, y_aval, X_latencia))
+
+    if args.destilar:
+        caminho = os.path.join(args.saida, f"{nome_base}_destilado.pkl")
+        aluno = destilar(model, X_train.to_numpy(dtype=np.float32))
+        salvar_modelo(aluno, caminho)
+        linhas.append(avaliar("destilado (boosting raso)", aluno, caminho, X_aval, y_aval, X_latencia))
+
+    relatorio = marcar_pareto(pd.DataFrame(linhas))
+    caminho_relatorio = os.path.join(args.saida, f"{nome_base}_compactacao.csv")
+    relatorio.to_csv(caminho_relatorio, index=False)
+
+    print(relatorio.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print(f"\n✅ Relatório salvo em {caminho_relatorio}")
+    print("Para servir uma variante no app: AGILE_ESTIMATOR_MODELO=<arquivo .pkl> streamlit run streamlit_app/app.py")
+
+
+if __name__ == "__main__":
+    main()
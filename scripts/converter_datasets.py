@@ -0,0 +1,33 @@
+import argparse
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # scripts/
+sys.path.append(os.path.join(BASE_DIR, "..", "streamlit_app"))
+
+from scripts_app.io_datasets import exportar_excel, gravar_parquet, ler_tabela, para_pandas  # noqa: E402
+
+DATASETS_DIR = os.path.join(BASE_DIR, "..", "datasets")
+PADRAO = ["sprints_simuladas.csv", "data_prepared.csv", "data_prepared_2.csv", "dataset_sprints_agile_estimator.csv"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Converte os CSVs de datasets/ para Parquet tipado.")
+    parser.add_argument("arquivos", nargs="*", default=[os.path.join(DATASETS_DIR, nome) for nome in PADRAO])
+    parser.add_argument("--particoes", default=None, help="Colunas de partição separadas por vírgula (gera uma pasta)")
+    parser.add_argument("--excel", action="store_true", help="Exporta também um .xlsx de cada arquivo")
+    args = parser.parse_args()
+
+    particoes = args.particoes.split(",") if args.particoes else None
+    for caminho in args.arquivos:
+        tabela = ler_tabela(caminho)
+        base, _ = os.path.splitext(caminho)
+        destino = base if particoes else f"{base}.parquet"
+        gravar_parquet(tabela, destino, particoes=particoes)
+        print(f"✅ {caminho} -> {destino} ({tabela.num_rows:,} linhas)")
+        if args.excel:
+            exportar_excel(para_pandas(tabela), f"{base}.xlsx")
+
+
+if __name__ == "__main__":
+    main()
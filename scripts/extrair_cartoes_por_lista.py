@@ -1,105 +1,170 @@
-import os
-from dotenv import load_dotenv
-import requests
-import pandas as pd
-
-def get_trello_cards(url: str) -> pd.DataFrame:
-    # Carrega variáveis do .env
-    load_dotenv()
-
-    TRELLO_KEY = os.getenv("TRELLO_KEY")
-    TRELLO_TOKEN = os.getenv("TRELLO_TOKEN")
-    BOARD_ID = os.getenv("BOARD_ID")  
-
-    params = {
-        "key": TRELLO_KEY,
-        "token": TRELLO_TOKEN
-    }
-
-    try:
-        # 1. Mapear campos customizados
-        custom_fields_url = f"https://api.trello.com/1/boards/{BOARD_ID}/customFields"
-        custom_fields_response = requests.get(custom_fields_url, params=params)
-        custom_fields_mapping = {}
-
-        if custom_fields_response.status_code == 200:
-            for field in custom_fields_response.json():
-                custom_fields_mapping[field["id"]] = field["name"]
-        else:
-            print("⚠️ Falha ao obter campos customizados do board")
-
-        # 2. Obter listas do board
-        lists_url = f"https://api.trello.com/1/boards/{BOARD_ID}/lists"
-        lists_response = requests.get(lists_url, params=params)
-        lists_response.raise_for_status()
-
-        listas = lists_response.json()
-        all_cards = []
-
-        for lista in listas:
-            list_id = lista["id"]
-            list_name = lista["name"]
-
-            # 3. Buscar cards da lista
-            cards_url = f"https://api.trello.com/1/lists/{list_id}/cards"
-            cards_params = {
-                "key": TRELLO_KEY,
-                "token": TRELLO_TOKEN,
-                "fields": "id,name,url,due,labels",
-                "members": "true",
-                "member_fields": "id,username,fullName",
-                "customFieldItems": "true",
-                "actions": "commentCard",
-                "actions_limit": 100
-            }
-
-            cards_response = requests.get(cards_url, params=cards_params)
-            if cards_response.status_code != 200:
-                continue
-
-            for card in cards_response.json():
-                card_data = {
-                    "list_id": list_id,
-                    "list_name": list_name,
-                    "card_id": card.get("id"),
-                    "card_name": card.get("name"),
-                    "card_url": card.get("url"),
-                    "card_due": card.get("due"),
-                    "card_labels": ", ".join([label["name"] for label in card.get("labels", [])]),
-                    "card_members": ", ".join([member["fullName"] for member in card.get("members", [])]),
-                }
-
-                # Campos customizados ['produtividade_estimada','tipo_dominio', 'complexidade_media', 'qtd_bugs', 'qtd_retrabalho','carga_cartoes_por_membro']
-
-                for cfi in card.get("customFieldItems", []):
-                    field_id = cfi.get("idCustomField")
-                    field_name = custom_fields_mapping.get(field_id, f"custom_{field_id}")
-                    value = cfi.get("value")
-                    id_value = cfi.get("idValue")
-                    value_final = None
-
-                    if value:
-                        value_final = list(value.values())[0]  # pode ser texto, número, etc.
-                    elif id_value:
-                        value_final = id_value
-
-                    card_data[f"custom_{field_name}"] = value_final
-
-                # Comentários (actions)
-                actions = card.get("actions", [])
-                card_data["card_comments"] = " | ".join(
-                    [action["data"]["text"] for action in actions if "data" in action and "text" in action["data"]]
-                )
-
-
-                all_cards.append(card_data)
-
-        # 4. Criar DataFrame e salvar CSV
-        df = pd.DataFrame(all_cards)
-        df.to_csv("cartoes_por_lista.csv", index=False, encoding="utf-8-sig")
-        print("✅ Arquivo 'cartoes_por_lista.csv' gerado com sucesso!")
-
-    except requests.exceptions.RequestException as err:
-        print(f"❌ Erro na requisição: {err}")
-    except Exception as e:
-        print(f"❌ Erro inesperado: {e}")
+import csv
+import os
+from dotenv import load_dotenv
+import requests
+import pandas as pd
+
+from trello_client import TRELLO_API, ClienteTrello
+from trello_store import STORE_PATH, conectar, ler_cartoes, ler_comentarios, sincronizar_board
+
+LIMITE_COMENTARIOS = 100  # comentários que vêm junto com cada card
+LIMITE_PAGINA_COMENTARIOS = 1000  # máximo do Trello por página de actions
+
+CARDS_PARAMS = {
+    "fields": "id,name,url,due,labels",
+    "members": "true",
+    "member_fields": "id,username,fullName",
+    "customFieldItems": "true",
+    "actions": "commentCard",
+    "actions_limit": LIMITE_COMENTARIOS
+}
+
+COMENTARIOS_CSV = "comentarios_por_cartao.csv"
+COLUNAS_COMENTARIOS = ["card_id", "comment_id", "comment_date", "comment_member", "comment_text"]
+
+
+def registros_cartoes(lista, cards, custom_fields_mapping):
+    """Converte os cards de uma lista em registros planos (um dict por card)."""
+    registros = []
+
+    for card in cards:
+        card_data = {
+            "list_id": lista["id"],
+            "list_name": lista["name"],
+            "card_id": card.get("id"),
+            "card_name": card.get("name"),
+            "card_url": card.get("url"),
+            "card_due": card.get("due"),
+            "card_labels": ", ".join([label["name"] for label in card.get("labels", [])]),
+            "card_members": ", ".join([member["fullName"] for member in card.get("members", [])]),
+        }
+
+        # Campos customizados ['produtividade_estimada','tipo_dominio', 'complexidade_media', 'qtd_bugs', 'qtd_retrabalho','carga_cartoes_por_membro']
+
+        for cfi in card.get("customFieldItems", []):
+            field_id = cfi.get("idCustomField")
+            field_name = custom_fields_mapping.get(field_id, f"custom_{field_id}")
+            value = cfi.get("value")
+            id_value = cfi.get("idValue")
+            value_final = None
+
+            if value:
+                value_final = list(value.values())[0]  # pode ser texto, número, etc.
+            elif id_value:
+                value_final = id_value
+
+            card_data[f"custom_{field_name}"] = value_final
+
+        # Comentários vão para o arquivo próprio; aqui fica só a contagem
+        card_data["qtd_comentarios"] = len(card.get("actions", []))
+
+        registros.append(card_data)
+
+    return registros
+
+
+def registros_comentarios(card_id, actions):
+    """Uma linha por comentário (action commentCard) do card."""
+    return [{
+        "card_id": card_id,
+        "comment_id": action.get("id"),
+        "comment_date": action.get("date"),
+        "comment_member": action.get("memberCreator", {}).get("fullName"),
+        "comment_text": action["data"]["text"],
+    } for action in actions if "data" in action and "text" in action["data"]]
+
+
+def get_trello_cards(url: str, max_workers: int = 8, base_url: str = TRELLO_API,
+                     store_path: str = STORE_PATH) -> pd.DataFrame:
+    """
+    Extrai os cards de todas as listas do board (BOARD_ID do .env).
+    Por padrão sincroniza o board na base local (`store_path`, ver
+    trello_store.py) — só o que mudou desde a última execução é baixado — e
+    lê os cards de lá. Com `store_path=None` baixa o board inteiro: os GETs
+    são agrupados em chamadas /1/batch (10 por chamada, `max_workers` em
+    paralelo) por um cliente com pool de conexões, limitador de taxa e novas
+    tentativas em 429/5xx.
+    `base_url` permite apontar para um servidor local
+    (scripts/servidor_trello_local.py).
+
+    Os comentários são gravados em 'comentarios_por_cartao.csv', uma linha por
+    comentário, à medida que chegam; o histórico é completo (cards com mais de
+    LIMITE_COMENTARIOS comentários são paginados com `before`).
+    """
+    # Carrega variáveis do .env
+    load_dotenv()
+
+    TRELLO_KEY = os.getenv("TRELLO_KEY")
+    TRELLO_TOKEN = os.getenv("TRELLO_TOKEN")
+    BOARD_ID = os.getenv("BOARD_ID")
+
+    cliente = ClienteTrello(TRELLO_KEY, TRELLO_TOKEN, base_url=base_url, max_conexoes=max_workers)
+
+    try:
+        if store_path:
+            conn = conectar(store_path)
+            try:
+                resumo = sincronizar_board(conn, cliente, BOARD_ID, max_workers=max_workers)
+                print(f"🔄 Sincronização {resumo['modo']}: {resumo['acoes']} actions, {resumo['cards']} cards")
+                df = ler_cartoes(conn, BOARD_ID)
+                pd.DataFrame(columns=COLUNAS_COMENTARIOS).to_csv(COMENTARIOS_CSV, index=False, encoding="utf-8-sig")
+                for bloco in ler_comentarios(conn, BOARD_ID):
+                    bloco.to_csv(COMENTARIOS_CSV, mode="a", header=False, index=False, encoding="utf-8")
+            finally:
+                conn.close()
+            df.to_csv("cartoes_por_lista.csv", index=False, encoding="utf-8-sig")
+            print("✅ Arquivo 'cartoes_por_lista.csv' gerado com sucesso!")
+            return df
+
+        with open(COMENTARIOS_CSV, "w", newline="", encoding="utf-8-sig") as arquivo_comentarios:
+            comentarios = csv.DictWriter(arquivo_comentarios, fieldnames=COLUNAS_COMENTARIOS)
+            comentarios.writeheader()
+
+            # 1. Mapear campos customizados e 2. obter listas do board (numa chamada /1/batch)
+            campos, listas = cliente.get_varios([
+                (f"boards/{BOARD_ID}/customFields", {}),
+                (f"boards/{BOARD_ID}/lists", {}),
+            ])
+            custom_fields_mapping = {field["id"]: field["name"] for field in campos}
+
+            # 3. Buscar cards de todas as listas, 10 listas por chamada /1/batch
+            all_cards, pendentes = [], {}
+            requisicoes = [(f"lists/{lista['id']}/cards", CARDS_PARAMS) for lista in listas]
+            for indice, cards in cliente.iterar_varios(requisicoes, max_workers):
+                all_cards.extend(registros_cartoes(listas[indice], cards, custom_fields_mapping))
+                for card in cards:
+                    actions = card.get("actions", [])
+                    comentarios.writerows(registros_comentarios(card["id"], actions))
+                    if len(actions) >= LIMITE_COMENTARIOS:
+                        pendentes[card["id"]] = actions[-1]["id"]
+
+            # 4. Paginar (cursor `before`) os cards que atingiram o limite de comentários
+            total_por_card = {}
+            while pendentes:
+                ids = list(pendentes)
+                requisicoes = [(f"cards/{card_id}/actions", {
+                    "filter": "commentCard", "before": pendentes[card_id], "limit": LIMITE_PAGINA_COMENTARIOS,
+                }) for card_id in ids]
+                proximos = {}
+                for indice, actions in cliente.iterar_varios(requisicoes, max_workers):
+                    card_id = ids[indice]
+                    comentarios.writerows(registros_comentarios(card_id, actions))
+                    total_por_card[card_id] = total_por_card.get(card_id, 0) + len(actions)
+                    if len(actions) >= LIMITE_PAGINA_COMENTARIOS:
+                        proximos[card_id] = actions[-1]["id"]
+                pendentes = proximos
+
+        # 5. Criar DataFrame e salvar CSV
+        for registro in all_cards:
+            registro["qtd_comentarios"] += total_por_card.get(registro["card_id"], 0)
+        df = pd.DataFrame(all_cards)
+        df.to_csv("cartoes_por_lista.csv", index=False, encoding="utf-8-sig")
+        print("✅ Arquivo 'cartoes_por_lista.csv' gerado com sucesso!")
+        return df
+
+    except requests.exceptions.RequestException as err:
+        print(f"❌ Erro na requisição: {err}")
+    except Exception as e:
+        print(f"❌ Erro inesperado: {e}")
+    finally:
+        cliente.close()
@@ -1,68 +1,196 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
-
-# Lê o CSV
-df = pd.read_csv("sprints_simuladas.csv")
-
-print(df.columns.tolist())
-
-with PdfPages("apresentacao_sprints.pdf") as pdf:
-
-    # Dimensionamento das figuras
-    fig, ax = plt.subplots(figsize=(18, 5))  
-    ax.axis('tight')
-    ax.axis('off')
-
-    tabela = ax.table(
-        cellText=df.head(10).values,
-        colLabels=df.columns,
-        cellLoc='center',
-        loc='center'
-    )
-
-    tabela.auto_set_font_size(False)
-    tabela.set_fontsize(9)
-    tabela.scale(2.0, 1.7)
-
-    # Ajustar largura de colunas manualmente (fração do total)
-    col_widths = [0.1, 0.11, 0.11, 0.07, 0.07, 0.09, 0.09, 0.11, 0.11, 0.09, 0.09, 0.09, 0.11, 0.11, 0.13]
-    for i, width in enumerate(col_widths):
-        for key, cell in tabela.get_celld().items():
-            if key[1] == i:
-                cell.set_width(width)
-
-    fig.suptitle("Preview das 10 primeiras sprints", fontsize=16, fontweight='bold', y=0.95)
-
-    # Garantie que o bbox seja tight pra evitar cortes laterais
-    pdf.savefig(fig, bbox_inches='tight')
-    plt.close(fig)
-
-    # Gráfico 1 > story_points_previstos × entregues
-    fig, ax = plt.subplots(figsize=(8, 6))
-    ax.scatter(df["story_points_previstos"], df["story_points_entregues"], c='blue')
-    ax.set_xlabel("Story Points Previstos")
-    ax.set_ylabel("Story Points Entregues")
-    ax.set_title("Dispersão: Story Points Previstos × Entregues")
-    pdf.savefig(fig)
-    plt.close(fig)
-
-    #Gráfico 2 > complexidade × percentual de retrabalho
-    fig, ax = plt.subplots(figsize=(8, 6))
-    ax.scatter(df["complexidade_media"], df["percentual_retrabalho"], c='green')
-    ax.set_xlabel("Complexidade Média")
-    ax.set_ylabel("Percentual de Retrabalho")
-    ax.set_title("Dispersão: Complexidade Média × Percentual de Retrabalho")
-    pdf.savefig(fig)
-    plt.close(fig)
-
-    #Gráfico 3 > velocidade_passada × produtividade_estimada
-    fig, ax = plt.subplots(figsize=(8, 6))
-    ax.scatter(df["velocidade_passada"], df["produtividade_estimada"], c='red')
-    ax.set_xlabel("Velocidade Passada")
-    ax.set_ylabel("Produtividade Estimada")
-    ax.set_title("Dispersão: Velocidade Passada × Produtividade Estimada")
-    pdf.savefig(fig)
-    plt.close(fig)
-
-print("✅ PDF com preview e gráficos gerado: apresentacao_sprints.pdf")
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+from matplotlib.backends.backend_pdf import PdfPages  # noqa: E402
+from matplotlib.colors import LogNorm  # noqa: E402
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # scripts/
+sys.path.append(os.path.join(BASE_DIR, "..", "streamlit_app"))
+
+from scripts_app.io_datasets import ler_dataset  # noqa: E402
+
+DATASET_PATH = os.path.join(BASE_DIR, "..", "datasets", "sprints_simuladas.parquet")
+
+# Acima disso a dispersão vira densidade (histograma 2D calculado com numpy)
+LIMITE_PONTOS = 2000
+BINS_DENSIDADE = 60
+
+# Largura de cada coluna do preview (fração do total), na ordem do dataset de sprints
+LARGURAS_PREVIEW = [0.1, 0.11, 0.11, 0.07, 0.07, 0.09, 0.09, 0.11, 0.11, 0.09, 0.09, 0.09, 0.11, 0.11, 0.13]
+
+
+# -------------------------------
+# Páginas
+# -------------------------------
+# Cada página tem duas etapas: `preparar(df)` roda no processo principal e
+# reduz o DataFrame ao que o desenho precisa (10 linhas, contagens por bin,
+# ...); `desenhar(dados)` recebe só esse resumo e monta a figura, então pode
+# rodar em outro processo sem copiar o dataset inteiro. Para um gráfico novo
+# basta uma classe com esses dois métodos.
+
+class Tabela:
+
+    def __init__(self, titulo="Preview das 10 primeiras sprints", linhas=10, larguras=LARGURAS_PREVIEW):
+        self.titulo = titulo
+        self.linhas = linhas
+        self.larguras = larguras
+
+    def preparar(self, df):
+        larguras = self.larguras
+        if larguras is None or len(larguras) != len(df.columns):
+            larguras = [1.5 / len(df.columns)] * len(df.columns)
+        return {
+            "titulo": self.titulo,
+            "valores": df.head(self.linhas).astype(str).values,
+            "colunas": list(df.columns),
+            "larguras": larguras,
+        }
+
+    @staticmethod
+    def desenhar(dados):
+        fig, ax = plt.subplots(figsize=(18, 5))
+        ax.axis('tight')
+        ax.axis('off')
+
+        tabela = ax.table(cellText=dados["valores"], colLabels=dados["colunas"], cellLoc='center', loc='center')
+        tabela.auto_set_font_size(False)
+        tabela.set_fontsize(9)
+        tabela.scale(2.0, 1.7)
+
+        # Uma passada pelas células: cada uma recebe a largura da sua coluna
+        for (_, coluna), celula in tabela.get_celld().items():
+            celula.set_width(dados["larguras"][coluna])
+
+        fig.suptitle(dados["titulo"], fontsize=16, fontweight='bold', y=0.95)
+        # Bbox tight pra evitar cortes laterais
+        return fig, {"bbox_inches": "tight"}
+
+
+class Dispersao:
+
+    def __init__(self, x, y, titulo, rotulo_x, rotulo_y, cor="blue", limite_pontos=LIMITE_PONTOS, bins=BINS_DENSIDADE):
+        self.x = x
+        self.y = y
+        self.titulo = titulo
+        self.rotulo_x = rotulo_x
+        self.rotulo_y = rotulo_y
+        self.cor = cor
+        self.limite_pontos = limite_pontos
+        self.bins = bins
+
+    def preparar(self, df):
+        x = df[self.x].to_numpy(dtype=np.float64)
+        y = df[self.y].to_numpy(dtype=np.float64)
+        validos = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[validos], y[validos]
+        dados = {"titulo": self.titulo, "rotulo_x": self.rotulo_x, "rotulo_y": self.rotulo_y, "cor": self.cor}
+
+        if len(x) <= self.limite_pontos:
+            dados.update(modo="pontos", x=x, y=y)
+        else:
+            # Muitos pontos viram uma mancha: desenha a contagem por célula
+            contagens, bordas_x, bordas_y = np.histogram2d(x, y, bins=self.bins)
+            dados.update(modo="densidade", contagens=contagens, bordas_x=bordas_x, bordas_y=bordas_y, n=len(x))
+        return dados
+
+    @staticmethod
+    def desenhar(dados):
+        fig, ax = plt.subplots(figsize=(8, 6))
+        if dados["modo"] == "pontos":
+            ax.scatter(dados["x"], dados["y"], c=dados["cor"])
+            titulo = dados["titulo"]
+        else:
+            contagens = np.ma.masked_equal(dados["contagens"].T, 0)
+            malha = ax.pcolormesh(dados["bordas_x"], dados["bordas_y"], contagens, cmap="viridis",
+                                  norm=LogNorm(vmin=1, vmax=max(contagens.max(), 1)))
+            fig.colorbar(malha, ax=ax, label="Sprints por célula")
+            titulo = f"{dados['titulo']} ({dados['n']:,} sprints)"
+        ax.set_xlabel(dados["rotulo_x"])
+        ax.set_ylabel(dados["rotulo_y"])
+        ax.set_title(titulo)
+        return fig, {}
+
+
+PAGINAS_PADRAO = [
+    Tabela(),
+    Dispersao("story_points_previstos", "story_points_entregues", "Dispersão: Story Points Previstos × Entregues",
+              "Story Points Previstos", "Story Points Entregues", cor="blue"),
+    Dispersao("complexidade_media", "percentual_retrabalho", "Dispersão: Complexidade Média × Percentual de Retrabalho",
+              "Complexidade Média", "Percentual de Retrabalho", cor="green"),
+    Dispersao("velocidade_passada", "produtividade_estimada", "Dispersão: Velocidade Passada × Produtividade Estimada",
+              "Velocidade Passada", "Produtividade Estimada", cor="red"),
+]
+
+
+# -------------------------------
+# Montagem do PDF
+# -------------------------------
+
+def _renderizar(desenhar, dados):
+    """Desenha uma página e devolve o PDF dela (bytes)."""
+    fig, opcoes = desenhar(dados)
+    saida = io.BytesIO()
+    fig.savefig(saida, format="pdf", **opcoes)
+    plt.close(fig)
+    return saida.getvalue()
+
+
+def gerar_relatorio(df, paginas=PAGINAS_PADRAO, caminho="apresentacao_sprints.pdf", processos=None):
+    """
+    Gera o PDF com uma página por item de `paginas`. As páginas são desenhadas
+    em paralelo (um processo por página, até `processos`) e unidas na ordem
+    com o pypdf; sem o pypdf, ou com processos=1, são desenhadas aqui mesmo,
+    uma após a outra.
+    """
+    resumos = [(type(pagina).desenhar, pagina.preparar(df)) for pagina in paginas]
+
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        PdfWriter = None
+
+    processos = processos or min(len(resumos), os.cpu_count() or 1)
+    if PdfWriter is None or processos == 1:
+        with PdfPages(caminho) as pdf:
+            for desenhar, dados in resumos:
+                fig, opcoes = desenhar(dados)
+                pdf.savefig(fig, **opcoes)
+                plt.close(fig)
+        return caminho
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        pdfs = list(executor.map(_renderizar, *zip(*resumos)))
+
+    escritor = PdfWriter()
+    for conteudo in pdfs:
+        escritor.append(io.BytesIO(conteudo))
+    with open(caminho, "wb") as arquivo:
+        escritor.write(arquivo)
+    return caminho
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera a apresentação PDF (preview + gráficos) das sprints.")
+    parser.add_argument("entrada", nargs="?", default=DATASET_PATH, help="Dataset de sprints (.parquet, pasta ou .csv)")
+    parser.add_argument("--saida", default="apresentacao_sprints.pdf")
+    parser.add_argument("--processos", type=int, default=None)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    df = ler_dataset(args.entrada)
+    print(df.columns.tolist())
+
+    gerar_relatorio(df, caminho=args.saida, processos=args.processos)
+    print(f"✅ PDF com preview e gráficos gerado: {args.saida} ({len(df):,} sprints, {time.perf_counter() - inicio:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,19 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
 import pandas as pd
 import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import timedelta, date
-from openpyxl.styles import Font
-from openpyxl.utils import get_column_letter
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # scripts/
+sys.path.append(os.path.join(BASE_DIR, "..", "streamlit_app"))
+
+from scripts_app.io_datasets import exportar_excel, gravar_dataset  # noqa: E402
+
+DOMINIOS = ["Web", "Mobile", "API", "Dados"]
 
 # Gera o intervalo de datas para uma sprint de duração fixa
 def gerar_datas_sprint(inicio, duracao_dias=14):
@@ -56,7 +67,7 @@ def gerar_sprint(sprint_num, data_inicio, duracao_min=10, duracao_max=21):
         "produtividade_estimada": produtividade
     }
 
-# Função principal que gera N sprints e salva os dados em .csv e .xlsx
+# Função principal que gera N sprints e salva os dados em .parquet/.csv (pela extensão) e .xlsx
 def gerar_dataset_sprints(qtd_sprints=5, path_csv="sprints_simuladas.csv", path_excel="sprints_formatadas.xlsx"):
     dados = []
     data_base = date(2025, 1, 1)
@@ -71,23 +82,143 @@ def gerar_dataset_sprints(qtd_sprints=5, path_csv="sprints_simuladas.csv", path_
     # Cria o DataFrame com os dados
     df = pd.DataFrame(dados)
 
-    # Salva em CSV (sem formatação)
-    df.to_csv(path_csv, index=False)
+    # Salva no esquema tipado (Parquet) ou em CSV, conforme a extensão
+    gravar_dataset(df, path_csv)
 
-    # Salva em Excel com formatação de cabeçalhos
-    with pd.ExcelWriter(path_excel, engine="openpyxl") as writer:
-        df.to_excel(writer, sheet_name="Sprints", index=False)
-        sheet = writer.sheets["Sprints"]
-
-        # Aplica negrito no cabeçalho
-        for col_num, column_title in enumerate(df.columns, 1):
-            cell = sheet[f"{get_column_letter(col_num)}1"]
-            cell.font = Font(bold=True)
+    # Excel (opcional) com cabeçalho em negrito, gravado linha a linha
+    if path_excel:
+        exportar_excel(df, path_excel)
 
     print(f"Arquivos gerados com sucesso:")
-    print(f"   - sprints_simuladas.csv (sem formatação)")
-    print(f"   - sprints_formatadas.xlsx (com formatação)")
+    print(f"   - {path_csv}")
+    if path_excel:
+        print(f"   - {path_excel} (com formatação)")
+
+# -------------------------------
+# Modo vetorizado (milhões de sprints)
+# -------------------------------
+# Mesmas distribuições e correlações de gerar_sprint, mas cada coluna é
+# sorteada de uma vez com numpy. A saída é dividida em blocos de tamanho fixo;
+# cada bloco tem duas sequências de sementes independentes (SeedSequence.spawn):
+# uma para as durações e outra para as demais colunas. As durações de todos os
+# blocos são sorteadas primeiro (só elas) para encadear as datas: o início de
+# cada bloco é a soma acumulada das durações anteriores. Depois cada processo
+# gera o seu bloco e grava direto no disco. Para a mesma semente e o mesmo
+# tamanho de bloco o resultado é idêntico, com qualquer número de processos.
+
+def _sementes_blocos(seed, qtd_blocos):
+    return [filho.spawn(2) for filho in np.random.SeedSequence(seed).spawn(qtd_blocos)]
+
+
+def _duracoes(semente, qtd, duracao_min, duracao_max):
+    return np.random.default_rng(semente).integers(duracao_min, duracao_max + 1, size=qtd)
+
+
+def gerar_bloco_sprints(primeiro_num, qtd, inicio, semente_colunas, semente_duracao,
+                        duracao_min=10, duracao_max=21):
+    """
+    Gera `qtd` sprints numeradas a partir de `primeiro_num`, a primeira
+    começando em `inicio` (date). Retorna um DataFrame com as colunas de gerar_sprint.
+    """
+    rng = np.random.default_rng(semente_colunas)
+    duracao_dias = _duracoes(semente_duracao, qtd, duracao_min, duracao_max)
+
+    # Cada sprint começa no dia seguinte ao fim da anterior
+    deslocamento = np.concatenate([[0], np.cumsum(duracao_dias[:-1] + 1)])
+    data_ini = np.datetime64(inicio, "D") + deslocamento
+    data_fim = data_ini + duracao_dias
+
+    qtd_membros = rng.integers(3, 8, size=qtd)
+
+    # Story points correlacionados com a duração da sprint
+    base_story_points = rng.integers(5, 11, size=qtd)  # ponto por membro por dia
+    story_points_prev = base_story_points * duracao_dias * qtd_membros
+    story_points_entregue = np.floor(story_points_prev * rng.uniform(0.7, 1.0, size=qtd)).astype(np.int64)
+
+    cartoes_prev = rng.integers(20, 51, size=qtd)
+    cartoes_entregue = np.floor(cartoes_prev * rng.uniform(0.7, 1.0, size=qtd)).astype(np.int64)
+
+    tipo_dominio = np.array(DOMINIOS)[rng.integers(0, len(DOMINIOS), size=qtd)]
+    complexidade = np.round(rng.uniform(1.5, 4.5, size=qtd), 1)
+
+    # Bugs e retrabalho aumentam levemente com a complexidade
+    percentual_bugs = np.round(rng.uniform(0.05, 0.25, size=qtd) + 0.02 * (complexidade - 2.5), 2)
+    percentual_retrabalho = np.round(rng.uniform(0.05, 0.2, size=qtd) + 0.02 * (complexidade - 2.5), 2)
+
+    velocidade_passada = np.round(rng.uniform(30, 70, size=qtd), 2)
+    produtividade = np.round(story_points_prev / qtd_membros, 2)
+
+    numeros = pd.Series(np.arange(primeiro_num, primeiro_num + qtd)).astype(str).str.zfill(2)
+
+    return pd.DataFrame({
+        "sprint_id": "Sprint_" + numeros,
+        "data_inicio": data_ini,
+        "data_fim": data_fim,
+        "qtd_membros": qtd_membros,
+        "duracao_dias": duracao_dias,
+        "cartoes_previstos": cartoes_prev,
+        "cartoes_entregues": cartoes_entregue,
+        "story_points_previstos": story_points_prev,
+        "story_points_entregues": story_points_entregue,
+        "tipo_dominio": tipo_dominio,
+        "complexidade_media": complexidade,
+        "percentual_bugs": percentual_bugs,
+        "percentual_retrabalho": percentual_retrabalho,
+        "velocidade_passada": velocidade_passada,
+        "produtividade_estimada": produtividade,
+    })
+
+
+def _gerar_e_gravar(caminho, *args, **kwargs):
+    return gravar_dataset(gerar_bloco_sprints(*args, **kwargs), caminho)
+
+
+def gerar_dataset_sprints_vetorizado(qtd_sprints, pasta_saida, seed=42, tamanho_bloco=250_000, processos=None,
+                                     duracao_min=10, duracao_max=21, data_base=date(2025, 1, 1), formato="parquet"):
+    """
+    Gera `qtd_sprints` sprints em `pasta_saida/parte_XXXXX.parquet` (ou .csv),
+    um arquivo por bloco, na ordem das sprints. A pasta inteira pode ser lida
+    como um dataset só por `ler_dataset`. Retorna a lista de arquivos gerados.
+    """
+    os.makedirs(pasta_saida, exist_ok=True)
+    qtd_blocos = -(-qtd_sprints // tamanho_bloco)
+    sementes = _sementes_blocos(seed, qtd_blocos)
+
+    tarefas = []
+    inicio = np.datetime64(data_base, "D")
+    for i, (semente_colunas, semente_duracao) in enumerate(sementes):
+        qtd = min(tamanho_bloco, qtd_sprints - i * tamanho_bloco)
+        caminho = os.path.join(pasta_saida, f"parte_{i:05d}.{formato}")
+        tarefas.append((caminho, i * tamanho_bloco + 1, qtd, inicio.item(), semente_colunas, semente_duracao))
+        # O próximo bloco começa no dia seguinte ao fim da última sprint deste
+        inicio = inicio + int((_duracoes(semente_duracao, qtd, duracao_min, duracao_max) + 1).sum())
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = [
+            executor.submit(_gerar_e_gravar, *tarefa, duracao_min=duracao_min, duracao_max=duracao_max)
+            for tarefa in tarefas
+        ]
+        return [futuro.result() for futuro in futuros]
+
 
 # Executa a função principal se for chamado diretamente
 if __name__ == "__main__":
-    gerar_dataset_sprints(qtd_sprints=100, path_csv="sprints_teste_2.csv", path_excel="sprints_teste.xlsx")
+    parser = argparse.ArgumentParser(description="Gera sprints sintéticas.")
+    parser.add_argument("--qtd", type=int, default=100, help="Quantidade de sprints")
+    parser.add_argument("--vetorizado", action="store_true", help="Modo numpy em blocos e processos (milhões de sprints)")
+    parser.add_argument("--saida", default="sprints_geradas", help="Pasta dos blocos no modo vetorizado")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tamanho-bloco", type=int, default=250_000)
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--formato", choices=["parquet", "csv"], default="parquet", help="Formato dos blocos")
+    args = parser.parse_args()
+
+    if args.vetorizado:
+        inicio = time.perf_counter()
+        arquivos = gerar_dataset_sprints_vetorizado(args.qtd, args.saida, seed=args.seed,
+                                                    tamanho_bloco=args.tamanho_bloco, processos=args.processos,
+                                                    formato=args.formato)
+        print(f"✅ {args.qtd:,} sprints em {len(arquivos)} arquivos ({args.saida}) "
+              f"em {time.perf_counter() - inicio:.1f}s")
+    else:
+        gerar_dataset_sprints(qtd_sprints=args.qtd, path_csv="sprints_teste_2.csv", path_excel="sprints_teste.xlsx")
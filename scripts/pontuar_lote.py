@@ -0,0 +1,180 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # scripts/
+sys.path.append(os.path.join(BASE_DIR, "..", "streamlit_app"))
+
+from scripts_app.artefatos import load_joblib  # noqa: E402
+from scripts_app.floresta_compilada import FlorestaCompilada, carregar_floresta_compilada  # noqa: E402
+from scripts_app.io_datasets import iterar_dataset  # noqa: E402
+from scripts_app.preprocessamento import COLUNAS_INTERVALO, PipelineFeatures, prever, prever_intervalos  # noqa: E402
+
+ARTIFACTS_DIR = os.path.join(BASE_DIR, "..", "artifacts")
+MODEL_PATH = os.path.join(ARTIFACTS_DIR, "model", "agile_estimator.pkl")
+SCALER_PATH = os.path.join(ARTIFACTS_DIR, "scaler", "standard_scaler_produtividade_estimada_story_points_previstos.pkl")
+ENCODER_PATH = os.path.join(ARTIFACTS_DIR, "encoder", "label_encoder_tipo_dominio.pkl")
+
+# -------------------------------
+# Worker (um modelo carregado por processo)
+# -------------------------------
+
+_worker = {}
+
+
+def _iniciar_worker(model_path, scaler_path, encoder_path, intervalos=False):
+    _worker["model"] = carregar_floresta_compilada(model_path)
+    _worker["pipeline"] = PipelineFeatures(load_joblib(scaler_path), load_joblib(encoder_path))
+    _worker["intervalos"] = intervalos
+
+
+def _pontuar(bloco):
+    # Só as previsões (e a faixa, se pedida) voltam para o processo principal, que já tem o bloco
+    X, desconhecidos = _worker["pipeline"].transform(bloco)
+    model = _worker["model"]
+
+    # O paralelismo já vem dos processos; evita threads extras dentro de cada um
+    if _worker["intervalos"]:
+        if not isinstance(model, FlorestaCompilada):
+            raise ValueError("A faixa P10/P50/P90 precisa de um modelo de floresta (árvores individuais).")
+        return prever_intervalos(model, X, desconhecidos, n_jobs=1)
+    if isinstance(model, FlorestaCompilada):
+        return prever(model, X, desconhecidos, n_jobs=1), None
+    return prever(model, X, desconhecidos), None
+
+
+# -------------------------------
+# Leitura e escrita em blocos
+# -------------------------------
+
+def ler_blocos(caminho, tamanho_bloco):
+    # Parquet (arquivo ou pasta particionada) ou CSV, já no esquema tipado
+    yield from iterar_dataset(caminho, tamanho_bloco)
+
+
+class EscritorBlocos:
+    """Escreve os blocos pontuados no CSV/Parquet de saída conforme ficam prontos."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.parquet = caminho.endswith(".parquet")
+        self._writer = None
+        self._primeiro = True
+
+    def escrever(self, bloco):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._writer is None:
+                tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+                self._writer = pq.ParquetWriter(self.caminho, tabela.schema)
+            else:
+                tabela = pa.Table.from_pandas(bloco, schema=self._writer.schema, preserve_index=False)
+            self._writer.write_table(tabela)
+        else:
+            bloco.to_csv(self.caminho, mode="w" if self._primeiro else "a",
+                         header=self._primeiro, index=False)
+        self._primeiro = False
+
+    def fechar(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+# -------------------------------
+# Pontuação
+# -------------------------------
+
+def pontuar_arquivo(entrada, saida, tamanho_bloco=100_000, processos=None,
+                    model_path=MODEL_PATH, scaler_path=SCALER_PATH, encoder_path=ENCODER_PATH,
+                    intervalos=False):
+    """
+    Pontua `entrada` em blocos de `tamanho_bloco` linhas e grava `saida` com a
+    coluna produtividade_prevista (e, com `intervalos`, produtividade_p10/p50/p90:
+    quantis das previsões das árvores). No máximo 2 blocos por processo ficam
+    em memória ao mesmo tempo, independentemente do tamanho do arquivo.
+    """
+    processos = processos or os.cpu_count() or 1
+    escritor = EscritorBlocos(saida)
+    total = 0
+    sem_estimativa = 0
+    inicio = time.perf_counter()
+
+    def gravar(bloco, resultado):
+        nonlocal total, sem_estimativa
+        predicoes, faixa = resultado
+        bloco["produtividade_prevista"] = predicoes
+        if faixa is not None:
+            for i, nome in enumerate(COLUNAS_INTERVALO):
+                bloco[nome] = faixa[:, i]
+        escritor.escrever(bloco)
+        total += len(bloco)
+        sem_estimativa += int(np.isnan(predicoes).sum())
+        decorrido = time.perf_counter() - inicio
+        print(f"   {total:,} linhas | {total / decorrido:,.0f} linhas/s", flush=True)
+
+    try:
+        if processos == 1:
+            _iniciar_worker(model_path, scaler_path, encoder_path, intervalos)
+            for bloco in ler_blocos(entrada, tamanho_bloco):
+                gravar(bloco, _pontuar(bloco))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=processos,
+                initializer=_iniciar_worker,
+                initargs=(model_path, scaler_path, encoder_path, intervalos),
+            ) as executor:
+                pendentes = deque()
+                for bloco in ler_blocos(entrada, tamanho_bloco):
+                    pendentes.append((bloco, executor.submit(_pontuar, bloco)))
+                    # Limita os blocos em voo e grava na ordem de leitura
+                    if len(pendentes) >= 2 * processos:
+                        bloco_pronto, futuro = pendentes.popleft()
+                        gravar(bloco_pronto, futuro.result())
+
+                while pendentes:
+                    bloco_pronto, futuro = pendentes.popleft()
+                    gravar(bloco_pronto, futuro.result())
+    finally:
+        escritor.fechar()
+
+    if sem_estimativa:
+        print(f"⚠️ {sem_estimativa:,} linha(s) com domínio desconhecido ficaram sem estimativa")
+
+    decorrido = time.perf_counter() - inicio
+    return total, decorrido
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pontua um export de sprints (CSV/Parquet) em lote.")
+    parser.add_argument("entrada", help="Arquivo .csv ou .parquet com as sprints")
+    parser.add_argument("saida", help="Arquivo .csv ou .parquet de saída")
+    parser.add_argument("--tamanho-bloco", type=int, default=100_000)
+    parser.add_argument("--processos", type=int, default=None, help="Padrão: número de CPUs")
+    parser.add_argument("--modelo", default=MODEL_PATH)
+    parser.add_argument("--scaler", default=SCALER_PATH)
+    parser.add_argument("--encoder", default=ENCODER_PATH)
+    parser.add_argument("--intervalos", action="store_true",
+                        help="Adiciona as colunas produtividade_p10/p50/p90 (quantis das árvores da floresta)")
+    args = parser.parse_args()
+
+    total, decorrido = pontuar_arquivo(
+        args.entrada, args.saida,
+        tamanho_bloco=args.tamanho_bloco,
+        processos=args.processos,
+        model_path=args.modelo,
+        scaler_path=args.scaler,
+        encoder_path=args.encoder,
+        intervalos=args.intervalos,
+    )
+    print(f"✅ {total:,} linhas pontuadas em {decorrido:.1f}s ({total / max(decorrido, 1e-9):,.0f} linhas/s) -> {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
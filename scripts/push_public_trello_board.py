@@ -1,79 +1,194 @@
+import argparse
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import pandas as pd
 import requests
+from dotenv import load_dotenv
+
+from trello_client import TRELLO_API, ClienteTrello
+
+
+def _chaves_cards(df):
+    """
+    Chave de cada linha: (lista, nome, ocorrência). A ocorrência distingue
+    cards repetidos na mesma lista, para que o k-ésimo só seja pulado se o
+    board já tiver k+1 cards com esse nome nessa lista.
+    """
+    ocorrencia = df.groupby(["list_name", "card_name"], sort=False).cumcount()
+    return list(zip(df["list_name"].astype(str), df["card_name"].astype(str), ocorrencia.astype(int).tolist()))
+
+
+def _resposta_perdida(err):
+    """Erro em que o Trello pode ter processado o POST: 5xx, conexão caída ou timeout."""
+    if isinstance(err, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    return (isinstance(err, requests.exceptions.HTTPError) and err.response is not None
+            and err.response.status_code >= 500)
+
 
-def push_cards_to_trello(df, board_id, key, token):
+def _ler_checkpoint(caminho, board_id):
+    """
+    Chaves já criadas neste board. Cada linha do arquivo é
+    [board_id, lista, nome, ocorrência]; linhas de outros boards (ou sem o
+    board, do formato antigo) são ignoradas, para que o mesmo CSV possa ser
+    publicado em outro board sem pular nada.
+    """
+    if not caminho or not os.path.exists(caminho):
+        return set()
+    feitos = set()
+    with open(caminho, encoding="utf-8") as file:
+        for linha in file:
+            if not linha.strip():
+                continue
+            registro = json.loads(linha)
+            if len(registro) == 4 and registro[0] == board_id:
+                feitos.add(tuple(registro[1:]))
+    return feitos
+
+
+def push_cards_to_trello(df, board_id, key, token, base_url=TRELLO_API, max_workers=8, checkpoint=None):
     """
     Recebe DataFrame e cria cards no Trello.
     df deve ter colunas: list_name, card_name, card_desc (opcional), card_due (opcional)
+
+    As listas que faltam são criadas antes dos cards; os cards são enviados em
+    paralelo (`max_workers`) por um cliente com pool de conexões, limitador de
+    taxa e novas tentativas em 429/5xx. Cards que já existem no board (mesmo
+    nome na mesma lista) são pulados e cada card criado é anotado em
+    `checkpoint` (junto com o board), então rodar de novo retoma de onde
+    parou sem duplicar. Um POST que volta 5xx ou sem resposta só é reenviado
+    se o card não aparecer na lista.
+    Retorna um resumo com criados, pulados e falhas.
     """
-    # 1. Obter listas existentes do board
-    
-    lists_url = f"https://api.trello.com/1/boards/{board_id}/lists"
-    params = {"key": key, "token": token}
-    response = requests.get(lists_url, params=params)
-    response.raise_for_status()
-    existing_lists = response.json()
-
-    # Mapear listas existentes
-    list_map = {lst["name"]: lst["id"] for lst in existing_lists}
-
-    for _, row in df.iterrows():
-        list_name = row["list_name"]
-
-        # Criar lista se não existir
-        if list_name not in list_map:
-            create_list_url = f"https://api.trello.com/1/boards/{board_id}/lists"
-            list_data = {"name": list_name, "key": key, "token": token}
-            res = requests.post(create_list_url, data=list_data)
-            res.raise_for_status()
-            list_id = res.json()["id"]
-            list_map[list_name] = list_id
-        else:
-            list_id = list_map[list_name]
-
-        # Criar o card
-        card_url = "https://api.trello.com/1/cards"
-        card_data = {
-            "idList": list_id,
-            "name": row["card_name"],
-            "desc": row.get("card_desc", ""),
-            "key": key,
-            "token": token
-        }
-        if "card_due" in row and pd.notna(row["card_due"]):
-            card_data["due"] = row["card_due"]
-
-        r = requests.post(card_url, data=card_data)
-        r.raise_for_status()
-
-    print("✅ Todos os cards do DataFrame foram criados no Trello")
-
-
-# ----------------- MAIN -----------------
-# Lê seu CSV
-df = pd.read_csv("sprints_teste_2.csv")
-df = df.loc[10,::]
-
-# Adaptar as colunas do CSV pro formato do Trello
-# Aqui estou supondo que você tem: sprint_id, tipo_dominio, produtividade_prevista, qtd_membros, percentual_bugs, percentual_retrabalho
-df_trello = pd.DataFrame({
-    "list_name": df["sprint_id"],  # cada sprint vira uma lista
-    "card_name": df["tipo_dominio"],  # nome do card = domínio
-    "card_desc": (
-        "Produtividade Prevista: " + df["produtividade_prevista"].astype(str) +
-        "\nMembros: " + df["qtd_membros"].astype(str) +
-        "\n% Bugs: " + df["percentual_bugs"].astype(str) +
-        "\n% Retrabalho: " + df["percentual_retrabalho"].astype(str)
-    )
-})
-
-# Seu board_id (peguei da URL)
-board_id = "abc" 
-
-# Sua chave e token (precisa gerar em https://trello.com/app-key)
-
-trello_key = 123
-trello_token = 123
-
-# Subir os cards
-push_cards_to_trello(df_trello, board_id, trello_key, trello_token)
+    cliente = ClienteTrello(key, token, base_url=base_url, max_conexoes=max_workers)
+    df = df.reset_index(drop=True)
+
+    try:
+        # 1. Obter listas existentes e criar as que faltam (na ordem em que aparecem)
+        list_map = {lst["name"]: lst["id"] for lst in cliente.get(f"boards/{board_id}/lists")}
+        for list_name in df["list_name"].astype(str).unique():
+            if list_name not in list_map:
+                list_map[list_name] = cliente.post(f"boards/{board_id}/lists", name=list_name, pos="bottom")["id"]
+
+        # 2. Cards já presentes no board, contados por (lista, nome)
+        existentes = {}
+        for card in cliente.get(f"boards/{board_id}/cards", fields="name,idList"):
+            existentes[(card["idList"], card["name"])] = existentes.get((card["idList"], card["name"]), 0) + 1
+
+        feitos = _ler_checkpoint(checkpoint, board_id)
+        chaves = _chaves_cards(df)
+        pendentes = [
+            i for i, (list_name, card_name, ocorrencia) in enumerate(chaves)
+            if (list_name, card_name, ocorrencia) not in feitos
+            and ocorrencia >= existentes.get((list_map[list_name], card_name), 0)
+        ]
+
+        # 3. Criar os cards em paralelo, anotando cada um no checkpoint. Cards
+        # com o mesmo nome na mesma lista vão em sequência, na ordem das
+        # ocorrências: assim a contagem na lista diz se um POST sem resposta
+        # chegou a criar o card
+        grupos = {}
+        for i in pendentes:
+            grupos.setdefault(chaves[i][:2], []).append(i)
+
+        lock = threading.Lock()
+        arquivo = open(checkpoint, "a", encoding="utf-8") if checkpoint else None
+
+        def ja_criado(i):
+            list_name, card_name, ocorrencia = chaves[i]
+            cards = cliente.get(f"lists/{list_map[list_name]}/cards", fields="name")
+            return sum(card["name"] == card_name for card in cards) > ocorrencia
+
+        def criar_card(i):
+            row = df.iloc[i]
+            card_data = {
+                "idList": list_map[str(row["list_name"])],
+                "name": row["card_name"],
+                "desc": row.get("card_desc", ""),
+            }
+            if "card_due" in row and pd.notna(row["card_due"]):
+                card_data["due"] = row["card_due"]
+
+            try:
+                cliente.post("cards", **card_data)
+            except requests.exceptions.RequestException as err:
+                # 5xx ou resposta perdida: o card pode ter sido criado, então só reenvia se não estiver na lista
+                if not _resposta_perdida(err):
+                    raise
+                if not ja_criado(i):
+                    cliente.post("cards", **card_data)
+            if arquivo:
+                with lock:
+                    arquivo.write(json.dumps([board_id, *chaves[i]], ensure_ascii=False) + "\n")
+                    arquivo.flush()
+
+        def criar_grupo(indices):
+            # Um card que falhou interrompe o grupo: as ocorrências seguintes ficam para a próxima execução
+            for criados, i in enumerate(indices):
+                try:
+                    criar_card(i)
+                except requests.exceptions.RequestException as err:
+                    print(f"⚠️ Falha ao criar card: {err}")
+                    return len(indices) - criados
+            return 0
+
+        falhas = 0
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for futuro in as_completed([executor.submit(criar_grupo, indices) for indices in grupos.values()]):
+                    falhas += futuro.result()
+        finally:
+            if arquivo:
+                arquivo.close()
+    finally:
+        cliente.close()
+
+    resumo = {"criados": len(pendentes) - falhas, "pulados": len(df) - len(pendentes), "falhas": falhas}
+    if falhas:
+        print(f"⚠️ {falhas} cards não foram criados; rode de novo para retomar ({resumo})")
+    else:
+        print(f"✅ Todos os cards do DataFrame foram criados no Trello ({resumo})")
+    return resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publica as sprints previstas como cards num board do Trello.")
+    parser.add_argument("--csv", default="sprints_teste_2.csv")
+    parser.add_argument("--board", default=None, help="ID do board (padrão: BOARD_ID do .env)")
+    parser.add_argument("--base-url", default=TRELLO_API, help="URL da API (ex.: servidor local)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--checkpoint", default=None,
+                        help="Arquivo de cards já criados (padrão: push_trello_<board>.checkpoint)")
+    args = parser.parse_args()
+
+    # Chave e token do .env (gerar em https://trello.com/app-key)
+    load_dotenv()
+
+    # Lê seu CSV
+    df = pd.read_csv(args.csv)
+
+    # Adaptar as colunas do CSV pro formato do Trello
+    # Aqui estou supondo que você tem: sprint_id, tipo_dominio, produtividade_prevista, qtd_membros, percentual_bugs, percentual_retrabalho
+    df_trello = pd.DataFrame({
+        "list_name": df["sprint_id"],  # cada sprint vira uma lista
+        "card_name": df["tipo_dominio"],  # nome do card = domínio
+        "card_desc": (
+            "Produtividade Prevista: " + df["produtividade_prevista"].astype(str) +
+            "\nMembros: " + df["qtd_membros"].astype(str) +
+            "\n% Bugs: " + df["percentual_bugs"].astype(str) +
+            "\n% Retrabalho: " + df["percentual_retrabalho"].astype(str)
+        )
+    })
+
+    # Subir os cards
+    board_id = args.board or os.getenv("BOARD_ID")
+    push_cards_to_trello(df_trello, board_id, os.getenv("TRELLO_KEY"),
+                         os.getenv("TRELLO_TOKEN"), base_url=args.base_url, max_workers=args.workers,
+                         checkpoint=args.checkpoint or f"push_trello_{board_id}.checkpoint")
+
+
+if __name__ == "__main__":
+    main()
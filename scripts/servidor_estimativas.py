@@ -0,0 +1,275 @@
+import argparse
+import io
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # scripts/
+sys.path.append(os.path.join(BASE_DIR, "..", "streamlit_app"))
+
+from scripts_app.artefatos import load_joblib  # noqa: E402
+from scripts_app.floresta_compilada import carregar_floresta_compilada  # noqa: E402
+from scripts_app.preprocessamento import COLUNAS_ENTRADA, PipelineFeatures, prever  # noqa: E402
+
+ARTIFACTS_DIR = os.path.join(BASE_DIR, "..", "artifacts")
+MODEL_PATH = os.path.join(ARTIFACTS_DIR, "model", "agile_estimator.pkl")
+SCALER_PATH = os.path.join(ARTIFACTS_DIR, "scaler", "standard_scaler_produtividade_estimada_story_points_previstos.pkl")
+ENCODER_PATH = os.path.join(ARTIFACTS_DIR, "encoder", "label_encoder_tipo_dominio.pkl")
+
+# Limites dos baldes do histograma de tamanho de lote (em linhas)
+BALDES_LOTE = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+
+
+# -------------------------------
+# Métricas
+# -------------------------------
+
+class Metricas:
+    """Latências recentes (janela deslizante) e histograma de tamanho dos lotes."""
+
+    def __init__(self, janela=10_000):
+        self._lock = threading.Lock()
+        self.latencias = deque(maxlen=janela)
+        self.lotes = np.zeros(len(BALDES_LOTE) + 1, dtype=np.int64)
+        self.requisicoes = 0
+        self.linhas = 0
+
+    def registrar_requisicao(self, segundos):
+        with self._lock:
+            self.latencias.append(segundos)
+            self.requisicoes += 1
+
+    def registrar_lote(self, linhas):
+        with self._lock:
+            self.lotes[np.searchsorted(BALDES_LOTE, linhas)] += 1
+            self.linhas += linhas
+
+    def resumo(self):
+        with self._lock:
+            latencias = np.array(self.latencias)
+            lotes = self.lotes.copy()
+            requisicoes, linhas = self.requisicoes, self.linhas
+
+        rotulos = [f"<={b}" for b in BALDES_LOTE] + [f">{BALDES_LOTE[-1]}"]
+        return {
+            "requisicoes": requisicoes,
+            "linhas": linhas,
+            "latencia_ms": {
+                "p50": float(np.percentile(latencias, 50) * 1000) if len(latencias) else None,
+                "p99": float(np.percentile(latencias, 99) * 1000) if len(latencias) else None,
+            },
+            "lotes": int(lotes.sum()),
+            "histograma_tamanho_lote": dict(zip(rotulos, lotes.tolist())),
+        }
+
+
+# -------------------------------
+# Validação das entradas
+# -------------------------------
+
+def validar_entrada(data):
+    """
+    Só as colunas do modelo, com os números em float64 (o mesmo tipo do
+    upload do app). Valores que não viram número, infinitos ou qtd_membros
+    <= 0 geram ValueError aqui, antes de a requisição entrar num lote com as
+    de outros clientes.
+    """
+    faltando = [c for c in COLUNAS_ENTRADA if c not in data.columns]
+    if faltando:
+        raise ValueError(f"colunas ausentes: {faltando}")
+
+    colunas = {}
+    for nome in COLUNAS_ENTRADA:
+        if nome == "tipo_dominio":
+            colunas[nome] = data[nome].astype(object)
+            continue
+        try:
+            colunas[nome] = pd.to_numeric(data[nome], errors="raise").astype(np.float64)
+        except (ValueError, TypeError):
+            invalidos = data[nome][pd.to_numeric(data[nome], errors="coerce").isna() & data[nome].notna()]
+            raise ValueError(f"coluna {nome} com valor não numérico: {invalidos.iloc[0]!r}") from None
+        if np.isinf(colunas[nome]).any():
+            raise ValueError(f"coluna {nome} com valor infinito")
+
+    # qtd_membros divide a carga por membro: zero daria infinito e negativo não faz sentido
+    membros = colunas["qtd_membros"]
+    if (membros <= 0).any():
+        raise ValueError(f"coluna qtd_membros precisa ser maior que zero: {membros[membros <= 0].iloc[0]!r}")
+    return pd.DataFrame(colunas)
+
+
+# -------------------------------
+# Micro-lotes
+# -------------------------------
+
+class MicroLote:
+    """
+    Junta requisições concorrentes num único lote para o modelo. Um lote é
+    fechado quando atinge `max_linhas` ou quando a primeira requisição dele
+    já esperou `max_espera_ms`.
+    """
+
+    def __init__(self, model, pipeline, metricas, max_linhas=256, max_espera_ms=5):
+        self.model = model
+        self.pipeline = pipeline
+        self.metricas = metricas
+        self.max_linhas = max_linhas
+        self.max_espera = max_espera_ms / 1000
+        self._fila = queue.Queue()
+        threading.Thread(target=self._laco, name="micro-lote", daemon=True).start()
+
+    def submeter(self, data):
+        futuro = Future()
+        self._fila.put((data, futuro))
+        return futuro
+
+    def _coletar(self):
+        itens = [self._fila.get()]
+        linhas = len(itens[0][0])
+        limite = time.perf_counter() + self.max_espera
+
+        while linhas < self.max_linhas:
+            restante = limite - time.perf_counter()
+            if restante <= 0:
+                break
+            try:
+                item = self._fila.get(timeout=restante)
+            except queue.Empty:
+                break
+            itens.append(item)
+            linhas += len(item[0])
+        return itens
+
+    def _prever(self, data):
+        X, desconhecidos = self.pipeline.transform(data)
+        predicoes = prever(self.model, X, desconhecidos)
+        self.metricas.registrar_lote(len(data))
+        return predicoes
+
+    def _laco(self):
+        while True:
+            itens = self._coletar()
+            try:
+                predicoes = self._prever(pd.concat([data for data, _ in itens], ignore_index=True))
+            except Exception as e:
+                if len(itens) == 1:
+                    itens[0][1].set_exception(e)
+                    continue
+                # Uma requisição com problema não derruba as outras do lote:
+                # cada uma é refeita sozinha e recebe só o próprio erro
+                for data, futuro in itens:
+                    try:
+                        futuro.set_result(self._prever(data))
+                    except Exception as erro:
+                        futuro.set_exception(erro)
+                continue
+
+            inicio = 0
+            for data, futuro in itens:
+                futuro.set_result(predicoes[inicio:inicio + len(data)])
+                inicio += len(data)
+
+
+# -------------------------------
+# HTTP
+# -------------------------------
+
+def criar_handler(lote, metricas):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _responder(self, status, corpo, tipo="application/json"):
+            if not isinstance(corpo, bytes):
+                corpo = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", f"{tipo}; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def do_GET(self):
+            if self.path == "/saude":
+                self._responder(200, {"status": "ok"})
+            elif self.path == "/metricas":
+                self._responder(200, metricas.resumo())
+            else:
+                self._responder(404, {"erro": "rota não encontrada"})
+
+        def do_POST(self):
+            if self.path != "/estimar":
+                self._responder(404, {"erro": "rota não encontrada"})
+                return
+
+            inicio = time.perf_counter()
+            corpo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            csv = self.headers.get("Content-Type", "").startswith("text/csv")
+
+            try:
+                if csv:
+                    data = pd.read_csv(io.BytesIO(corpo))
+                else:
+                    registros = json.loads(corpo)
+                    data = pd.DataFrame([registros] if isinstance(registros, dict) else registros)
+
+                predicoes = lote.submeter(validar_entrada(data)).result()
+            except (ValueError, KeyError, json.JSONDecodeError) as e:
+                self._responder(400, {"erro": str(e)})
+                return
+            except Exception as e:
+                self._responder(500, {"erro": str(e)})
+                return
+
+            if csv:
+                data["produtividade_prevista"] = predicoes
+                self._responder(200, data.to_csv(index=False).encode("utf-8"), tipo="text/csv")
+            else:
+                # NaN (domínio desconhecido) vira null no JSON
+                valores = [None if np.isnan(v) else float(v) for v in predicoes]
+                self._responder(200, {"produtividade_prevista": valores})
+
+            metricas.registrar_requisicao(time.perf_counter() - inicio)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor HTTP local de estimativas com micro-lotes.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--max-lote", type=int, default=256, help="Máximo de linhas por lote")
+    parser.add_argument("--max-espera-ms", type=float, default=5.0, help="Espera máxima para fechar um lote")
+    parser.add_argument("--modelo", default=MODEL_PATH)
+    parser.add_argument("--scaler", default=SCALER_PATH)
+    parser.add_argument("--encoder", default=ENCODER_PATH)
+    args = parser.parse_args()
+
+    model = carregar_floresta_compilada(args.modelo)
+    pipeline = PipelineFeatures(load_joblib(args.scaler), load_joblib(args.encoder))
+    metricas = Metricas()
+    lote = MicroLote(model, pipeline, metricas, args.max_lote, args.max_espera_ms)
+
+    servidor = ThreadingHTTPServer((args.host, args.porta), criar_handler(lote, metricas))
+    print(f"✅ Servidor de estimativas em http://{args.host}:{args.porta} (POST /estimar, GET /metricas)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # scripts/
+FIXTURE_PATH = os.path.join(BASE_DIR, "..", "tests", "storypoints_bugs_ciclo.json")
+
+BOARD_ID = "6891356a01e4dbb84aeef7b1"
+STORY_POINT_FIELD_ID = "68914f0a1c2b3d4e5f6a7b8c"
+
+# Resposta de uma rota que processou a requisição mas deve devolver 500
+ERRO_INTERNO = object()
+
+# -------------------------------
+# Servidor local que imita a API do Trello
+# -------------------------------
+# Serve um board montado a partir de tests/storypoints_bugs_ciclo.json para
+# testar os scripts de extração sem rede. `multiplicar` replica listas e cards
+# para simular boards grandes, `comentarios` cria comentários em cada card;
+# `taxa_429` e `latencia_ms` simulam limite de taxa e rede lenta;
+# `EstadoServidor.falhas_apos_criar` faz os próximos POST /cards criarem o
+# card e responderem 500. Aceita /1/batch com as mesmas rotas GET.
+
+
+def _id_falso(base, n):
+    # Mantém os 8 primeiros caracteres (timestamp) e troca o sufixo
+    return f"{base[:8]}{n:016x}"
+
+
+def montar_board(caminho=FIXTURE_PATH, multiplicar=1, comentarios=0):
+    with open(caminho, encoding="utf-8") as file:
+        registros = json.load(file)
+
+    listas, etiquetas, cards = {}, {}, []
+    for copia in range(multiplicar):
+        for i, registro in enumerate(registros):
+            list_id = registro["list_id"] if copia == 0 else _id_falso(registro["list_id"], copia)
+            listas.setdefault(list_id, {
+                "id": list_id,
+                "name": registro["list_name"] if copia == 0 else f"{registro['list_name']} {copia}",
+                "idBoard": BOARD_ID,
+                "closed": False,
+                "pos": len(listas) + 1,
+            })
+
+            card_id = registro["card_id"] if copia == 0 else _id_falso(registro["card_id"], copia * 1000 + i)
+            cards.append({
+                "id": card_id,
+                "name": registro["card_name"],
+                "url": f"https://trello.com/c/{card_id[-8:]}",
+                "due": registro["completed_date"],
+                "idList": list_id,
+                "idBoard": BOARD_ID,
+                "dateLastActivity": registro["completed_date"],
+                "labels": [etiquetas.setdefault(nome, {"id": _id_falso(BOARD_ID, len(etiquetas) + 1), "name": nome})
+                           for nome in registro["card_labels"].split(", ") if nome],
+                "members": [],
+                "customFieldItems": [{
+                    "id": _id_falso(card_id, 1),
+                    "idCustomField": STORY_POINT_FIELD_ID,
+                    "idModel": card_id,
+                    "modelType": "card",
+                    "value": {"text": registro["custom_StoryPoint"]},
+                }],
+            })
+
+    # Uma action createCard por card, da mais recente para a mais antiga (como no Trello)
+    actions = [{
+        "id": _id_falso(card["id"], 10 ** 6 + n),
+        "type": "createCard",
+        "date": _data_do_id(card["id"]),
+        "data": {"card": {"id": card["id"], "name": card["name"]}, "list": {"id": card["idList"]}},
+        "memberCreator": {"fullName": "agile_estimator"},
+    } for n, card in enumerate(cards)]
+
+    # `comentarios` actions commentCard por card, um segundo depois da criação cada
+    for n, card in enumerate(cards):
+        criado = int(card["id"][:8], 16)
+        actions.extend({
+            "id": _id_falso(card["id"], 10 ** 9 + n * comentarios + k),
+            "type": "commentCard",
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(criado + k + 1)),
+            "data": {"card": {"id": card["id"], "name": card["name"]}, "list": {"id": card["idList"]},
+                     "text": f"Comentário {k + 1} em {card['name']}"},
+            "memberCreator": {"fullName": "agile_estimator"},
+        } for k in range(comentarios))
+    actions.sort(key=lambda a: a["date"], reverse=True)
+
+    return {
+        "id": BOARD_ID,
+        "name": "agile_estimator",
+        "lists": list(listas.values()),
+        "cards": cards,
+        "actions": actions,
+        "customFields": [{"id": STORY_POINT_FIELD_ID, "name": "StoryPoint", "type": "text"}],
+    }
+
+
+def _data_do_id(object_id):
+    # Os 8 primeiros caracteres hexadecimais do ID são o timestamp de criação
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(int(object_id[:8], 16)))
+
+
+def _agora():
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()), f"{int(time.time()):08x}"
+
+
+class EstadoServidor:
+    def __init__(self, board, taxa_429=0.0, latencia_ms=0.0):
+        self.board = board
+        self.taxa_429 = taxa_429
+        self.latencia = latencia_ms / 1000
+        self.lock = threading.Lock()
+        self.requisicoes = 0
+        self.respostas_429 = 0
+        self.falhas_apos_criar = 0
+        self.sequencia = 0
+
+    def novo_id(self):
+        with self.lock:
+            self.sequencia += 1
+            return f"{int(time.time()):08x}{random.getrandbits(32):08x}{self.sequencia:08x}"
+
+    def registrar_acao(self, tipo, card, **extra):
+        data, _ = _agora()
+        acao = {
+            "id": self.novo_id(),
+            "type": tipo,
+            "date": data,
+            "data": {"card": {"id": card["id"], "name": card["name"]}, "list": {"id": card["idList"]}, **extra},
+            "memberCreator": {"fullName": "agile_estimator"},
+        }
+        with self.lock:
+            self.board["actions"].insert(0, acao)
+        return acao
+
+
+def criar_handler(estado):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _responder(self, status, corpo, headers=None):
+            dados = json.dumps(corpo).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(dados)))
+            for nome, valor in (headers or {}).items():
+                self.send_header(nome, valor)
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def _inicio(self):
+            with estado.lock:
+                estado.requisicoes += 1
+                limitar = random.random() < estado.taxa_429
+                if limitar:
+                    estado.respostas_429 += 1
+            if estado.latencia:
+                time.sleep(estado.latencia)
+            if limitar:
+                self._responder(429, {"message": "API_TOKEN_LIMIT_EXCEEDED"}, {"Retry-After": "0.05"})
+            return not limitar
+
+        def _rota_get(self, caminho, params):
+            board = estado.board
+
+            if re.fullmatch(r"/1/boards/\w+/customFields", caminho):
+                return board["customFields"]
+            if re.fullmatch(r"/1/boards/\w+/lists", caminho):
+                return [{k: v for k, v in lst.items()} for lst in board["lists"]]
+            if re.fullmatch(r"/1/boards/\w+", caminho):
+                return {"id": board["id"], "name": board["name"]}
+
+            if re.fullmatch(r"/1/boards/\w+/cards(/all)?", caminho):
+                return board["cards"]
+            if re.fullmatch(r"/1/boards/\w+/actions", caminho):
+                return _filtrar_acoes(board["actions"], params)
+
+            match = re.fullmatch(r"/1/lists/(\w+)/cards", caminho)
+            if match:
+                cards = [c for c in board["cards"] if c["idList"] == match.group(1)]
+                if not params.get("actions"):
+                    return cards
+                # actions embutidas: as mais recentes de cada card, até actions_limit
+                ids = {c["id"] for c in cards}
+                por_card = {}
+                for acao in board["actions"]:
+                    card_id = acao["data"].get("card", {}).get("id")
+                    if card_id in ids and acao["type"] in params["actions"].split(","):
+                        por_card.setdefault(card_id, []).append(acao)
+                limite = int(params.get("actions_limit", 50))
+                return [{**c, "actions": por_card.get(c["id"], [])[:limite]} for c in cards]
+
+            match = re.fullmatch(r"/1/cards/(\w+)/actions", caminho)
+            if match:
+                acoes = [a for a in board["actions"] if a["data"].get("card", {}).get("id") == match.group(1)]
+                return _filtrar_acoes(acoes, {"filter": "commentCard", **params})
+
+            if caminho == "/1/batch":
+                respostas = []
+                for rota in params.get("urls", "").split(","):
+                    url = urlparse(rota)
+                    sub_params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                    corpo = self._rota_get("/1" + url.path, sub_params)
+                    respostas.append({"200": corpo} if corpo is not None else
+                                     {"name": "NotFound", "message": "not found", "statusCode": 404})
+                return respostas
+
+            match = re.fullmatch(r"/1/cards/(\w+)", caminho)
+            if match:
+                return next((c for c in board["cards"] if c["id"] == match.group(1)), None)
+
+            return None
+
+        def _rota_post(self, caminho, params):
+            board = estado.board
+
+            match = re.fullmatch(r"/1/boards/\w+/lists", caminho)
+            if match:
+                lista = {"id": estado.novo_id(), "name": params.get("name", ""), "idBoard": board["id"],
+                         "closed": False}
+                with estado.lock:
+                    lista["pos"] = len(board["lists"]) + 1
+                    board["lists"].append(lista)
+                return lista
+
+            if caminho == "/1/cards":
+                if not any(lst["id"] == params.get("idList") for lst in board["lists"]):
+                    return None
+                card = {
+                    "id": estado.novo_id(), "name": params.get("name", ""), "desc": params.get("desc", ""),
+                    "url": "", "due": params.get("due"),
+                    "idList": params.get("idList"), "idBoard": board["id"], "dateLastActivity": _agora()[0],
+                    "labels": [], "members": [], "customFieldItems": [],
+                }
+                card["url"] = f"https://trello.com/c/{card['id'][-8:]}"
+                with estado.lock:
+                    board["cards"].append(card)
+                    falhar = estado.falhas_apos_criar > 0
+                    if falhar:
+                        estado.falhas_apos_criar -= 1
+                estado.registrar_acao("createCard", card)
+                return ERRO_INTERNO if falhar else card
+
+            match = re.fullmatch(r"/1/cards/(\w+)/actions/comments", caminho)
+            if match:
+                card = next((c for c in board["cards"] if c["id"] == match.group(1)), None)
+                if card is None:
+                    return None
+                return estado.registrar_acao("commentCard", card, text=params.get("text", ""))
+
+            return None
+
+        def _corpo_formulario(self):
+            tamanho = int(self.headers.get("Content-Length") or 0)
+            corpo = self.rfile.read(tamanho).decode("utf-8") if tamanho else ""
+            return {k: v[0] for k, v in parse_qs(corpo).items()}
+
+        def do_GET(self):
+            if not self._inicio():
+                return
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            corpo = self._rota_get(url.path, params)
+            if corpo is None:
+                self._responder(404, {"message": "not found"})
+            else:
+                self._responder(200, corpo)
+
+        def do_POST(self):
+            dados = self._corpo_formulario()
+            if not self._inicio():
+                return
+            url = urlparse(self.path)
+            params = {**{k: v[0] for k, v in parse_qs(url.query).items()}, **dados}
+            corpo = self._rota_post(url.path, params)
+            if corpo is ERRO_INTERNO:
+                self._responder(500, {"message": "internal server error"})
+            elif corpo is None:
+                self._responder(404, {"message": "not found"})
+            else:
+                self._responder(200, corpo)
+
+    return Handler
+
+
+def _filtrar_acoes(acoes, params):
+    """`filter`, `since`, `before` (data ou ID de action) e `limit`, como no Trello."""
+    tipos = params.get("filter", "all")
+    if tipos != "all":
+        acoes = [a for a in acoes if a["type"] in tipos.split(",")]
+
+    # A lista está da mais recente para a mais antiga; um ID de action corta
+    # pela posição (sem ambiguidade entre actions do mesmo segundo), uma data
+    # corta por comparação (`since` inclusivo)
+    def cortar(acoes, limite, antes):
+        posicoes = {a["id"]: i for i, a in enumerate(acoes)}
+        if limite in posicoes:
+            return acoes[posicoes[limite] + 1:] if antes else acoes[:posicoes[limite]]
+        if antes:
+            return [a for a in acoes if a["date"] < limite]
+        return [a for a in acoes if a["date"] >= limite]
+
+    if params.get("since"):
+        acoes = cortar(acoes, params["since"], antes=False)
+    if params.get("before"):
+        acoes = cortar(acoes, params["before"], antes=True)
+
+    return acoes[:min(int(params.get("limit", 50)), 1000)]
+
+
+def iniciar_servidor(porta=0, multiplicar=1, taxa_429=0.0, latencia_ms=0.0, comentarios=0):
+    """
+    Sobe o servidor numa thread e retorna (servidor, estado, base_url).
+    Com porta=0 o sistema escolhe uma porta livre.
+    """
+    estado = EstadoServidor(montar_board(multiplicar=multiplicar, comentarios=comentarios), taxa_429, latencia_ms)
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), criar_handler(estado))
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{servidor.server_address[1]}/1"
+    return servidor, estado, base_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que imita a API do Trello.")
+    parser.add_argument("--porta", type=int, default=8766)
+    parser.add_argument("--multiplicar", type=int, default=1, help="Réplicas das listas/cards do fixture")
+    parser.add_argument("--taxa-429", type=float, default=0.0, help="Fração de respostas 429")
+    parser.add_argument("--latencia-ms", type=float, default=0.0)
+    parser.add_argument("--comentarios", type=int, default=0, help="Comentários criados em cada card")
+    args = parser.parse_args()
+
+    servidor, estado, base_url = iniciar_servidor(args.porta, args.multiplicar, args.taxa_429, args.latencia_ms,
+                                                  args.comentarios)
+    print(f"✅ Trello local em {base_url} (board {BOARD_ID}, "
+          f"{len(estado.board['lists'])} listas, {len(estado.board['cards'])} cards)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
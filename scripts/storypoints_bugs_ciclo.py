@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # scripts/
+sys.path.append(os.path.join(BASE_DIR, "..", "streamlit_app"))
+
+from scripts_app.get_public_trello_board import iterar_cartoes_arquivo  # noqa: E402
+from scripts_app.ciclo_cartoes import calcular_ciclo, percentis_por_grupo, percentis_por_label  # noqa: E402
+
+DATASETS_DIR = os.path.join(BASE_DIR, "..", "datasets")
+ENTRADA_PADRAO = os.path.join(BASE_DIR, "..", "tests", "storypoints_bugs_ciclo.json")
+
+# Colunas textuais antigas substituídas pelas durações numéricas
+COLUNAS_DESCARTADAS = ["cycle_time_days_hours"]
+
+
+def ler_cartoes(caminho):
+    """Cards de um CSV (ex.: cartoes_por_lista.csv) ou de um export JSON do Trello."""
+    if caminho.endswith(".json"):
+        blocos = [pd.DataFrame(bloco) for bloco in iterar_cartoes_arquivo(caminho)]
+        return pd.concat(blocos, ignore_index=True) if blocos else pd.DataFrame()
+    return pd.read_csv(caminho, encoding="utf-8-sig")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calcula lead/cycle time dos cards e percentis por lista e label.")
+    parser.add_argument("--entrada", default=ENTRADA_PADRAO, help="CSV ou JSON com card_id e a data de conclusão")
+    parser.add_argument("--saida", default=os.path.join(DATASETS_DIR, "storypoints_bugs_ciclo.csv"))
+    parser.add_argument("--coluna-conclusao", default="completed_date",
+                        help="Coluna com a data de conclusão (ex.: card_due em cartoes_por_lista.csv)")
+    parser.add_argument("--coluna-inicio", default=None, help="Coluna com o início do trabalho (padrão: criação)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    cards = ler_cartoes(args.entrada)
+    cards = calcular_ciclo(cards, coluna_conclusao=args.coluna_conclusao, coluna_inicio=args.coluna_inicio)
+    cards = cards.drop(columns=COLUNAS_DESCARTADAS, errors="ignore")
+
+    base, _ = os.path.splitext(args.saida)
+    por_lista = percentis_por_grupo(cards, "list_name")
+    por_label = percentis_por_label(cards)
+
+    cards.to_csv(args.saida, index=False, encoding="utf-8-sig")
+    por_lista.to_csv(f"{base}_por_lista.csv", index=False, encoding="utf-8-sig")
+    por_label.to_csv(f"{base}_por_label.csv", index=False, encoding="utf-8-sig")
+
+    print(f"✅ {len(cards):,} cards processados em {time.perf_counter() - inicio:.2f}s")
+    print(f"✅ Arquivos gerados: {args.saida}, {base}_por_lista.csv, {base}_por_label.csv")
+
+
+if __name__ == "__main__":
+    main()
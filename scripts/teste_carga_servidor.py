@@ -0,0 +1,66 @@
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import requests
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # scripts/
+DATASET_PATH = os.path.join(BASE_DIR, "..", "datasets", "sprints_simuladas.csv")
+
+
+# Cada cliente envia uma sprint por requisição, uma atrás da outra
+def cliente(url, sprints, requisicoes, latencias, erros):
+    sessao = requests.Session()
+    for i in range(requisicoes):
+        sprint = sprints[i % len(sprints)]
+        inicio = time.perf_counter()
+        try:
+            resposta = sessao.post(f"{url}/estimar", json=sprint, timeout=30)
+            resposta.raise_for_status()
+            latencias.append(time.perf_counter() - inicio)
+        except requests.exceptions.RequestException:
+            erros.append(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do servidor de estimativas local.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--clientes", type=int, default=32, help="Requisições concorrentes")
+    parser.add_argument("--requisicoes", type=int, default=100, help="Requisições por cliente")
+    args = parser.parse_args()
+
+    sprints = pd.read_csv(DATASET_PATH).head(1000).to_dict(orient="records")
+    latencias, erros = [], []
+
+    inicio = time.perf_counter()
+    threads = [
+        threading.Thread(target=cliente, args=(args.url, sprints[i::args.clientes], args.requisicoes, latencias, erros))
+        for i in range(args.clientes)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    decorrido = time.perf_counter() - inicio
+
+    latencias = np.array(latencias) * 1000
+    print(f"Requisições: {len(latencias)} ok, {len(erros)} erros em {decorrido:.1f}s "
+          f"({len(latencias) / decorrido:,.0f} req/s)")
+    if len(latencias):
+        print(f"Latência no cliente: p50 {np.percentile(latencias, 50):.1f} ms | "
+              f"p99 {np.percentile(latencias, 99):.1f} ms")
+
+    metricas = requests.get(f"{args.url}/metricas", timeout=10).json()
+    print(f"Latência no servidor: p50 {metricas['latencia_ms']['p50']:.1f} ms | "
+          f"p99 {metricas['latencia_ms']['p99']:.1f} ms")
+    print(f"Lotes: {metricas['lotes']} para {metricas['linhas']} linhas")
+    for balde, qtd in metricas["histograma_tamanho_lote"].items():
+        if qtd:
+            print(f"   {balde:>7}: {qtd}")
+
+
+if __name__ == "__main__":
+    main()
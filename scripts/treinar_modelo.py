@@ -0,0 +1,177 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import platform
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # scripts/
+sys.path.append(os.path.join(BASE_DIR, "..", "streamlit_app"))
+
+from scripts_app.cache_matrizes import carregar_matriz  # noqa: E402
+from scripts_app.preprocessamento import especificacao_features  # noqa: E402
+
+ARTIFACTS_DIR = os.path.join(BASE_DIR, "..", "artifacts")
+DATASET_PATH = os.path.join(BASE_DIR, "..", "datasets", "data_prepared_2.parquet")
+FEATURES_CACHE_DIR = os.path.join(ARTIFACTS_DIR, "cache", "features")
+BUNDLES_DIR = os.path.join(ARTIFACTS_DIR, "bundles")
+SCALER_PATH = os.path.join(ARTIFACTS_DIR, "scaler", "standard_scaler_produtividade_estimada_story_points_previstos.pkl")
+ENCODER_PATH = os.path.join(ARTIFACTS_DIR, "encoder", "label_encoder_tipo_dominio.pkl")
+
+# Hiperparâmetros do modelo servido hoje (notebook model_trainig_rf.ipynb)
+PARAMETROS_PADRAO = {
+    "n_estimators": 1300,
+    "max_depth": 8,
+    "max_samples": 0.8604699621260646,
+    "min_samples_split": 5,
+    "min_samples_leaf": 2,
+    "max_features": 25,
+    "ccp_alpha": 0.0005,
+    "bootstrap": True,
+    "criterion": "friedman_mse",
+    "random_state": 1,
+}
+
+
+# -------------------------------
+# Hiperparâmetros
+# -------------------------------
+
+def parametros_da_busca(caminho):
+    """Melhor configuração de scripts/busca_hiperparametros.py (MAE out-of-bag na maior rodada)."""
+    from busca_hiperparametros import FIXOS, PARAMETROS
+
+    resultados = pd.read_csv(caminho)
+    final = resultados[resultados["n_estimators"] == resultados["n_estimators"].max()]
+    melhor = final.sort_values("MAE_oob", kind="stable").iloc[0]
+
+    parametros = {**FIXOS, "n_estimators": int(melhor["n_estimators"])}
+    for nome in PARAMETROS:
+        parametros[nome] = float(melhor[nome]) if nome == "ccp_alpha" else int(melhor[nome])
+    return parametros
+
+
+# -------------------------------
+# Bundle versionado
+# -------------------------------
+
+def _sha256(caminho):
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _gravar_json(caminho, conteudo):
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(conteudo, f, ensure_ascii=False, indent=2)
+
+
+def metricas(y, y_pred):
+    return {
+        "MAE": float(mean_absolute_error(y, y_pred)),
+        "RMSE": float(np.sqrt(mean_squared_error(y, y_pred))),
+        "R2": float(r2_score(y, y_pred)),
+    }
+
+
+def gravar_bundle(pasta, model, manifesto, resultados, scaler_path=SCALER_PATH, encoder_path=ENCODER_PATH):
+    """
+    Pasta com tudo que o serving precisa para reproduzir este modelo: modelo,
+    scaler e encoder usados no preparo do dataset, especificação das
+    features, métricas e o manifesto (dataset, parâmetros, tempos, versões
+    das libs e o SHA-256 de cada arquivo).
+    """
+    temporario = f"{pasta}.tmp"
+    shutil.rmtree(temporario, ignore_errors=True)
+    os.makedirs(temporario)
+
+    with open(os.path.join(temporario, "agile_estimator.pkl"), "wb") as file:
+        pickle.dump(model, file)
+    shutil.copy2(scaler_path, os.path.join(temporario, os.path.basename(scaler_path)))
+    shutil.copy2(encoder_path, os.path.join(temporario, os.path.basename(encoder_path)))
+    _gravar_json(os.path.join(temporario, "features.json"), especificacao_features())
+    _gravar_json(os.path.join(temporario, "metricas.json"), resultados)
+
+    manifesto["arquivos"] = {nome: _sha256(os.path.join(temporario, nome)) for nome in sorted(os.listdir(temporario))}
+    _gravar_json(os.path.join(temporario, "manifesto.json"), manifesto)
+    os.replace(temporario, pasta)
+    return pasta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Treina a floresta e gera um bundle versionado do modelo.")
+    parser.add_argument("dataset", nargs="?", default=DATASET_PATH, help="Dataset preparado (.parquet, pasta ou .csv)")
+    parser.add_argument("--alvo", default="duracao_dias")
+    parser.add_argument("--busca", default=None,
+                        help="CSV do busca_hiperparametros.py: usa a melhor configuração encontrada")
+    parser.add_argument("--arvores", type=int, default=None, help="Sobrescreve n_estimators")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42, help="Semente do split treino/teste")
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--cache", default=FEATURES_CACHE_DIR, help="Pasta do cache de matrizes de features")
+    parser.add_argument("--saida", default=BUNDLES_DIR, help="Pasta onde o bundle é criado")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    X, y, info = carregar_matriz(args.dataset, args.cache, args.alvo)
+    tempo_preparo = time.perf_counter() - inicio
+    origem = "cache (mmap)" if info["cache"] else "dataset"
+    print(f"Matriz {X.shape} de {origem} em {tempo_preparo:.2f}s (chave {info['chave']})")
+
+    parametros = parametros_da_busca(args.busca) if args.busca else dict(PARAMETROS_PADRAO)
+    if args.arvores:
+        parametros["n_estimators"] = args.arvores
+    # Acima do número de features o sklearn recusa o valor
+    parametros["max_features"] = min(int(parametros["max_features"]), X.shape[1])
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=args.test_size, random_state=args.seed)
+
+    inicio = time.perf_counter()
+    model = RandomForestRegressor(**parametros, n_jobs=args.n_jobs)
+    model.fit(X_train, y_train)
+    tempo_treino = time.perf_counter() - inicio
+    print(f"Treino: {tempo_treino:.1f}s")
+
+    resultados = {"treino": metricas(y_train, model.predict(X_train)), "teste": metricas(y_test, model.predict(X_test))}
+
+    # Versão: data + hash do que define o modelo (dataset, features e parâmetros)
+    definicao = json.dumps({"matriz": info["chave"], "parametros": parametros, "split": [args.test_size, args.seed]},
+                           sort_keys=True)
+    versao = f"{time.strftime('%Y%m%d-%H%M%S')}_{hashlib.sha256(definicao.encode()).hexdigest()[:8]}"
+
+    manifesto = {
+        "versao": versao,
+        "criado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "dataset": {"caminho": os.path.abspath(args.dataset), "sha256": info["hash_dataset"],
+                    "linhas": int(len(y)), "alvo": args.alvo},
+        "matriz_features": {"chave": info["chave"], "do_cache": info["cache"]},
+        "versao_features": especificacao_features()["versao"],
+        "parametros": parametros,
+        "split": {"test_size": args.test_size, "random_state": args.seed},
+        "tempos_s": {"preparo": tempo_preparo, "treino": tempo_treino},
+        "ambiente": {"python": platform.python_version(), "numpy": np.__version__, "sklearn": sklearn.__version__},
+    }
+
+    os.makedirs(args.saida, exist_ok=True)
+    pasta = gravar_bundle(os.path.join(args.saida, versao), model, manifesto, resultados)
+
+    teste = resultados["teste"]
+    print(f"MAE teste: {teste['MAE']:.4f} | RMSE teste: {teste['RMSE']:.4f} | R² teste: {teste['R2']:.3f}")
+    print(f"✅ Bundle salvo em {pasta}")
+    print(f"Para servir no app: AGILE_ESTIMATOR_MODELO={os.path.abspath(os.path.join(pasta, 'agile_estimator.pkl'))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+TRELLO_API = "https://api.trello.com/1"
+
+# Limites do Trello: 100 requisições a cada 10s por token (300 por key)
+LIMITE_REQUISICOES = 100
+JANELA_SEGUNDOS = 10
+
+# Máximo de URLs por chamada a /1/batch
+LIMITE_LOTE = 10
+
+
+class LimitadorTaxa:
+    """Token bucket: até `capacidade` requisições em rajada, repostas a `taxa` por segundo."""
+
+    def __init__(self, capacidade=LIMITE_REQUISICOES, taxa=LIMITE_REQUISICOES / JANELA_SEGUNDOS):
+        self.capacidade = capacidade
+        self.taxa = taxa
+        self._fichas = float(capacidade)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def adquirir(self):
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._fichas = min(self.capacidade, self._fichas + (agora - self._ultimo) * self.taxa)
+                self._ultimo = agora
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+                espera = (1 - self._fichas) / self.taxa
+            time.sleep(espera)
+
+
+class ClienteTrello:
+    """
+    Cliente da API do Trello com uma Session compartilhada (pool de conexões),
+    limitador de taxa e novas tentativas com backoff exponencial em 429/5xx.
+    POSTs só são refeitos em 429 (o Trello recusou antes de processar): depois
+    de um 5xx ou de uma resposta perdida o objeto pode ter sido criado, e cabe
+    ao chamador conferir antes de reenviar.
+    Seguro para uso em várias threads.
+    """
+
+    def __init__(self, key, token, base_url=TRELLO_API, max_conexoes=10,
+                 limitador=None, tentativas=5, backoff=0.5, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.auth = {"key": key, "token": token}
+        self.limitador = limitador or LimitadorTaxa()
+        self.tentativas = tentativas
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_conexoes, pool_maxsize=max_conexoes)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _url(self, caminho):
+        if caminho.startswith("http"):
+            return caminho
+        return f"{self.base_url}/{caminho.lstrip('/')}"
+
+    def requisitar(self, metodo, caminho, params=None, data=None):
+        params = {**self.auth, **(params or {})}
+        idempotente = metodo in ("GET", "HEAD", "PUT", "DELETE")
+
+        for tentativa in range(self.tentativas):
+            self.limitador.adquirir()
+            try:
+                response = self.session.request(
+                    metodo, self._url(caminho), params=params, data=data, timeout=self.timeout
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if not idempotente or tentativa == self.tentativas - 1:
+                    raise
+                time.sleep(self.backoff * 2 ** tentativa)
+                continue
+
+            if response.status_code == 429 or (idempotente and response.status_code >= 500):
+                if tentativa == self.tentativas - 1:
+                    response.raise_for_status()
+                espera = response.headers.get("Retry-After")
+                time.sleep(float(espera) if espera else self.backoff * 2 ** tentativa)
+                continue
+
+            response.raise_for_status()
+            return response.json()
+
+    def get(self, caminho, **params):
+        return self.requisitar("GET", caminho, params=params)
+
+    def _get_tolerante(self, caminho, params, tolerar_404):
+        try:
+            return self.get(caminho, **params)
+        except requests.exceptions.HTTPError as err:
+            if tolerar_404 and err.response is not None and err.response.status_code == 404:
+                return None
+            raise
+
+    def get_lote(self, requisicoes, tolerar_404=False):
+        """
+        Até LIMITE_LOTE GETs `(caminho, params)` numa única chamada a /1/batch.
+        Sub-requisições que falharem dentro do lote são refeitas
+        individualmente, com as novas tentativas de `requisitar`. Com
+        `tolerar_404`, um objeto que não existe mais vira None no resultado
+        em vez de erro.
+        """
+        if len(requisicoes) == 1:
+            caminho, params = requisicoes[0]
+            return [self._get_tolerante(caminho, params, tolerar_404)]
+
+        rotas = []
+        for caminho, params in requisicoes:
+            rota = "/" + caminho.lstrip("/")
+            rotas.append(f"{rota}?{urlencode(params)}" if params else rota)
+        respostas = self.get("batch", urls=",".join(rotas))
+
+        resultados = []
+        for (caminho, params), resposta in zip(requisicoes, respostas):
+            if "200" in resposta:
+                resultados.append(resposta["200"])
+            elif tolerar_404 and resposta.get("statusCode") == 404:
+                resultados.append(None)
+            else:
+                resultados.append(self._get_tolerante(caminho, params, tolerar_404))
+        return resultados
+
+    def iterar_varios(self, requisicoes, max_workers=4, tolerar_404=False):
+        """
+        Executa GETs independentes agrupados em lotes de até LIMITE_LOTE,
+        `max_workers` lotes em paralelo. Gera `(indice, resultado)` à medida
+        que cada lote termina, para o chamador processar sem esperar o resto.
+        """
+        requisicoes = list(requisicoes)
+        lotes = [range(i, min(i + LIMITE_LOTE, len(requisicoes))) for i in range(0, len(requisicoes), LIMITE_LOTE)]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futuros = {executor.submit(self.get_lote, [requisicoes[i] for i in lote], tolerar_404): lote
+                       for lote in lotes}
+            for futuro in as_completed(futuros):
+                yield from zip(futuros[futuro], futuro.result())
+
+    def get_varios(self, requisicoes, max_workers=4, tolerar_404=False):
+        """Como `iterar_varios`, mas retorna a lista de resultados na ordem das requisições."""
+        resultados = [None] * len(requisicoes)
+        for indice, resultado in self.iterar_varios(requisicoes, max_workers, tolerar_404):
+            resultados[indice] = resultado
+        return resultados
+
+    def post(self, caminho, **data):
+        return self.requisitar("POST", caminho, data=data)
+
+    def close(self):
+        self.session.close()
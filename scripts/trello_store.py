@@ -0,0 +1,335 @@
+import argparse
+import os
+import sqlite3
+import time
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from trello_client import TRELLO_API, ClienteTrello
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # scripts/
+STORE_PATH = os.getenv("AGILE_ESTIMATOR_TRELLO_STORE",
+                       os.path.join(BASE_DIR, "..", "artifacts", "cache", "trello.sqlite"))
+
+# -------------------------------
+# Base local (SQLite) de boards, listas, cards e comentários do Trello
+# -------------------------------
+# A primeira sincronização de um board baixa os cards e os comentários (do
+# histórico de actions, só as commentCard); as seguintes usam o ID da
+# última action vista (high-water mark) para pedir só as actions novas,
+# buscam apenas os cards tocados por elas e aplicam tudo como upsert.
+# Cards apagados, movidos para outro board ou que respondem 404 saem da base;
+# comentários editados/apagados e etiquetas renomeadas também são aplicados.
+
+CARD_FIELDS = "id,name,url,due,labels,idList,idBoard,closed,dateLastActivity"
+LIMITE_ACOES = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS boards (
+    id TEXT PRIMARY KEY, name TEXT
+);
+CREATE TABLE IF NOT EXISTS lists (
+    id TEXT PRIMARY KEY, board_id TEXT NOT NULL, name TEXT, closed INTEGER, pos REAL
+);
+CREATE TABLE IF NOT EXISTS cards (
+    id TEXT PRIMARY KEY, board_id TEXT NOT NULL, list_id TEXT, name TEXT, url TEXT, due TEXT,
+    closed INTEGER, date_last_activity TEXT, labels TEXT, members TEXT
+);
+CREATE TABLE IF NOT EXISTS custom_fields (
+    id TEXT PRIMARY KEY, board_id TEXT NOT NULL, name TEXT
+);
+CREATE TABLE IF NOT EXISTS custom_field_items (
+    card_id TEXT NOT NULL, custom_field_id TEXT NOT NULL, value TEXT,
+    PRIMARY KEY (card_id, custom_field_id)
+);
+CREATE TABLE IF NOT EXISTS card_labels (
+    card_id TEXT NOT NULL, label_id TEXT NOT NULL,
+    PRIMARY KEY (card_id, label_id)
+);
+CREATE TABLE IF NOT EXISTS comments (
+    id TEXT PRIMARY KEY, board_id TEXT NOT NULL, card_id TEXT, date TEXT, member TEXT, text TEXT
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    board_id TEXT PRIMARY KEY, ultima_acao TEXT, ultima_sync TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_cards_board ON cards (board_id);
+CREATE INDEX IF NOT EXISTS idx_comments_card ON comments (card_id);
+CREATE INDEX IF NOT EXISTS idx_card_labels_label ON card_labels (label_id);
+"""
+
+
+def conectar(caminho=STORE_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    conn = sqlite3.connect(caminho)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# -------------------------------
+# Upserts
+# -------------------------------
+
+def _upsert(conn, tabela, chaves, registros):
+    if not registros:
+        return
+    colunas = list(registros[0].keys())
+    atualizacao = ", ".join(f"{c} = excluded.{c}" for c in colunas if c not in chaves)
+    conn.executemany(
+        f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})"
+        f" ON CONFLICT ({', '.join(chaves)}) " + (f"DO UPDATE SET {atualizacao}" if atualizacao else "DO NOTHING"),
+        [tuple(r[c] for c in colunas) for r in registros],
+    )
+
+
+def _valor_custom_field(cfi):
+    value = cfi.get("value")
+    if value:
+        return str(list(value.values())[0])  # pode ser texto, número, etc.
+    return cfi.get("idValue")
+
+
+def _aplicar_cards(conn, board_id, cards):
+    _upsert(conn, "cards", ["id"], [{
+        "id": card["id"],
+        "board_id": board_id,
+        "list_id": card.get("idList"),
+        "name": card.get("name"),
+        "url": card.get("url"),
+        "due": card.get("due"),
+        "closed": int(bool(card.get("closed"))),
+        "date_last_activity": card.get("dateLastActivity"),
+        "labels": ", ".join(label.get("name", "") for label in card.get("labels", [])),
+        "members": ", ".join(member.get("fullName", "") for member in card.get("members", [])),
+    } for card in cards])
+
+    # Os itens de custom field do card são substituídos pelos atuais
+    conn.executemany("DELETE FROM custom_field_items WHERE card_id = ?", [(card["id"],) for card in cards])
+    _upsert(conn, "custom_field_items", ["card_id", "custom_field_id"], [{
+        "card_id": card["id"],
+        "custom_field_id": cfi.get("idCustomField"),
+        "value": _valor_custom_field(cfi),
+    } for card in cards for cfi in card.get("customFieldItems", [])])
+
+    # Etiquetas por ID, para achar os cards de uma etiqueta renomeada
+    conn.executemany("DELETE FROM card_labels WHERE card_id = ?", [(card["id"],) for card in cards])
+    _upsert(conn, "card_labels", ["card_id", "label_id"], [
+        {"card_id": card["id"], "label_id": label["id"]}
+        for card in cards for label in card.get("labels", []) if label.get("id")
+    ])
+
+
+def _remover_cards(conn, card_ids):
+    for tabela, coluna in [("cards", "id"), ("custom_field_items", "card_id"),
+                           ("card_labels", "card_id"), ("comments", "card_id")]:
+        conn.executemany(f"DELETE FROM {tabela} WHERE {coluna} = ?", [(c,) for c in card_ids])
+
+
+def _aplicar_comentarios(conn, board_id, acoes):
+    _upsert(conn, "comments", ["id"], [{
+        "id": acao["id"],
+        "board_id": board_id,
+        "card_id": acao.get("data", {}).get("card", {}).get("id"),
+        "date": acao.get("date"),
+        "member": acao.get("memberCreator", {}).get("fullName"),
+        "text": acao.get("data", {}).get("text"),
+    } for acao in acoes if acao.get("type") == "commentCard"])
+
+    # Edições e exclusões depois das inserções, da mais antiga para a mais recente
+    for acao in reversed(acoes):
+        comentario = acao.get("data", {}).get("action", {})
+        if acao.get("type") == "updateComment":
+            conn.execute("UPDATE comments SET text = ? WHERE id = ?", (comentario.get("text"), comentario.get("id")))
+        elif acao.get("type") == "deleteComment":
+            conn.execute("DELETE FROM comments WHERE id = ?", (comentario.get("id"),))
+
+
+# -------------------------------
+# Sincronização
+# -------------------------------
+
+def buscar_acoes(cliente, board_id, since=None, filtro="all"):
+    """Todas as actions do board desde `since`, paginando com `before`."""
+    acoes = []
+    params = {"limit": LIMITE_ACOES, "filter": filtro}
+    if since:
+        params["since"] = since
+
+    while True:
+        pagina = cliente.get(f"boards/{board_id}/actions", **params)
+        acoes.extend(pagina)
+        if len(pagina) < LIMITE_ACOES:
+            return acoes
+        params["before"] = pagina[-1]["id"]
+
+
+def _sincronizar_estrutura(conn, cliente, board_id):
+    board = cliente.get(f"boards/{board_id}", fields="id,name")
+    _upsert(conn, "boards", ["id"], [{"id": board["id"], "name": board.get("name")}])
+
+    listas = cliente.get(f"boards/{board_id}/lists", filter="all")
+    _upsert(conn, "lists", ["id"], [{
+        "id": lista["id"], "board_id": board_id, "name": lista.get("name"),
+        "closed": int(bool(lista.get("closed"))), "pos": lista.get("pos"),
+    } for lista in listas])
+
+    campos = cliente.get(f"boards/{board_id}/customFields")
+    _upsert(conn, "custom_fields", ["id"], [
+        {"id": campo["id"], "board_id": board_id, "name": campo.get("name")} for campo in campos
+    ])
+
+
+def sincronizar_board(conn, cliente, board_id, max_workers=8):
+    """
+    Sincroniza o board na base local. Retorna um resumo com o modo (completa
+    ou delta) e a quantidade de actions e cards aplicados e de cards removidos.
+    """
+    linha = conn.execute("SELECT ultima_acao FROM sync_state WHERE board_id = ?", (board_id,)).fetchone()
+    ultima_acao = linha[0] if linha else None
+
+    # Listas e custom fields são pequenos: sempre atualizados por completo
+    _sincronizar_estrutura(conn, cliente, board_id)
+
+    removidos = set()
+    if ultima_acao is None:
+        # Marca d'água antes dos cards: o que mudar entre as chamadas entra no
+        # próximo delta. Do histórico só os comentários são baixados
+        recente = cliente.get(f"boards/{board_id}/actions", limit=1)
+        acoes = buscar_acoes(cliente, board_id, filtro="commentCard")
+        cards = cliente.get(f"boards/{board_id}/cards", filter="all", fields=CARD_FIELDS,
+                            members="true", member_fields="id,username,fullName", customFieldItems="true")
+        _aplicar_cards(conn, board_id, cards)
+        _aplicar_comentarios(conn, board_id, acoes)
+        ultima_acao = recente[0]["id"] if recente else None
+        modo = "completa"
+    else:
+        acoes = buscar_acoes(cliente, board_id, since=ultima_acao)
+
+        # A action mais recente de cada card decide se ele saiu do board
+        ultima_por_card = {}
+        for acao in acoes:
+            card = acao.get("data", {}).get("card")
+            if card and card.get("id"):
+                ultima_por_card.setdefault(card["id"], acao.get("type"))
+        removidos = {c for c, tipo in ultima_por_card.items() if tipo in ("deleteCard", "moveCardFromBoard")}
+        alterados = set(ultima_por_card) - removidos
+
+        # Etiqueta renomeada ou apagada: os cards que a usam são buscados de novo
+        etiquetas = [a["data"]["label"]["id"] for a in acoes
+                     if a.get("type") in ("updateLabel", "deleteLabel") and "label" in a.get("data", {})]
+        alterados |= {linha[0] for linha in conn.execute(
+            f"SELECT l.card_id FROM card_labels l JOIN cards c ON c.id = l.card_id"
+            f" WHERE c.board_id = ? AND l.label_id IN ({', '.join('?' * len(etiquetas))})",
+            (board_id, *etiquetas),
+        )} - removidos
+
+        # Cards alterados em chamadas /1/batch de até 10; 404 é card apagado
+        # e outro idBoard é card movido para outro board
+        params = {"fields": CARD_FIELDS, "members": "true",
+                  "member_fields": "id,username,fullName", "customFieldItems": "true"}
+        ids = sorted(alterados)
+        buscados = cliente.get_varios([(f"cards/{card_id}", params) for card_id in ids], max_workers,
+                                      tolerar_404=True)
+        cards = [card for card in buscados if card is not None and card.get("idBoard", board_id) == board_id]
+        removidos |= {card_id for card_id, card in zip(ids, buscados)
+                      if card is None or card.get("idBoard", board_id) != board_id}
+
+        _aplicar_cards(conn, board_id, cards)
+        _aplicar_comentarios(conn, board_id, acoes)
+        _remover_cards(conn, removidos)
+        if acoes:
+            ultima_acao = acoes[0]["id"]  # o Trello devolve da mais recente para a mais antiga
+        modo = "delta"
+
+    _upsert(conn, "sync_state", ["board_id"], [{
+        "board_id": board_id,
+        "ultima_acao": ultima_acao,
+        "ultima_sync": pd.Timestamp.now(tz="UTC").isoformat(),
+    }])
+    conn.commit()
+
+    return {"modo": modo, "acoes": len(acoes), "cards": len(cards), "removidos": len(removidos)}
+
+
+# -------------------------------
+# Leitura para o restante do código
+# -------------------------------
+
+def ler_listas(conn, board_id):
+    """Listas do board no formato de listas_boards.csv."""
+    return pd.read_sql_query(
+        "SELECT b.name AS board_name, b.id AS board_id, l.name AS list_name, l.id AS list_id"
+        " FROM lists l JOIN boards b ON b.id = l.board_id"
+        " WHERE l.board_id = ? AND l.closed = 0 ORDER BY l.pos",
+        conn, params=(board_id,),
+    )
+
+
+def ler_cartoes(conn, board_id):
+    """Cards do board no formato de cartoes_por_lista.csv."""
+    cards = pd.read_sql_query(
+        "SELECT c.list_id, l.name AS list_name, c.id AS card_id, c.name AS card_name, c.url AS card_url,"
+        " c.due AS card_due, c.labels AS card_labels, c.members AS card_members"
+        " FROM cards c LEFT JOIN lists l ON l.id = c.list_id"
+        " WHERE c.board_id = ? AND c.closed = 0 ORDER BY l.pos, c.id",
+        conn, params=(board_id,),
+    )
+
+    # Campos customizados viram colunas custom_<nome>
+    itens = pd.read_sql_query(
+        "SELECT i.card_id, 'custom_' || COALESCE(f.name, 'custom_' || i.custom_field_id) AS campo, i.value"
+        " FROM custom_field_items i JOIN cards c ON c.id = i.card_id"
+        " LEFT JOIN custom_fields f ON f.id = i.custom_field_id WHERE c.board_id = ?",
+        conn, params=(board_id,),
+    )
+    if len(itens):
+        cards = cards.merge(itens.pivot(index="card_id", columns="campo", values="value"),
+                            left_on="card_id", right_index=True, how="left")
+
+    comentarios = pd.read_sql_query(
+        "SELECT card_id, COUNT(*) AS qtd_comentarios FROM comments WHERE board_id = ? GROUP BY card_id",
+        conn, params=(board_id,),
+    )
+    cards = cards.merge(comentarios, on="card_id", how="left")
+    cards["qtd_comentarios"] = cards["qtd_comentarios"].fillna(0).astype(int)
+    return cards
+
+
+def ler_comentarios(conn, board_id, tamanho_bloco=10_000):
+    """Comentários do board, um por linha, em blocos de `tamanho_bloco` (formato de comentarios_por_cartao.csv)."""
+    yield from pd.read_sql_query(
+        "SELECT card_id, id AS comment_id, date AS comment_date, member AS comment_member, text AS comment_text"
+        " FROM comments WHERE board_id = ? ORDER BY card_id, date DESC",
+        conn, params=(board_id,), chunksize=tamanho_bloco,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sincroniza um board do Trello na base local (SQLite).")
+    parser.add_argument("--board", default=None, help="ID do board (padrão: BOARD_ID do .env)")
+    parser.add_argument("--base", default=STORE_PATH, help="Arquivo SQLite da base local")
+    parser.add_argument("--base-url", default=TRELLO_API, help="URL da API (ex.: servidor local)")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    load_dotenv()
+    board_id = args.board or os.getenv("BOARD_ID")
+    cliente = ClienteTrello(os.getenv("TRELLO_KEY"), os.getenv("TRELLO_TOKEN"),
+                            base_url=args.base_url, max_conexoes=args.workers)
+    conn = conectar(args.base)
+
+    inicio = time.perf_counter()
+    try:
+        resumo = sincronizar_board(conn, cliente, board_id, max_workers=args.workers)
+    finally:
+        cliente.close()
+    total = conn.execute("SELECT COUNT(*) FROM cards WHERE board_id = ?", (board_id,)).fetchone()[0]
+    conn.close()
+
+    print(f"✅ Sincronização {resumo['modo']} em {time.perf_counter() - inicio:.2f}s: "
+          f"{resumo['acoes']} actions, {resumo['cards']} cards aplicados, {resumo['removidos']} removidos "
+          f"({total} cards na base)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,25 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import pickle
-import joblib
 import altair as alt
 import os
 import re
-
-# -------------------------------
-# Funções auxiliares
-# -------------------------------
-
-def input_metrics(data):
-
-    data["qtd_bugs"] = data["percentual_bugs"] * data["cartoes_previstos"]
-
-    data["qtd_retrabalho"] = data["percentual_retrabalho"] * data["cartoes_previstos"]
-
-    data["carga_cartoes_por_membro"] = data["cartoes_previstos"] / data["qtd_membros"]
-
-    # Criar coluna auxiliar com o número da sprint
-
-    return data[['produtividade_estimada',
-       'tipo_dominio', 'complexidade_media',
-       'qtd_bugs', 'qtd_retrabalho',
-       'carga_cartoes_por_membro']]
-
-def preprocess_input(data, scaler, label_encoder):
-
-    # realizando o encoding do domino e escalonamento da produtividade_estimada
-    data['tipo_dominio'] = label_encoder.transform(data['tipo_dominio'])
-    
-    columns_to_scale = ['produtividade_estimada','story_points_previstos']
-    data[columns_to_scale] = scaler.transform(data[columns_to_scale])
-
-    data = input_metrics(data)
-
-    return data
-
-def load_model(model_path):
-    with open(model_path, 'rb') as file:
-        return pickle.load(file)
-    
+import time
+
+from scripts_app import artefatos
+from scripts_app.floresta_compilada import FlorestaCompilada, carregar_floresta_compilada
+from scripts_app.cache_predicoes import obter_cache, prever_com_cache
+from scripts_app.preprocessamento import COLUNAS_INTERVALO, FEATURES_MODELO, PipelineFeatures, prever_intervalos
+from scripts_app.get_public_trello_board import iterar_cartoes_publicos
+from scripts_app.agregacao_sprints import AgregadorSprints
+from scripts_app.io_datasets import ler_upload, tamanho_upload, tipar_df
+from scripts_app.dados_graficos import COLUNAS_GRAFICOS, agregar_graficos
+from scripts_app.indice_filtros import IndiceFiltros
+from scripts_app.dataset_sessao import MB, DatasetSessao, formatar_bytes
+from scripts_app.exportacao import FORMATOS, LINHAS_POR_PARTE, caminhos_exportacao, exportar
+from scripts_app import explicacoes
+
+inicio_execucao = time.perf_counter()
 
 # -------------------------------
 # Carregar modelo e transformadores
@@ -51,13 +29,37 @@ def load_model(model_path):
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # streamlit_app/
 ARTIFACTS_DIR = os.path.join(BASE_DIR, "..", "artifacts")
 
-MODEL_PATH = os.path.join(ARTIFACTS_DIR, "model", "agile_estimator.pkl")
+# Variante do modelo servida pelo app (ex.: uma das versões compactas geradas por
+# scripts/compactar_floresta.py). Aceita o nome do arquivo em artifacts/model ou um caminho.
+MODEL_FILE = os.getenv("AGILE_ESTIMATOR_MODELO", "agile_estimator.pkl")
+MODEL_PATH = os.path.join(ARTIFACTS_DIR, "model", MODEL_FILE)
 SCALER_PATH = os.path.join(ARTIFACTS_DIR, "scaler", "standard_scaler_produtividade_estimada_story_points_previstos.pkl")
 ENCODER_PATH = os.path.join(ARTIFACTS_DIR, "encoder", "label_encoder_tipo_dominio.pkl")
 
-model = load_model(MODEL_PATH)
-scaler = joblib.load(SCALER_PATH)
-label_encoder = joblib.load(ENCODER_PATH)
+# Cache persistente de previsões (chave: hash da linha + versão do modelo)
+CACHE_PATH = os.getenv("AGILE_ESTIMATOR_CACHE", os.path.join(ARTIFACTS_DIR, "cache", "predicoes.sqlite"))
+CACHE_MAX_ENTRADAS = int(os.getenv("AGILE_ESTIMATOR_CACHE_MAX", "2000000"))
+
+# Limite de memória por sessão (dataset compactado + previsões), para que um
+# upload muito grande seja recusado em vez de esgotar a memória do servidor
+SESSAO_MAX_MB = float(os.getenv("AGILE_ESTIMATOR_SESSAO_MAX_MB", "1024"))
+
+# Arquivos do "Baixar resultados" (gerados sob demanda, um por versão dos dados + previsões)
+EXPORTACOES_DIR = os.getenv("AGILE_ESTIMATOR_EXPORTACOES", os.path.join(ARTIFACTS_DIR, "cache", "exportacoes"))
+
+# Estado da sessão que depende do dataset carregado (descartado quando a origem muda)
+CHAVES_DATASET = ["dataset", "aviso_dataset", "erro_dataset", "explicacao", "indice_filtros", "versao_indice",
+                  "range_filter", "dominio_filter", "sprint_filter", "pagina_explicacoes", "sprint_explicacao"]
+
+# Linhas por página na tabela de explicações (o TreeSHAP só roda nas linhas pedidas)
+TAMANHO_PAGINA_EXPLICACOES = 20
+
+# Os artefatos ficam em memória uma vez por processo (compartilhados entre sessões)
+# e são recarregados só quando o arquivo muda. O carregamento começa em segundo
+# plano para que a página seja desenhada sem esperar o modelo.
+artefatos.pre_carregar(MODEL_PATH, carregar_floresta_compilada)
+artefatos.pre_carregar(SCALER_PATH, artefatos.load_joblib)
+artefatos.pre_carregar(ENCODER_PATH, artefatos.load_joblib)
 
 
 # CSS para personalizar o tooltip em tema escuro (fundo preto)
@@ -80,6 +82,25 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+
+@st.cache_data(ttl=300, show_spinner=False)
+def carregar_sprints_trello(board_url):
+    # Os cards chegam em blocos do parser e entram no agregador bloco a bloco
+    agregador = AgregadorSprints()
+    for bloco in iterar_cartoes_publicos(board_url):
+        agregador.atualizar(pd.DataFrame(bloco))
+    return agregador.sprints()
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def dados_graficos_filtrados(_data, _indice, versao, faixa, dominios, sprints):
+    # `_data` e `_indice` não entram no hash (seria caro com milhões de linhas):
+    # a chave é a versão das previsões mais o estado dos filtros
+    posicoes = _indice.filtrar(faixa, dominios, sprints)
+    filtrado = _data.take(posicoes)
+    return len(filtrado), agregar_graficos(filtrado, _indice.sprint_num[posicoes])
+
+
 # -------------------------------
 # Interface principal
 # -------------------------------
@@ -91,38 +112,87 @@ st.write("Estimativa de produtividade baseada em dados históricos do Trello.")
 csv, trello = st.tabs(["Upload CSV", "Puxar do Trello"])
 
 with csv:
-    uploaded_file = st.file_uploader("📂 Carregue seu arquivo CSV", type="csv")
+    uploaded_file = st.file_uploader("📂 Carregue seu arquivo CSV", type=["csv", "parquet"])
+
+# Origem dos dados: ("trello", board_id) ou ("arquivo", id do upload)
+origem = None
 
 with trello:
 
     uploaded_trello = st.text_input(
         "📋 Carregue suas sprints do Trello",
-        placeholder="https://api.trello.com/1/boards/meu_board"
+        placeholder="https://trello.com/b/<board_id>/meu_board"
     )
+    st.caption("Board público: cada lista vira uma sprint, montada a partir dos cards (labels, membros e campos customizados).")
 
-    # Regex para validar link do Trello
-    trello_regex = r"^https://api\.trello\.com/1/boards/[a-zA-Z0-9_-]+$"
+    # Regex para validar link do Trello (público ou da API)
+    trello_regex = r"^https://(?:trello\.com/b|api\.trello\.com/1/boards)/([a-zA-Z0-9_-]+)"
 
     if uploaded_trello:
 
-        if re.match(trello_regex, uploaded_trello):
+        match = re.match(trello_regex, uploaded_trello)
+        if match:
             st.markdown(f"✅ Link do Trello válido: {uploaded_trello}")
-            #  lógica para conectar ao board get_trello_cards_public()
-            uploaded_file = uploaded_trello
+            origem = ("trello", match.group(1))
 
         else:
-            st.error("❌ Link inválido! Certifique-se de que segue o formato: https://api.trello.com/1/boards/<board_id>")
+            st.error("❌ Link inválido! Certifique-se de que segue o formato: https://trello.com/b/<board_id>")
 
 # --- depois do upload do arquivo ---
 
-if  uploaded_file is not None:
-    data = pd.read_csv(uploaded_file)
+if origem is None and uploaded_file is not None:
+    origem = ("arquivo", uploaded_file.file_id)
+
+# O dataset da sessão (a única cópia dos dados) só é montado quando a origem
+# muda: outro arquivo, outro board ou a troca entre eles. Nos reruns seguintes
+# nada é lido de novo, nem quando a origem foi recusada.
+if st.session_state.get("origem_dataset") != origem:
+    for chave in CHAVES_DATASET:
+        st.session_state.pop(chave, None)
+    st.session_state.origem_dataset = origem
+
+    data = None
+    if origem is not None and origem[0] == "trello":
+        try:
+            with st.spinner("Lendo os cards do board..."):
+                data = tipar_df(carregar_sprints_trello(f"https://trello.com/b/{origem[1]}"))
+            st.session_state.aviso_dataset = f"{len(data)} sprints montadas a partir dos cards do board."
+        except Exception as e:
+            st.session_state.erro_dataset = f"❌ Não foi possível ler o board: {e}"
+
+    elif origem is not None:
+        try:
+            # Tamanho conferido antes de ler: um arquivo acima do limite nem é carregado
+            tamanho = tamanho_upload(uploaded_file)
+            if tamanho > SESSAO_MAX_MB * MB:
+                st.session_state.erro_dataset = (
+                    f"❌ Arquivo grande demais para uma sessão: {formatar_bytes(tamanho)} "
+                    f"(limite de {formatar_bytes(SESSAO_MAX_MB * MB)})."
+                )
+            else:
+                # Colunas já no esquema tipado (domínio categórico, datas, inteiros pequenos)
+                data = ler_upload(uploaded_file)
+        except Exception as e:
+            st.session_state.erro_dataset = f"❌ Arquivo fora do formato esperado: {e}"
+
+    # guarda uma cópia compactada dos dados no session_state (a única da sessão)
+    if data is not None and len(data):
+        try:
+            st.session_state.dataset = DatasetSessao(data, SESSAO_MAX_MB)
+        except ValueError as e:
+            st.session_state.erro_dataset = f"❌ {e}"
+    del data
+
+if "aviso_dataset" in st.session_state:
+    with trello:
+        st.write(st.session_state.aviso_dataset)
+
+if "erro_dataset" in st.session_state:
+    st.error(st.session_state.erro_dataset)
+
+if "dataset" in st.session_state:
     st.success("✅ Dados carregados com sucesso!")
-
-    # guarda os dados brutos no session_state
-    if "data" not in st.session_state:
-
-        st.session_state.data = data.copy()
+    dataset = st.session_state.dataset
 
     # Tabs
     tab1, tab2, tab3 = st.tabs(["📋 Dados", "📈 Estimativas", "📊 Visualizações"])
@@ -131,67 +201,210 @@ if  uploaded_file is not None:
         columns = ["sprint_id","data_inicio","qtd_membros","complexidade_media",]
 
         st.subheader("Pré-visualização dos dados")
-        st.dataframe(st.session_state.data[columns].head(50))
-        st.write(f"Total de registros: {len(st.session_state.data)}")
-        st.dataframe(st.session_state.data.columns,
+        st.dataframe(dataset.visao(columns).head(50))
+        st.write(f"Total de registros: {len(dataset)}")
+        st.dataframe(dataset.colunas,
                      width=300)  # mostra as colunas carregadas
 
 
     with tab2:
-        
+
+        calcular_intervalos = st.checkbox(
+            "Calcular faixa P10–P90",
+            key="calcular_intervalos",
+            help="Quantis das previsões das árvores da floresta para cada sprint (P10, P50 e P90). "
+                 "Passa todas as sprints pelo modelo, sem o cache de previsões.",
+        )
+
         if st.button("⚡ Fazer Estimativa"):
             try:
-                processed_data = preprocess_input(
-                    st.session_state.data.copy(), scaler, label_encoder
-                )
-                predictions = model.predict(processed_data)
-                st.session_state.data["produtividade_prevista"] = predictions  # <-- GUARDA NO SESSION_STATE
+                inicio_artefatos = time.perf_counter()
+                with st.spinner("Carregando modelo..."):
+                    # Floresta compilada em arrays planos (mesmas previsões do sklearn)
+                    artefato_modelo = artefatos.obter(MODEL_PATH, carregar_floresta_compilada)
+                    model = artefato_modelo.valor
+                    scaler = artefatos.obter(SCALER_PATH, artefatos.load_joblib).valor
+                    label_encoder = artefatos.obter(ENCODER_PATH, artefatos.load_joblib).valor
+                st.session_state.tempo_artefatos = time.perf_counter() - inicio_artefatos
+
+                # Matriz float32 do modelo montada sem copiar o DataFrame
+                pipeline = PipelineFeatures(scaler, label_encoder)
+                X, desconhecidos = pipeline.transform(dataset.visao())
+                # Só as sprints novas ou alteradas passam pelo modelo
+                cache = obter_cache(CACHE_PATH, CACHE_MAX_ENTRADAS)
+                intervals = None
+                if calcular_intervalos and isinstance(model, FlorestaCompilada):
+                    # Média e quantis saem da mesma passada pelas árvores
+                    with st.spinner("Calculando a faixa das estimativas..."):
+                        predictions, intervals = prever_intervalos(model, X, desconhecidos)
+                else:
+                    if calcular_intervalos:
+                        st.warning("⚠️ O modelo servido não é uma floresta: a faixa P10–P90 não está disponível.")
+                    predictions = prever_com_cache(cache, artefato_modelo.versao, model, X, desconhecidos)
+                # Previsões num array à parte (com versão nova, que identifica o cache dos gráficos)
+                dataset.definir_predicoes(predictions, intervals)
+
+                if desconhecidos.any():
+                    dominios = list(pd.unique(dataset.coluna("tipo_dominio")[desconhecidos]))
+                    st.warning(f"⚠️ {int(desconhecidos.sum())} sprint(s) com domínio desconhecido {dominios} ficaram sem estimativa.")
 
                 st.success("✅ Estimativas calculadas!")
-                st.dataframe(st.session_state.data.head(50))
-
-                csv = st.session_state.data.to_csv(index=False).encode("utf-8")
-                st.download_button(
-                    label="📥 Baixar resultados",
-                    data=csv,
-                    file_name="estimativas_produtividade.csv",
-                    mime="text/csv",
-                )
+                st.dataframe(dataset.com_predicoes().head(50))
             except Exception as e:
                 st.error(f"Erro ao processar os dados: {e}")
 
+        if dataset.predicoes is not None:
+            # O arquivo só é montado quando pedido (em blocos, já comprimido) e
+            # fica em disco por versão dos dados + previsões; o botão de download
+            # carrega em memória só a parte escolhida
+            formato = st.radio(
+                "Formato do arquivo",
+                list(FORMATOS),
+                format_func=lambda f: FORMATOS[f]["rotulo"],
+                horizontal=True,
+                key="formato_exportacao",
+            )
+            caminhos_arquivo = caminhos_exportacao(EXPORTACOES_DIR, dataset, formato)
+            pronto = all(os.path.exists(caminho) for caminho in caminhos_arquivo)
+            if not pronto and st.button("📦 Preparar arquivo"):
+                try:
+                    with st.spinner("Gerando o arquivo..."):
+                        exportar(dataset, formato, EXPORTACOES_DIR)
+                    pronto = True
+                except Exception as e:
+                    st.error(f"Erro ao gerar o arquivo: {e}")
+            if pronto:
+                parte = 0
+                nome_arquivo = f"estimativas_produtividade.{formato}"
+                if len(caminhos_arquivo) > 1:
+                    parte = st.selectbox(
+                        "Parte do arquivo",
+                        range(len(caminhos_arquivo)),
+                        format_func=lambda k: f"{k + 1} de {len(caminhos_arquivo)}",
+                        help=f"Cada parte é um arquivo completo com até {LINHAS_POR_PARTE} sprints.",
+                    )
+                    nome_arquivo = f"estimativas_produtividade_parte{parte + 1}de{len(caminhos_arquivo)}.{formato}"
+                try:
+                    with open(caminhos_arquivo[parte], "rb") as arquivo:
+                        st.download_button(
+                            label="📥 Baixar resultados",
+                            data=arquivo,
+                            file_name=nome_arquivo,
+                            mime=FORMATOS[formato]["mime"],
+                        )
+                except FileNotFoundError:
+                    # Apagado pela limpeza de outra sessão entre a conferência e a leitura
+                    st.warning("O arquivo expirou. Clique em 📦 Preparar arquivo para gerá-lo de novo.")
+
+        if dataset.predicoes is not None:
+            st.subheader("🔍 Por que esta estimativa?")
+            st.caption("Contribuição de cada feature (TreeSHAP) para a estimativa: quanto ela soma ou tira do valor base do modelo.")
+
+            if not explicacoes.shap_disponivel():
+                st.info("Instale o pacote `shap` para ver as explicações das estimativas.")
+            else:
+                n_paginas = -(-len(dataset) // TAMANHO_PAGINA_EXPLICACOES)
+                pagina = 1
+                if n_paginas > 1:
+                    pagina = st.number_input("Página", min_value=1, max_value=n_paginas, value=1, key="pagina_explicacoes")
+                inicio_pagina = (pagina - 1) * TAMANHO_PAGINA_EXPLICACOES
+                posicoes = np.arange(inicio_pagina, min(inicio_pagina + TAMANHO_PAGINA_EXPLICACOES, len(dataset)))
+
+                # Selecione linhas na tabela para explicar só elas; sem seleção, explica a página
+                evento = st.dataframe(
+                    dataset.com_predicoes(["sprint_id", "tipo_dominio", "produtividade_prevista"]).iloc[posicoes],
+                    on_select="rerun",
+                    selection_mode="multi-row",
+                    key=f"tabela_explicacoes_{pagina}",
+                )
+                if evento.selection.rows:
+                    posicoes = posicoes[evento.selection.rows]
+                # Sprints sem estimativa (domínio desconhecido) não têm o que explicar
+                posicoes = posicoes[~np.isnan(dataset.predicoes[posicoes])]
+
+                segundo_plano = st.checkbox("Calcular em segundo plano", value=True, key="explicacoes_segundo_plano")
+                rotulo = "as sprints selecionadas" if evento.selection.rows else "esta página"
+                if st.button(f"🔍 Explicar {rotulo}", disabled=not len(posicoes)):
+                    try:
+                        scaler = artefatos.obter(SCALER_PATH, artefatos.load_joblib).valor
+                        label_encoder = artefatos.obter(ENCODER_PATH, artefatos.load_joblib).valor
+                        # Matriz do modelo só das linhas pedidas
+                        X_explicar, _ = PipelineFeatures(scaler, label_encoder).transform(dataset.visao().iloc[posicoes])
+                        futuro = explicacoes.explicar_linhas(MODEL_PATH, X_explicar, segundo_plano)
+                        st.session_state.explicacao = (dataset.versao_predicoes, posicoes, futuro)
+                    except Exception as e:
+                        st.error(f"Erro ao preparar as explicações: {e}")
+
+                explicacao = st.session_state.get("explicacao")
+                if explicacao is not None and explicacao[0] == dataset.versao_predicoes:
+                    _, posicoes_explicadas, futuro = explicacao
+                    if not futuro.done():
+                        st.info("⏳ Calculando as explicações em segundo plano...")
+                        st.button("🔄 Atualizar")
+                    elif futuro.exception() is not None:
+                        st.error(f"Erro ao calcular as explicações: {futuro.exception()}")
+                    else:
+                        contribuicoes, base = futuro.result()
+                        tabela_explicacoes = pd.DataFrame(contribuicoes, columns=FEATURES_MODELO)
+                        tabela_explicacoes.insert(0, "sprint_id", dataset.visao(["sprint_id"])["sprint_id"].iloc[posicoes_explicadas].to_numpy())
+                        tabela_explicacoes.insert(1, "produtividade_prevista", dataset.predicoes[posicoes_explicadas])
+                        st.write(f"Valor base do modelo: **{base:.2f}**")
+                        st.dataframe(tabela_explicacoes, hide_index=True)
+
+                        sprint_grafico = st.selectbox("Sprint no gráfico", list(tabela_explicacoes["sprint_id"]),
+                                                      key="sprint_explicacao")
+                        linha = tabela_explicacoes.index[tabela_explicacoes["sprint_id"] == sprint_grafico][0]
+                        contribuicoes_sprint = pd.DataFrame({"feature": FEATURES_MODELO, "contribuicao": contribuicoes[linha]})
+                        grafico_explicacao = alt.Chart(contribuicoes_sprint).mark_bar().encode(
+                            x=alt.X("contribuicao:Q", title="Contribuição para a estimativa"),
+                            y=alt.Y("feature:N", sort="-x", title=None),
+                            color=alt.condition("datum.contribuicao > 0", alt.value("#2ca02c"), alt.value("#d62728")),
+                            tooltip=["feature", alt.Tooltip("contribuicao:Q", format=".3f")],
+                        ).properties(height=250)
+                        st.altair_chart(grafico_explicacao, use_container_width=True)
+
         with tab3:
-            if "produtividade_prevista" in st.session_state.data.columns:
-                data = st.session_state.data.copy()
+            if dataset.predicoes is not None:
+                # Visão só com as colunas dos gráficos (sem copiar os dados da sessão)
+                tem_intervalos = dataset.intervalos is not None
+                data = dataset.com_predicoes(COLUNAS_GRAFICOS + (COLUNAS_INTERVALO if tem_intervalos else []))
+
+                # Índice dos filtros: montado uma vez por conjunto de previsões
+                if st.session_state.get("versao_indice") != dataset.versao_predicoes:
+                    st.session_state.indice_filtros = IndiceFiltros(data)
+                    st.session_state.versao_indice = dataset.versao_predicoes
+                indice = st.session_state.indice_filtros
+
                 st.subheader("🔎 Filtros")
 
                 # ------------------ Filtros persistentes ------------------
                 if "range_filter" not in st.session_state:
-                    st.session_state.range_filter = (
-                        float(data["produtividade_prevista"].min()),
-                        float(data["produtividade_prevista"].max()),
-                    )
+                    st.session_state.range_filter = (indice.minimo, indice.maximo)
 
                 if "dominio_filter" not in st.session_state:
-                    st.session_state.dominio_filter = list(data["tipo_dominio"].unique())
-
-                range_filter = st.slider(
-                    "Intervalo da produtividade prevista",
-                    float(data["produtividade_prevista"].min()),
-                    float(data["produtividade_prevista"].max()),
-                    st.session_state.range_filter,
-                    key="range_filter",
-                )
+                    st.session_state.dominio_filter = list(indice.dominios)
+
+                # Com um único valor previsto (ex.: um board com poucas sprints) não há intervalo para filtrar
+                if indice.minimo < indice.maximo:
+                    range_filter = st.slider(
+                        "Intervalo da produtividade prevista",
+                        indice.minimo,
+                        indice.maximo,
+                        st.session_state.range_filter,
+                        key="range_filter",
+                    )
+                else:
+                    range_filter = st.session_state.range_filter
 
                 dominio_filter = st.multiselect(
                     "Selecione o(s) domínio(s)",
-                    list(data["tipo_dominio"].unique()),
+                    list(indice.dominios),
                     default=st.session_state.dominio_filter,
                     key="dominio_filter",
                 )
 
                 # Lista de sprints disponíveis
-                all_sprints = list(data["sprint_id"].unique())
+                all_sprints = list(indice.sprints)
 
                 # Checkbox para selecionar todas
                 select_all = st.checkbox("Selecionar todas as sprints", value=True)
@@ -206,31 +419,25 @@ if  uploaded_file is not None:
                         key="sprint_filter",
                     )
 
-                filtered_data = data[
-                    (data["produtividade_prevista"] >= range_filter[0])
-                    & (data["produtividade_prevista"] <= range_filter[1])
-                    & (data["tipo_dominio"].isin(dominio_filter))
-                    & (data["sprint_id"].isin(sprint_filter))
-                ]
-
-                st.write(f"Mostrando **{len(filtered_data)} registros** após filtros.")
-
-                chart_data = filtered_data.copy()
-                if len(chart_data) > 500:
-                    chart_data = chart_data.sample(500, random_state=42)
+                # Tabelas agregadas sobre todas as linhas filtradas (sem amostragem),
+                # guardadas por estado dos filtros
+                qtd_filtrada, graficos = dados_graficos_filtrados(
+                    data, indice, dataset.versao_predicoes, tuple(range_filter),
+                    tuple(dominio_filter), None if select_all else tuple(sprint_filter),
+                )
 
-                chart_data["sprint_num"] = chart_data["sprint_id"].str.extract("(\d+)").astype(int)
-                chart_data = chart_data.sort_values("sprint_num").reset_index(drop=True)
+                st.write(f"Mostrando **{qtd_filtrada} registros** após filtros.")
 
 
                 st.subheader("📊 Histograma de Produtividade Prevista")
                 st.caption("Mostra quantas vezes cada nível de produtividade aparece, separado por domínio. Útil para enxergar a distribuição geral.")
 
-                hist_chart = alt.Chart(chart_data).mark_bar().encode(
-                    x=alt.X("produtividade_prevista:Q", bin=alt.Bin(maxbins=20), title="Produtividade Prevista"),
-                    y=alt.Y("count()", title="Frequência"),
+                hist_chart = alt.Chart(graficos["histograma"]).mark_bar().encode(
+                    x=alt.X("inicio:Q", bin="binned", title="Produtividade Prevista"),
+                    x2="fim:Q",
+                    y=alt.Y("qtd:Q", stack=True, title="Frequência"),
                     color="tipo_dominio:N",
-                    tooltip=["count()", "tipo_dominio"]
+                    tooltip=[alt.Tooltip("qtd:Q", title="Quantidade"), "tipo_dominio"]
                 ).properties(width=600, height=400)
 
                 st.altair_chart(hist_chart, use_container_width=True)
@@ -240,11 +447,16 @@ if  uploaded_file is not None:
                 st.subheader("📦 Boxplot por Domínio")
                 st.caption("Mostra como a produtividade prevista varia em cada domínio, incluindo valores médios e pontos fora do padrão.")
 
-                box_plot = alt.Chart(chart_data).mark_boxplot().encode(
-                    x="tipo_dominio:N", 
-                    y=alt.Y("produtividade_prevista:Q", title="Produtividade Prevista"),
+                # Quartis e bigodes já calculados: bigodes (regra), caixa (q1–q3) e mediana (traço)
+                box_base = alt.Chart(graficos["box"]).encode(
+                    x="tipo_dominio:N",
                     color="tipo_dominio:N",
-                    tooltip=["tipo_dominio", "produtividade_prevista"]
+                    tooltip=["tipo_dominio", "q1", "mediana", "q3", "media", "qtd"],
+                )
+                box_plot = alt.layer(
+                    box_base.mark_rule().encode(y=alt.Y("bigode_inf:Q", title="Produtividade Prevista"), y2="bigode_sup:Q"),
+                    box_base.mark_bar(size=40).encode(y="q1:Q", y2="q3:Q"),
+                    box_base.mark_tick(color="white", size=40).encode(y="mediana:Q"),
                 ).properties(width=600, height=400)
                 st.altair_chart(box_plot, use_container_width=True)
 
@@ -253,13 +465,13 @@ if  uploaded_file is not None:
                 st.subheader("📊 Produtividade Média por Tamanho da Equipe")
                 st.caption("Compara a produtividade média de acordo com o número de membros do time. Ajuda a entender como o tamanho da equipe influencia.")
 
-                bar_chart = alt.Chart(chart_data).mark_bar().encode(
+                bar_chart = alt.Chart(graficos["membros"]).mark_bar().encode(
                     x="qtd_membros:N",
-                    y=alt.Y("mean(produtividade_prevista):Q", title="Produtividade Média Prevista"),
+                    y=alt.Y("media:Q", title="Produtividade Média Prevista"),
                     color="tipo_dominio:N",
                     tooltip=[
                         "qtd_membros",
-                        alt.Tooltip("mean(produtividade_prevista):Q", title="Produtividade Média"),
+                        alt.Tooltip("media:Q", title="Produtividade Média"),
                         "tipo_dominio",
                     ],
                 ).properties(width=600, height=400)
@@ -268,13 +480,7 @@ if  uploaded_file is not None:
                 st.subheader("🥧 Participação dos Domínios")
                 st.caption("Mostra a proporção de produtividade média de cada domínio em relação ao total. Facilita a comparação entre áreas.")
 
-                pie_data = (
-                    chart_data.groupby("tipo_dominio")["produtividade_prevista"]
-                    .mean()
-                    .reset_index()
-                )
-
-                pie_chart = alt.Chart(pie_data).mark_arc().encode(
+                pie_chart = alt.Chart(graficos["dominios"]).mark_arc().encode(
                     theta="produtividade_prevista",
                     color="tipo_dominio",
                     tooltip=["tipo_dominio", "produtividade_prevista"],
@@ -286,26 +492,44 @@ if  uploaded_file is not None:
                 st.subheader("📈 Evolução da Produtividade por Sprint")
                 st.caption("Acompanha como a produtividade prevista muda ao longo das sprints. Ajuda a identificar tendências de crescimento ou queda.")
 
-                line_chart = alt.Chart(chart_data).mark_line(point=True).encode(
-                    x=alt.X("sprint_id:N", sort=list(chart_data["sprint_id"]), title="Sprint"),
+                serie = graficos["serie"]
+                eixo_sprints = alt.X("sprint_id:N", sort=list(serie["sprint_id"]), title="Sprint")
+                tooltip_serie = ["sprint_id", "produtividade_prevista", "tipo_dominio"]
+                if tem_intervalos:
+                    st.caption("A faixa sombreada vai do P10 ao P90 das árvores do modelo: 80% delas estimam dentro dela.")
+                    tooltip_serie += COLUNAS_INTERVALO
+                line_chart = alt.Chart(serie).mark_line(point=True).encode(
+                    x=eixo_sprints,
                     y=alt.Y("produtividade_prevista:Q", title="Produtividade Prevista"),
                     color="tipo_dominio:N",
-                    tooltip=["sprint_id", "produtividade_prevista", "tipo_dominio"]
-                ).properties(width=600, height=400)
+                    tooltip=tooltip_serie
+                )
+                if tem_intervalos:
+                    banda = alt.Chart(serie).mark_area(opacity=0.2).encode(
+                        x=eixo_sprints,
+                        y="produtividade_p10:Q",
+                        y2="produtividade_p90:Q",
+                        color="tipo_dominio:N",
+                    )
+                    line_chart = alt.layer(banda, line_chart)
+                line_chart = line_chart.properties(width=600, height=400)
                 st.altair_chart(line_chart, use_container_width=True)
 
 
                 st.subheader("⚖️ Relação entre Produtividade, Bugs e Retrabalho")
                 st.caption("Mostra se existe ligação entre produtividade, quantidade de bugs e retrabalho. Posição mais à direita indica maior produtividade; mais acima indica mais bugs.")
 
-                scatter_chart = alt.Chart(chart_data).mark_circle(size=60).encode(
+                # Com muitas sprints cada ponto é uma célula da grade (tamanho = quantidade)
+                scatter_chart = alt.Chart(graficos["dispersao"]).mark_circle().encode(
                     x=alt.X("produtividade_prevista:Q", title="Produtividade Prevista"),
                     y=alt.Y("percentual_bugs:Q", title="Percentual de Bugs (%)"),
                     color="tipo_dominio:N",
+                    size=alt.Size("qtd:Q", title="Sprints", scale=alt.Scale(range=[60, 600]), legend=None),
                     tooltip=[
                         alt.Tooltip("percentual_bugs:Q", title="Percentual de Bugs (%)"),
                         alt.Tooltip("percentual_retrabalho:Q", title="Percentual de Retrabalho (%)"),
                         alt.Tooltip("produtividade_prevista:Q", title="Produtividade Prevista"),
+                        alt.Tooltip("qtd:Q", title="Sprints"),
                         "tipo_dominio",
                     ]
                 ).properties(width=600, height=400)
@@ -316,6 +540,39 @@ if  uploaded_file is not None:
 
  
 
+# -------------------------------
+# Desempenho (carga fria e tempo por execução)
+# -------------------------------
+with st.sidebar.expander("⏱️ Desempenho"):
+    for (caminho, carregador), info in artefatos.status().items():
+        nome = f"{os.path.basename(caminho)} ({carregador})"
+        if info["pronto"]:
+            st.write(f"`{nome}`: carregado em {info['tempo_carga_s'] * 1000:.0f} ms (versão {info['versao']})")
+        else:
+            st.write(f"`{nome}`: carregando em segundo plano...")
+
+    if "tempo_artefatos" in st.session_state:
+        st.write(f"Obtenção dos artefatos na última estimativa: {st.session_state.tempo_artefatos * 1000:.1f} ms")
+    if explicacoes.shap_disponivel():
+        stats = explicacoes.obter_cache().estatisticas()
+        st.write(f"Explicações em cache: {stats['entradas']} ({stats['acertos']} acertos / {stats['falhas']} falhas)")
+    if os.path.exists(CACHE_PATH):
+        stats = obter_cache(CACHE_PATH, CACHE_MAX_ENTRADAS).estatisticas()
+        st.write(
+            f"Cache de previsões: {stats['acertos']} acertos / {stats['falhas']} falhas "
+            f"({stats['taxa_acerto']:.0%}), {stats['entradas']} entradas, {stats['despejos']} despejos"
+        )
+    if "dataset" in st.session_state:
+        sessao = st.session_state.dataset
+        total = sessao.memoria_bytes()
+        if "indice_filtros" in st.session_state:
+            total += st.session_state.indice_filtros.memoria_bytes()
+        st.write(
+            f"Memória desta sessão: {formatar_bytes(total)} de {SESSAO_MAX_MB:.0f} MB "
+            f"(dados compactados de {formatar_bytes(sessao.memoria_original)} para {formatar_bytes(sessao.memoria_dados)})"
+        )
+    st.write(f"Tempo desta execução: {(time.perf_counter() - inicio_execucao) * 1000:.0f} ms")
+
 # -------------------------------
 # FAQ lateral
 # -------------------------------
@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+
+from scripts_app.ciclo_cartoes import datas_criacao
+
+# -------------------------------
+# Agregação de cards em sprints (colunas que o modelo espera)
+# -------------------------------
+# Cada lista do board é uma sprint (o mesmo formato que
+# push_public_trello_board.py publica). Cada card vira uma linha de
+# contribuições (1 cartão, é bug?, é retrabalho?, story points, complexidade,
+# domínio, membros) e as sprints são somas dessas contribuições. Quando cards
+# novos ou alterados chegam, só as contribuições deles entram (e as antigas
+# saem) — as somas das sprints não são recalculadas do zero.
+
+LABELS_BUG = {"bug", "bugs"}
+LABELS_RETRABALHO = {"retrabalho", "rework"}
+DOMINIOS = ["API", "Dados", "Mobile", "Web"]
+
+# Campos customizados aceitos para cada informação (o primeiro que existir é usado)
+CAMPOS_STORY_POINTS = ["custom_StoryPoints", "custom_StoryPoint", "custom_story_points", "custom_Story Points"]
+CAMPOS_COMPLEXIDADE = ["custom_Complexidade", "custom_complexidade"]
+CAMPOS_DOMINIO = ["custom_tipo_dominio", "custom_Dominio", "custom_Domínio"]
+
+COLUNAS_SPRINT = ["sprint_id", "data_inicio", "qtd_membros", "cartoes_previstos", "story_points_previstos",
+                  "tipo_dominio", "complexidade_media", "percentual_bugs", "percentual_retrabalho",
+                  "produtividade_estimada"]
+
+SOMAS = ["cartoes", "bugs", "retrabalho", "story_points", "soma_complexidade", "n_complexidade"]
+
+
+def _primeira_coluna(cards, candidatos):
+    return next((c for c in candidatos if c in cards.columns), None)
+
+
+def _por_combinacao(valores, funcao):
+    """
+    Aplica `funcao` só às combinações distintas de um texto ("Bugs, Web") e
+    espalha o resultado para as linhas pelos códigos do factorize.
+    """
+    codigos, combinacoes = pd.factorize(valores.fillna("").astype(str))
+    resultados = [funcao([parte for parte in c.split(", ") if parte]) for c in combinacoes]
+    return codigos, resultados
+
+
+def contribuicoes_cartoes(cards, coluna_sprint="list_name"):
+    """
+    Retorna (contribuicoes, membros):
+      - contribuicoes: uma linha por card (índice card_id) com a sprint e as
+        parcelas de cada soma, o domínio e a data de criação;
+      - membros: pares (card_id, sprint, membro), um por membro do card.
+    """
+    cards = cards.drop_duplicates("card_id", keep="last")
+    n = len(cards)
+    labels = cards["card_labels"] if "card_labels" in cards.columns else pd.Series("", index=cards.index)
+
+    def classificar(partes):
+        minusculas = {p.lower() for p in partes}
+        dominio = next((p for p in partes if p in DOMINIOS), None)
+        return bool(minusculas & LABELS_BUG), bool(minusculas & LABELS_RETRABALHO), dominio
+
+    codigos, classes = _por_combinacao(labels, classificar)
+    bugs = np.array([c[0] for c in classes], dtype=bool)[codigos]
+    retrabalho = np.array([c[1] for c in classes], dtype=bool)[codigos]
+    dominio = pd.Series(np.array([c[2] for c in classes], dtype=object)[codigos], index=cards.index)
+
+    # Domínio em campo customizado tem precedência sobre a label
+    coluna_dominio = _primeira_coluna(cards, CAMPOS_DOMINIO)
+    if coluna_dominio:
+        dominio = cards[coluna_dominio].where(cards[coluna_dominio].notna(), dominio)
+
+    def numerico(candidatos):
+        coluna = _primeira_coluna(cards, candidatos)
+        if coluna is None:
+            return np.full(n, np.nan)
+        return pd.to_numeric(cards[coluna], errors="coerce").to_numpy(dtype=np.float64)
+
+    story_points = numerico(CAMPOS_STORY_POINTS)
+    complexidade = numerico(CAMPOS_COMPLEXIDADE)
+
+    contribuicoes = pd.DataFrame({
+        "sprint": cards[coluna_sprint].to_numpy(),
+        "cartoes": 1,
+        "bugs": bugs.astype(np.int64),
+        "retrabalho": retrabalho.astype(np.int64),
+        "story_points": np.nan_to_num(story_points),
+        "soma_complexidade": np.nan_to_num(complexidade),
+        "n_complexidade": (~np.isnan(complexidade)).astype(np.int64),
+        "dominio": dominio.to_numpy(),
+        "criado": datas_criacao(cards["card_id"]).array,
+    }, index=pd.Index(cards["card_id"].to_numpy(), name="card_id"))
+
+    # Membros: cada combinação distinta é separada uma vez e as linhas são
+    # repetidas por índice (sem laço por card)
+    membros_coluna = cards["card_members"] if "card_members" in cards.columns else pd.Series("", index=cards.index)
+    codigos, listas = _por_combinacao(membros_coluna, lambda partes: partes)
+    tamanhos_combinacao = np.array([len(lst) for lst in listas], dtype=np.int64)
+    inicios_combinacao = np.cumsum(tamanhos_combinacao) - tamanhos_combinacao
+    nomes = np.array([m for lst in listas for m in lst], dtype=object)
+
+    tamanhos = tamanhos_combinacao[codigos]
+    linhas = np.repeat(np.arange(n), tamanhos)
+    deslocamento = np.arange(tamanhos.sum()) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+    posicoes = np.repeat(inicios_combinacao[codigos], tamanhos) + deslocamento
+
+    membros = pd.DataFrame({
+        "card_id": contribuicoes.index.to_numpy()[linhas],
+        "sprint": contribuicoes["sprint"].to_numpy()[linhas],
+        "membro": nomes[posicoes],
+    })
+    return contribuicoes, membros
+
+
+def _contagem(df, colunas):
+    return df.dropna(subset=colunas).groupby(colunas, sort=False).size()
+
+
+def _somar(atual, parcela):
+    return parcela if atual is None else atual.add(parcela, fill_value=0)
+
+
+class AgregadorSprints:
+    """
+    Mantém as somas por sprint e as contribuições de cada card. `atualizar`
+    recebe cards novos ou alterados (um bloco do parser, por exemplo) e
+    `sprints()` devolve as linhas no formato do CSV de sprints.
+    """
+
+    def __init__(self, coluna_sprint="list_name"):
+        self.coluna_sprint = coluna_sprint
+        self.contribuicoes = None
+        self.membros = None
+        self.somas = None
+        self.pares_membros = None
+        self.pares_dominios = None
+        self.inicio = pd.Series(dtype="datetime64[ns, UTC]")
+
+    def _aplicar(self, contribuicoes, membros, sinal):
+        self.somas = _somar(self.somas, contribuicoes.groupby("sprint", sort=False)[SOMAS].sum() * sinal)
+        self.pares_membros = _somar(self.pares_membros, _contagem(membros, ["sprint", "membro"]) * sinal)
+        self.pares_dominios = _somar(self.pares_dominios, _contagem(contribuicoes, ["sprint", "dominio"]) * sinal)
+
+    def atualizar(self, cards):
+        novas, membros = contribuicoes_cartoes(cards, self.coluna_sprint)
+        tocadas = set(novas["sprint"])
+
+        if self.contribuicoes is not None:
+            # Cards já vistos: as contribuições antigas saem antes das novas entrarem
+            repetidos = self.contribuicoes.index.intersection(novas.index)
+            if len(repetidos):
+                antigas = self.contribuicoes.loc[repetidos]
+                tocadas |= set(antigas["sprint"])
+                self._aplicar(antigas, self.membros[self.membros["card_id"].isin(repetidos)], -1)
+                self.contribuicoes = self.contribuicoes.drop(repetidos)
+                self.membros = self.membros[~self.membros["card_id"].isin(repetidos)]
+            self.contribuicoes = pd.concat([self.contribuicoes, novas])
+            self.membros = pd.concat([self.membros, membros], ignore_index=True)
+        else:
+            self.contribuicoes, self.membros = novas, membros
+
+        self._aplicar(novas, membros, 1)
+
+        # A data de início (menor criação) só é recalculada para as sprints tocadas
+        tocadas = list(tocadas)
+        afetados = self.contribuicoes[self.contribuicoes["sprint"].isin(tocadas)]
+        self.inicio = pd.concat([
+            self.inicio.drop(tocadas, errors="ignore"),
+            afetados.groupby("sprint", sort=False)["criado"].min(),
+        ])
+        return self
+
+    def sprints(self):
+        if self.somas is None:
+            return pd.DataFrame(columns=COLUNAS_SPRINT)
+        somas = self.somas[self.somas["cartoes"] > 0]
+        sprints = somas.index
+
+        # Toda sprint com cards tem ao menos uma pessoa, mesmo sem membros atribuídos
+        membros = self.pares_membros[self.pares_membros > 0]
+        sprints_membros = pd.Series(membros.index.get_level_values(0) if len(membros) else [], dtype=object)
+        qtd_membros = sprints_membros.value_counts().reindex(sprints, fill_value=0).clip(lower=1).astype(np.int64)
+
+        # Domínio mais frequente na sprint (empate: ordem alfabética)
+        dominios = self.pares_dominios[self.pares_dominios > 0]
+        dominios = pd.DataFrame({
+            "sprint": dominios.index.get_level_values(0) if len(dominios) else [],
+            "dominio": dominios.index.get_level_values(1) if len(dominios) else [],
+            "qtd": dominios.to_numpy(),
+        })
+        dominios = dominios.sort_values(["qtd", "dominio"], ascending=[False, True]).drop_duplicates("sprint")
+        tipo_dominio = dominios.set_index("sprint")["dominio"].reindex(sprints)
+
+        cartoes = somas["cartoes"]
+        story_points = somas["story_points"]
+        resultado = pd.DataFrame({
+            "sprint_id": sprints,
+            "data_inicio": self.inicio.reindex(sprints).dt.strftime("%Y-%m-%d").to_numpy(),
+            "qtd_membros": qtd_membros.to_numpy(),
+            "cartoes_previstos": cartoes.astype(np.int64).to_numpy(),
+            "story_points_previstos": story_points.to_numpy(),
+            # Sempre texto, mesmo sem nenhum domínio nos cards (o reindex daria float NaN)
+            "tipo_dominio": tipo_dominio.to_numpy(dtype=object),
+            "complexidade_media": (somas["soma_complexidade"] / somas["n_complexidade"].replace(0, np.nan)).to_numpy(),
+            "percentual_bugs": (somas["bugs"] / cartoes).to_numpy(),
+            "percentual_retrabalho": (somas["retrabalho"] / cartoes).to_numpy(),
+            "produtividade_estimada": (story_points / qtd_membros).to_numpy(),
+        })
+        return resultado.sort_values(["data_inicio", "sprint_id"], na_position="last").reset_index(drop=True)
+
+
+def agregar_sprints(cards, coluna_sprint="list_name"):
+    """Atalho: agrega um DataFrame de cards de uma vez."""
+    return AgregadorSprints(coluna_sprint).atualizar(cards).sprints()
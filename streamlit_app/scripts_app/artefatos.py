@@ -0,0 +1,151 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+
+# -------------------------------
+# Registro de artefatos por processo
+# -------------------------------
+# O Streamlit reexecuta o app.py a cada interação, mas os módulos importados
+# continuam em memória. Guardando os artefatos aqui, cada arquivo é carregado
+# uma única vez por processo do servidor e compartilhado entre as sessões.
+# A chave é (caminho, carregador): o mesmo arquivo pode ser lido de formas
+# diferentes (ex.: modelo do sklearn e floresta compilada).
+
+_registro = {}
+_lock = threading.Lock()
+# Uma thread só: o unpickle importa módulos do sklearn, e dois carregamentos
+# simultâneos podem travar no lock de import do Python (_DeadlockError)
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artefatos")
+
+
+def load_model(model_path):
+    with open(model_path, 'rb') as file:
+        return pickle.load(file)
+
+
+def load_joblib(path):
+    return joblib.load(path)
+
+
+class Artefato:
+    """
+    Objeto carregado de um arquivo, junto com a assinatura (mtime/tamanho),
+    o checksum SHA-256 e o tempo gasto no carregamento.
+    """
+
+    def __init__(self, caminho, valor, assinatura, checksum, tempo_carga):
+        self.caminho = caminho
+        self.valor = valor
+        self.assinatura = assinatura
+        self.checksum = checksum
+        self.tempo_carga = tempo_carga
+
+    @property
+    def versao(self):
+        # Versão curta usada como chave de cache por outros módulos
+        return self.checksum[:16]
+
+
+class _Entrada:
+    def __init__(self, carregador, assinatura, futuro):
+        self.carregador = carregador
+        self.assinatura = assinatura
+        self.futuro = futuro
+
+
+def _assinatura(caminho):
+    info = os.stat(caminho)
+    return (info.st_mtime_ns, info.st_size)
+
+
+def _checksum(caminho, tamanho_bloco=1 << 20):
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as file:
+        for bloco in iter(lambda: file.read(tamanho_bloco), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _carregar(caminho, carregador, anterior=None):
+    inicio = time.perf_counter()
+    assinatura = _assinatura(caminho)
+    checksum = _checksum(caminho)
+
+    # Arquivo "tocado" mas com o mesmo conteúdo: reaproveita o objeto anterior
+    if anterior is not None and anterior.checksum == checksum:
+        return Artefato(caminho, anterior.valor, assinatura, checksum, anterior.tempo_carga)
+
+    valor = carregador(caminho)
+    return Artefato(caminho, valor, assinatura, checksum, time.perf_counter() - inicio)
+
+
+def _artefato_anterior(entrada):
+    if entrada is None or not entrada.futuro.done() or entrada.futuro.exception() is not None:
+        return None
+    return entrada.futuro.result()
+
+
+def pre_carregar(caminho, carregador):
+    """
+    Dispara o carregamento do artefato em segundo plano e retorna o Future.
+    Se o arquivo não mudou (mtime/tamanho) desde o último carregamento,
+    reaproveita o que já está em memória.
+    """
+    caminho = os.path.abspath(caminho)
+    assinatura = _assinatura(caminho)
+
+    with _lock:
+        entrada = _registro.get((caminho, carregador))
+        if entrada is not None and entrada.assinatura == assinatura:
+            return entrada.futuro
+
+        anterior = _artefato_anterior(entrada)
+        futuro = _executor.submit(_carregar, caminho, carregador, anterior)
+        _registro[(caminho, carregador)] = _Entrada(carregador, assinatura, futuro)
+        return futuro
+
+
+def obter(caminho, carregador, timeout=None):
+    """Retorna o Artefato, esperando o carregamento em segundo plano se preciso."""
+    futuro = pre_carregar(caminho, carregador)
+    try:
+        return futuro.result(timeout=timeout)
+    except Exception:
+        # Não deixa um carregamento com falha preso no registro
+        chave = (os.path.abspath(caminho), carregador)
+        with _lock:
+            entrada = _registro.get(chave)
+            if entrada is not None and entrada.futuro is futuro:
+                del _registro[chave]
+        raise
+
+
+def pronto(caminho, carregador):
+    """Indica se o artefato já terminou de carregar (sem bloquear)."""
+    with _lock:
+        entrada = _registro.get((os.path.abspath(caminho), carregador))
+    return entrada is not None and entrada.futuro.done()
+
+
+def status():
+    """
+    Resumo do registro para exibição:
+    (caminho, nome do carregador) -> (pronto, tempo de carga, versão).
+    """
+    with _lock:
+        entradas = dict(_registro)
+
+    resumo = {}
+    for (caminho, carregador), entrada in entradas.items():
+        artefato = _artefato_anterior(entrada)
+        resumo[(caminho, carregador.__name__)] = {
+            "pronto": artefato is not None,
+            "tempo_carga_s": artefato.tempo_carga if artefato else None,
+            "versao": artefato.versao if artefato else None,
+        }
+    return resumo
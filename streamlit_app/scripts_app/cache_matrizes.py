@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+from scripts_app.io_datasets import _resolver, ler_dataset
+from scripts_app.preprocessamento import FEATURES_DERIVADAS, FEATURES_MODELO, especificacao_features, matriz_features
+
+# -------------------------------
+# Cache das matrizes de treino
+# -------------------------------
+# A matriz de features (e o alvo) de um dataset preparado fica em disco como
+# .npy, numa pasta cuja chave é o hash do conteúdo do dataset + a
+# especificação das features + o alvo. Rodar o treino de novo sobre o mesmo
+# arquivo abre os .npy com mmap: sem ler o Parquet/CSV e sem recalcular as
+# features. Mudar o dataset ou a especificação gera outra chave.
+
+
+def hash_dataset(caminho, tamanho_bloco=1 << 20):
+    """SHA-256 do conteúdo do dataset (um arquivo ou todos os arquivos de uma pasta particionada)."""
+    caminho = _resolver(caminho)
+    if os.path.isdir(caminho):
+        arquivos = sorted(
+            os.path.join(raiz, nome) for raiz, _, nomes in os.walk(caminho) for nome in nomes
+        )
+    else:
+        arquivos = [caminho]
+
+    sha = hashlib.sha256()
+    for arquivo in arquivos:
+        # O caminho relativo entra no hash: numa pasta hive ele carrega o valor da partição
+        sha.update(os.path.relpath(arquivo, caminho).encode())
+        with open(arquivo, "rb") as f:
+            for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+                sha.update(bloco)
+    return sha.hexdigest()
+
+
+def chave_matriz(hash_dados, alvo):
+    conteudo = json.dumps({"dataset": hash_dados, "features": especificacao_features(), "alvo": alvo}, sort_keys=True)
+    return hashlib.sha256(conteudo.encode()).hexdigest()[:20]
+
+
+def _colunas_entrada():
+    colunas = [nome for nome in FEATURES_MODELO if nome not in FEATURES_DERIVADAS]
+    for a, _, b in FEATURES_DERIVADAS.values():
+        colunas += [c for c in (a, b) if c not in colunas]
+    return colunas
+
+
+def carregar_matriz(caminho, pasta_cache, alvo="duracao_dias"):
+    """
+    (X, y, info) do dataset preparado em `caminho`. X e y vêm de .npy
+    abertos com mmap (somente leitura); `info` traz a chave, o hash do
+    dataset e se a matriz veio do cache.
+    """
+    hash_dados = hash_dataset(caminho)
+    chave = chave_matriz(hash_dados, alvo)
+    destino = os.path.join(pasta_cache, chave)
+    info = {"chave": chave, "hash_dataset": hash_dados, "cache": True}
+
+    if not os.path.exists(os.path.join(destino, "X.npy")):
+        info["cache"] = False
+        df = ler_dataset(caminho, colunas=_colunas_entrada() + [alvo])
+
+        # Grava numa pasta temporária e renomeia: outro processo nunca lê uma matriz pela metade
+        temporario = f"{destino}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(temporario)
+        try:
+            np.save(os.path.join(temporario, "X.npy"), np.ascontiguousarray(matriz_features(df)))
+            np.save(os.path.join(temporario, "y.npy"), df[alvo].to_numpy(dtype=np.float64))
+            with open(os.path.join(temporario, "info.json"), "w", encoding="utf-8") as f:
+                json.dump({"dataset": os.path.abspath(caminho), "hash_dataset": hash_dados, "alvo": alvo,
+                           "features": especificacao_features()}, f, ensure_ascii=False, indent=2)
+            try:
+                os.replace(temporario, destino)
+            except OSError:
+                pass  # outro processo gravou a mesma chave primeiro
+        finally:
+            shutil.rmtree(temporario, ignore_errors=True)
+
+    X = np.load(os.path.join(destino, "X.npy"), mmap_mode="r")
+    y = np.load(os.path.join(destino, "y.npy"), mmap_mode="r")
+    return X, y, info
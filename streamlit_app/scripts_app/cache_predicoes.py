@@ -0,0 +1,165 @@
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Cache persistente de previsões por linha
+# -------------------------------
+# A chave de cada linha é o hash da sua matriz de features (o que de fato entra
+# no modelo) e a versão do modelo é o checksum do artefato. Ao reenviar quase o
+# mesmo CSV, só as sprints novas ou alteradas passam pelo modelo.
+
+_caches = {}
+_lock_caches = threading.Lock()
+
+
+def chaves_linhas(X):
+    """Hash de 64 bits de cada linha da matriz de features (como int64 para o SQLite)."""
+    colunas = pd.DataFrame(np.asarray(X), copy=False)
+    return pd.util.hash_pandas_object(colunas, index=False).to_numpy().view(np.int64)
+
+
+class CachePredicoes:
+    """
+    Previsões guardadas em SQLite, com despejo LRU quando o número de entradas
+    passa de `max_entradas`. Os contadores de acertos/falhas são do processo.
+    """
+
+    def __init__(self, caminho, max_entradas=2_000_000):
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self.caminho = caminho
+        self.max_entradas = max_entradas
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS predicoes ("
+            " versao TEXT NOT NULL, chave INTEGER NOT NULL, valor REAL NOT NULL, uso INTEGER NOT NULL,"
+            " PRIMARY KEY (versao, chave)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_predicoes_uso ON predicoes (uso)")
+        self._conn.execute("CREATE TEMP TABLE busca (chave INTEGER PRIMARY KEY)")
+        self._conn.commit()
+
+        (relogio,) = self._conn.execute("SELECT COALESCE(MAX(uso), 0) FROM predicoes").fetchone()
+        self._relogio = relogio
+
+    def _tique(self):
+        self._relogio += 1
+        return self._relogio
+
+    def buscar(self, versao, chaves):
+        """
+        Retorna (valores, achados) alinhados com `chaves`; valores ausentes são NaN.
+        As entradas encontradas têm o uso atualizado (LRU).
+        """
+        chaves = np.asarray(chaves, dtype=np.int64)
+        unicas = np.unique(chaves)
+
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("DELETE FROM busca")
+            cur.executemany("INSERT INTO busca VALUES (?)", ((int(c),) for c in unicas))
+            linhas = cur.execute(
+                "SELECT p.chave, p.valor FROM predicoes p JOIN busca b ON p.chave = b.chave"
+                " WHERE p.versao = ?", (versao,)
+            ).fetchall()
+            cur.execute(
+                "UPDATE predicoes SET uso = ? WHERE versao = ? AND chave IN (SELECT chave FROM busca)",
+                (self._tique(), versao),
+            )
+            self._conn.commit()
+
+        valores = np.full(len(chaves), np.nan)
+        if linhas:
+            encontradas = np.array([linha[0] for linha in linhas], dtype=np.int64)
+            posicao = pd.Index(encontradas).get_indexer(chaves)
+            achados = posicao >= 0
+            valores[achados] = np.array([linha[1] for linha in linhas])[posicao[achados]]
+        else:
+            achados = np.zeros(len(chaves), dtype=bool)
+
+        self.acertos += int(achados.sum())
+        self.falhas += int((~achados).sum())
+        return valores, achados
+
+    def guardar(self, versao, chaves, valores):
+        chaves = np.asarray(chaves, dtype=np.int64)
+        valores = np.asarray(valores, dtype=np.float64)
+
+        with self._lock:
+            uso = self._tique()
+            cur = self._conn.cursor()
+            cur.executemany(
+                "INSERT OR REPLACE INTO predicoes (versao, chave, valor, uso) VALUES (?, ?, ?, ?)",
+                ((versao, int(c), float(v), uso) for c, v in zip(chaves, valores)),
+            )
+            self._despejar(cur)
+            self._conn.commit()
+
+    def _despejar(self, cur):
+        (total,) = cur.execute("SELECT COUNT(*) FROM predicoes").fetchone()
+        excesso = total - self.max_entradas
+        if excesso > 0:
+            cur.execute(
+                "DELETE FROM predicoes WHERE (versao, chave) IN"
+                " (SELECT versao, chave FROM predicoes ORDER BY uso LIMIT ?)", (excesso,)
+            )
+            self.despejos += excesso
+
+    def entradas(self):
+        with self._lock:
+            (total,) = self._conn.execute("SELECT COUNT(*) FROM predicoes").fetchone()
+        return total
+
+    def estatisticas(self):
+        consultas = self.acertos + self.falhas
+        return {
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            "despejos": self.despejos,
+            "entradas": self.entradas(),
+        }
+
+
+def obter_cache(caminho, max_entradas=2_000_000):
+    """Uma instância por arquivo e por processo, compartilhada entre as sessões."""
+    caminho = os.path.abspath(caminho)
+    with _lock_caches:
+        if caminho not in _caches:
+            _caches[caminho] = CachePredicoes(caminho, max_entradas)
+        return _caches[caminho]
+
+
+def prever_com_cache(cache, versao, model, X, desconhecidos, **kwargs):
+    """
+    Como `prever`, mas só as linhas ausentes do cache passam pelo modelo; as
+    previsões novas são gravadas de volta em lote.
+    """
+    predicoes = np.full(len(X), np.nan)
+    validas = np.flatnonzero(~desconhecidos)
+    if len(validas) == 0:
+        return predicoes
+
+    chaves = chaves_linhas(X[validas])
+    valores, achados = cache.buscar(versao, chaves)
+
+    faltantes = np.flatnonzero(~achados)
+    if len(faltantes):
+        # Linhas repetidas no próprio arquivo passam pelo modelo uma vez só
+        unicas, primeira, inversa = np.unique(chaves[faltantes], return_index=True, return_inverse=True)
+        novas = model.predict(X[validas[faltantes[primeira]]], **kwargs)
+        valores[faltantes] = novas[inversa]
+        cache.guardar(versao, unicas, novas)
+
+    predicoes[validas] = valores
+    return predicoes
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Tempos de ciclo dos cards (colunas inteiras, sem laço por card)
+# -------------------------------
+# Os 8 primeiros caracteres hexadecimais de um ID do Trello são o timestamp
+# Unix de criação do objeto. A decodificação é feita sobre a matriz de bytes
+# dos IDs com uma tabela de consulta, e lead/cycle time saem como durações
+# numéricas (horas e dias) em vez de textos "2d 21h".
+
+PERCENTIS = (50, 85, 95)
+
+# Valor de cada caractere ASCII como dígito hexadecimal (16 = inválido)
+_HEX = np.full(256, 16, dtype=np.uint8)
+_HEX[np.frombuffer(b"0123456789", dtype=np.uint8)] = np.arange(10)
+_HEX[np.frombuffer(b"abcdef", dtype=np.uint8)] = np.arange(10, 16)
+_HEX[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16)
+_PESOS = 16 ** np.arange(7, -1, -1, dtype=np.int64)
+
+
+def datas_criacao(ids):
+    """
+    Data de criação (UTC) de cada ID do Trello. IDs ausentes ou inválidos viram NaT.
+    """
+    ids = pd.Series(ids, copy=False)
+    validos = ids.notna().to_numpy().copy()
+
+    # Matriz (n x 8) com os bytes dos 8 primeiros caracteres de cada ID;
+    # caracteres fora do ASCII viram "?" e o ID fica inválido
+    prefixos = ids.where(validos, "").astype(str).str.slice(0, 8).str.encode("ascii", errors="replace")
+    prefixos = np.asarray(prefixos, dtype="S8")
+    digitos = _HEX[prefixos.view(np.uint8).reshape(len(prefixos), 8)]
+
+    validos &= (digitos < 16).all(axis=1)
+    segundos = digitos.astype(np.int64) @ _PESOS
+
+    datas = segundos.astype("datetime64[s]").astype("datetime64[ns]")
+    datas[~validos] = np.datetime64("NaT")
+    return pd.Series(pd.DatetimeIndex(datas).tz_localize("UTC"), index=ids.index)
+
+
+def _datas(valores):
+    """
+    Datas ISO 8601 em UTC. Os textos do Trello (sufixo "Z" ou "+00:00") têm
+    o sufixo removido e são convertidos pelo numpy, bem mais rápido que o
+    pd.to_datetime; outros fusos e formatos caem no pandas.
+    """
+    valores = pd.Series(valores, copy=False)
+    if not pd.api.types.is_datetime64_any_dtype(valores):
+        texto = valores.where(valores.notna(), "").astype(str)
+        sem_fuso = texto.str.replace(r"(?:Z|[+-]00:?00)$", "", regex=True)
+        if not sem_fuso.str.contains(r"T.*(?:Z|[+-]\d\d:?\d\d)$", regex=True).any():
+            try:
+                datas = np.asarray(sem_fuso, dtype="U").astype("datetime64[ms]").astype("datetime64[ns]")
+                return pd.Series(pd.DatetimeIndex(datas).tz_localize("UTC"), index=valores.index)
+            except ValueError:
+                pass
+    return pd.to_datetime(valores, utc=True, format="ISO8601", errors="coerce")
+
+
+def calcular_ciclo(df, coluna_id="card_id", coluna_conclusao="completed_date", coluna_inicio=None):
+    """
+    Acrescenta ao DataFrame de cards:
+      - created_date: data de criação decodificada do ID;
+      - lead_time_horas / lead_time_dias: criação até a conclusão;
+      - cycle_time_horas / cycle_time_dias: início do trabalho (`coluna_inicio`,
+        se houver; senão a criação) até a conclusão.
+    Cards sem conclusão ficam com NaN.
+    """
+    df = df.copy()
+    df["created_date"] = datas_criacao(df[coluna_id])
+    concluido = _datas(df[coluna_conclusao])
+    inicio = _datas(df[coluna_inicio]) if coluna_inicio else df["created_date"]
+
+    hora = np.timedelta64(1, "h")
+    df["lead_time_horas"] = (concluido - df["created_date"]) / hora
+    df["cycle_time_horas"] = (concluido - inicio) / hora
+    df["lead_time_dias"] = df["lead_time_horas"] / 24
+    df["cycle_time_dias"] = df["cycle_time_horas"] / 24
+    return df
+
+
+def percentis_por_grupo(df, grupo, coluna="cycle_time_horas", percentis=PERCENTIS):
+    """
+    Quantidade de cards e percentis de `coluna` por valor de `grupo`.
+    Cards sem conclusão (NaN) não entram.
+    """
+    validos = df[[grupo, coluna]].dropna()
+    agrupado = validos.groupby(grupo, sort=True)[coluna]
+
+    quantis = [p / 100 for p in percentis]
+    resultado = agrupado.quantile(quantis).unstack().reindex(columns=quantis)
+    resultado.columns = [f"p{p}_{coluna}" for p in percentis]
+    resultado.insert(0, "qtd_cards", agrupado.size())
+    return resultado.reset_index()
+
+
+def percentis_por_label(df, coluna_labels="card_labels", coluna="cycle_time_horas", percentis=PERCENTIS):
+    """
+    Percentis por label. Um card com várias labels ("Bugs, Retrabalho") conta
+    em cada uma delas. Só as combinações distintas de labels são separadas em
+    texto; os cards de cada label são selecionados pelos códigos da combinação.
+    """
+    codigos, combinacoes = pd.factorize(df[coluna_labels].fillna("").astype(str))
+    valores = df[coluna].to_numpy()
+
+    combinacoes_por_label = {}
+    for i, combinacao in enumerate(combinacoes):
+        for label in combinacao.split(", "):
+            if label:
+                combinacoes_por_label.setdefault(label, []).append(i)
+
+    partes = [
+        pd.DataFrame({"label": label, coluna: valores[np.isin(codigos, indices)]})
+        for label, indices in combinacoes_por_label.items()
+    ]
+    labels = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame({"label": [], coluna: []})
+    return percentis_por_grupo(labels, "label", coluna, percentis)
@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+
+from scripts_app.preprocessamento import COLUNAS_INTERVALO
+
+# -------------------------------
+# Dados agregados dos gráficos (aba Visualizações)
+# -------------------------------
+# Os gráficos recebem tabelas pequenas calculadas sobre todas as linhas
+# filtradas (e não uma amostra): bins do histograma, quartis do boxplot,
+# médias por tamanho de equipe e por domínio e a série por sprint. O tamanho
+# de cada tabela depende do número de bins/domínios/sprints exibidos, não do
+# número de linhas do dataset.
+
+BINS_HISTOGRAMA = 20
+MAX_PONTOS_SERIE = 500  # acima disso a série por sprint é agrupada em faixas de sprints
+MAX_PONTOS_DISPERSAO = 5000  # acima disso a dispersão vira contagens por célula
+BINS_DISPERSAO = 40
+
+COLUNA = "produtividade_prevista"
+
+# Colunas usadas pelos gráficos (só elas precisam ser selecionadas das linhas filtradas)
+COLUNAS_GRAFICOS = [COLUNA, "tipo_dominio", "qtd_membros", "sprint_id", "percentual_bugs", "percentual_retrabalho"]
+
+
+def codigos_categoria(valores):
+    """Códigos e categorias de uma coluna (reaproveita os códigos se já for categórica)."""
+    if isinstance(valores.dtype, pd.CategoricalDtype):
+        return valores.cat.codes.to_numpy(), valores.cat.categories
+    codigos, categorias = pd.factorize(valores)
+    return codigos, categorias
+
+
+def _bins(valores, bins):
+    """Bordas de `bins` intervalos iguais e o índice do bin de cada valor."""
+    bordas = np.histogram_bin_edges(valores, bins=bins) if len(valores) else np.linspace(0, 1, bins + 1)
+    # Bins de largura igual: o índice sai de uma conta, sem busca binária
+    escala = bins / (bordas[-1] - bordas[0])
+    indices = np.clip(((valores - bordas[0]) * escala).astype(np.intp), 0, bins - 1)
+    return bordas, indices
+
+
+def _validos(df, coluna):
+    """
+    Valores, códigos de domínio e categorias das linhas com domínio e valor,
+    mais a máscara dessas linhas (para selecionar outras colunas).
+    """
+    valores = df[coluna].to_numpy(dtype=np.float64)
+    dominios, categorias = codigos_categoria(df["tipo_dominio"])
+    validos = (dominios >= 0) & ~np.isnan(valores)
+    # cat.codes é int8 com poucas categorias: as chaves (código * bins + ...) estourariam
+    return valores[validos], dominios[validos].astype(np.intp), np.asarray(categorias), validos
+
+
+def histograma(df, bins=BINS_HISTOGRAMA, coluna=COLUNA):
+    """Contagem por (bin, domínio): colunas inicio, fim, tipo_dominio, qtd."""
+    valores, dominios, categorias, _ = _validos(df, coluna)
+    bordas, indices = _bins(valores, bins)
+
+    contagens = np.bincount(dominios * bins + indices, minlength=len(categorias) * bins)
+    contagens = contagens.reshape(len(categorias), bins)
+    dominio, bin_ = np.nonzero(contagens)
+    return pd.DataFrame({
+        "inicio": bordas[bin_],
+        "fim": bordas[bin_ + 1],
+        "tipo_dominio": categorias[dominio],
+        "qtd": contagens[dominio, bin_],
+    })
+
+
+def estatisticas_box(df, coluna=COLUNA):
+    """
+    Quartis, bigodes (1,5 IQR, limitados aos dados) e média por domínio, no
+    mesmo critério do mark_boxplot do Altair. Os domínios são poucos: cada um
+    é separado por máscara e os quartis saem de np.quantile (seleção, sem
+    ordenar o grupo inteiro).
+    """
+    valores, dominios, categorias, _ = _validos(df, coluna)
+    linhas = []
+    for codigo in np.unique(dominios):
+        v = valores[dominios == codigo]
+        q1, mediana, q3 = np.quantile(v, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        dentro = v[(v >= q1 - 1.5 * iqr) & (v <= q3 + 1.5 * iqr)]
+        linhas.append({
+            "tipo_dominio": categorias[codigo], "q1": q1, "mediana": mediana, "q3": q3,
+            "bigode_inf": dentro.min(), "bigode_sup": dentro.max(), "media": v.mean(), "qtd": len(v),
+        })
+    return pd.DataFrame(linhas, columns=["tipo_dominio", "q1", "mediana", "q3",
+                                         "bigode_inf", "bigode_sup", "media", "qtd"])
+
+
+def media_por_membros(df, coluna=COLUNA):
+    valores, dominios, categorias, validos = _validos(df, coluna)
+    # Tamanhos de equipe são inteiros pequenos: a chave é o deslocamento a partir do menor
+    membros = df["qtd_membros"].to_numpy()[validos].astype(np.int64)
+    menor = membros.min() if len(membros) else 0
+    membros -= menor
+    membros_unicos = np.arange(menor, menor + (membros.max() + 1 if len(membros) else 0))
+
+    n_cat = len(categorias)
+    presentes, qtd, medias = _medias_por_chave(membros * n_cat + dominios, len(membros_unicos) * n_cat,
+                                               {"media": valores})
+    return pd.DataFrame({
+        "qtd_membros": membros_unicos[presentes // n_cat],
+        "tipo_dominio": categorias[presentes % n_cat],
+        "media": medias["media"],
+        "qtd": qtd,
+    })
+
+
+def media_por_dominio(df, coluna=COLUNA):
+    valores, dominios, categorias, _ = _validos(df, coluna)
+    presentes, _, medias = _medias_por_chave(dominios, len(categorias), {coluna: valores})
+    return pd.DataFrame({"tipo_dominio": categorias[presentes], coluna: medias[coluna]})
+
+
+def _medias_por_chave(chaves, n_chaves, colunas):
+    """Quantidade e média de cada coluna por chave inteira (bincount, sem groupby)."""
+    qtd = np.bincount(chaves, minlength=n_chaves)
+    presentes = np.nonzero(qtd)[0]
+    medias = {nome: np.bincount(chaves, weights=valores, minlength=n_chaves)[presentes] / qtd[presentes]
+              for nome, valores in colunas.items()}
+    return presentes, qtd[presentes], medias
+
+
+def serie_por_sprint(df, sprint_num, max_pontos=MAX_PONTOS_SERIE, coluna=COLUNA):
+    """
+    Valor por sprint, na ordem de `sprint_num`. Com mais sprints que
+    `max_pontos`, as sprints são agrupadas em faixas consecutivas e a série
+    mostra a média de cada faixa (por domínio). As colunas P10/P50/P90
+    presentes em `df` seguem junto (as bandas do gráfico).
+    """
+    sprint_num = np.asarray(sprint_num, dtype=np.float64)
+    ordem = np.argsort(sprint_num, kind="stable")
+    n = len(ordem)
+    faixa_estimativa = [c for c in COLUNAS_INTERVALO if c in df.columns]
+
+    if n <= max_pontos:
+        return pd.DataFrame({
+            "sprint_num": sprint_num[ordem],
+            "sprint_id": df["sprint_id"].to_numpy()[ordem],
+            "tipo_dominio": df["tipo_dominio"].to_numpy()[ordem],
+            coluna: df[coluna].to_numpy()[ordem],
+            **{nome: df[nome].to_numpy()[ordem] for nome in faixa_estimativa},
+        })
+
+    # Faixas com a mesma quantidade de sprints (pela posição na ordem)
+    faixa = np.arange(n) * max_pontos // n
+    inicio_faixa = np.searchsorted(faixa, np.arange(max_pontos))
+    fim_faixa = np.append(inicio_faixa[1:], n) - 1
+
+    dominios, categorias = codigos_categoria(df["tipo_dominio"])
+    dominios = dominios[ordem]
+    valores = df[coluna].to_numpy(dtype=np.float64)[ordem]
+    validos = (dominios >= 0) & ~np.isnan(valores)
+
+    n_cat = len(categorias)
+    chaves = faixa[validos] * n_cat + dominios[validos]
+    medias_colunas = {coluna: valores[validos]}
+    for nome in faixa_estimativa:
+        medias_colunas[nome] = df[nome].to_numpy(dtype=np.float64)[ordem][validos]
+    presentes, _, medias = _medias_por_chave(chaves, max_pontos * n_cat, medias_colunas)
+    faixas = presentes // n_cat
+
+    ids = df["sprint_id"].to_numpy()
+    rotulos = pd.Series(ids[ordem[inicio_faixa]]).astype(str) + " – " + pd.Series(ids[ordem[fim_faixa]]).astype(str)
+    return pd.DataFrame({
+        "sprint_num": sprint_num[ordem[inicio_faixa[faixas]]],
+        "sprint_id": rotulos.to_numpy()[faixas],
+        "tipo_dominio": np.asarray(categorias)[presentes % n_cat],
+        **medias,
+    })
+
+
+def dispersao(df, x=COLUNA, y="percentual_bugs", max_pontos=MAX_PONTOS_DISPERSAO, bins=BINS_DISPERSAO):
+    """
+    Pontos da dispersão. Até `max_pontos`, as próprias linhas (só as colunas
+    usadas); acima disso, uma grade bins x bins: cada célula com sprints
+    vira um ponto por domínio, na média das linhas que caem nela e com a
+    quantidade delas.
+    """
+    colunas = [x, y, "percentual_retrabalho", "tipo_dominio"]
+    valores_x = df[x].to_numpy(dtype=np.float64)
+    valores_y = df[y].to_numpy(dtype=np.float64)
+    dominios, categorias = codigos_categoria(df["tipo_dominio"])
+    validos = ~(np.isnan(valores_x) | np.isnan(valores_y)) & (dominios >= 0)
+
+    if validos.sum() <= max_pontos:
+        return df.loc[validos, colunas].assign(qtd=1).reset_index(drop=True)
+
+    valores_x, valores_y, dominios = valores_x[validos], valores_y[validos], dominios[validos]
+    retrabalho = np.nan_to_num(df["percentual_retrabalho"].to_numpy(dtype=np.float64)[validos])
+    _, celula_x = _bins(valores_x, bins)
+    _, celula_y = _bins(valores_y, bins)
+
+    n_cat = len(categorias)
+    chaves = (celula_x * bins + celula_y) * n_cat + dominios
+    presentes, qtd, medias = _medias_por_chave(chaves, bins * bins * n_cat, {
+        x: valores_x, y: valores_y, "percentual_retrabalho": retrabalho,
+    })
+    return pd.DataFrame({**medias, "tipo_dominio": np.asarray(categorias)[presentes % n_cat], "qtd": qtd})[colunas + ["qtd"]]
+
+
+def agregar_graficos(df, sprint_num, bins=BINS_HISTOGRAMA):
+    """Todas as tabelas da aba Visualizações para as linhas já filtradas."""
+    return {
+        "histograma": histograma(df, bins),
+        "box": estatisticas_box(df),
+        "membros": media_por_membros(df),
+        "dominios": media_por_dominio(df),
+        "serie": serie_por_sprint(df, sprint_num),
+        "dispersao": dispersao(df),
+    }
@@ -0,0 +1,185 @@
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from scripts_app.preprocessamento import COLUNAS_INTERVALO
+
+# -------------------------------
+# Dataset da sessão
+# -------------------------------
+# Cada sessão guarda uma única cópia compactada do dataset carregado:
+# inteiros no menor tipo que comporta os valores, floats em float32 quando a
+# conversão não perde nada e textos repetitivos como categoria. As abas
+# recebem visões dessa cópia (alterar uma visão nunca chega aos dados
+# guardados) e as previsões ficam num array à parte, juntado às colunas só na
+# hora de exibir, sem copiar o resto da tabela. O mesmo vale para a faixa
+# P10/P50/P90, quando calculada.
+
+COLUNA_PREVISAO = "produtividade_prevista"
+
+# Textos com até esta fração de valores distintos viram categoria
+LIMITE_CATEGORIA = 0.5
+
+MB = 1024 * 1024
+
+
+def _compactar_coluna(serie, limite_categoria=LIMITE_CATEGORIA):
+    """Mesma coluna num tipo menor, quando existe um que guarde os mesmos valores."""
+    if isinstance(serie.dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(serie.dtype):
+        return serie
+    if pd.api.types.is_integer_dtype(serie.dtype):
+        return pd.to_numeric(serie, downcast="integer")
+    if pd.api.types.is_float_dtype(serie.dtype):
+        if serie.dtype == np.float32:
+            return serie
+        valores = serie.to_numpy(dtype=np.float64, na_value=np.nan)
+        reduzido = valores.astype(np.float32)
+        # Só converte se todo valor volta igual (ex.: contagens e percentuais inteiros)
+        if np.array_equal(reduzido.astype(np.float64), valores, equal_nan=True):
+            return serie.astype(np.float32)
+        return serie
+    if pd.api.types.is_string_dtype(serie.dtype) or serie.dtype == object:
+        if len(serie) and serie.nunique(dropna=True) <= limite_categoria * len(serie):
+            return serie.astype("category")
+    return serie
+
+
+def compactar(df, limite_categoria=LIMITE_CATEGORIA):
+    """DataFrame com cada coluna no menor tipo sem perda (as colunas inalteradas não são copiadas)."""
+    colunas = {}
+    for nome in df.columns:
+        compactada = _compactar_coluna(df[nome], limite_categoria)
+        if compactada.dtype != df[nome].dtype:
+            colunas[nome] = compactada
+    return df.assign(**colunas) if colunas else df
+
+
+def formatar_bytes(n):
+    """Tamanho legível (KB/MB/GB)."""
+    for unidade in ("KB", "MB", "GB"):
+        n /= 1024
+        if n < 1024 or unidade == "GB":
+            return f"{n:.1f} {unidade}"
+
+
+def _copy_on_write():
+    """Copy-on-Write ativo: sempre no pandas 3; no pandas 2, só se a aplicação o ligou."""
+    return int(pd.__version__.split(".")[0]) >= 3 or pd.get_option("mode.copy_on_write") is True
+
+
+def _somente_leitura(df):
+    """
+    O mesmo DataFrame, sem copiar os dados, com os arrays das colunas
+    marcados como somente leitura: sem Copy-on-Write (pandas 2), alterar uma
+    visão no lugar gera ValueError em vez de mudar os dados guardados.
+    Colunas que não são arrays numpy nem categorias são copiadas.
+    """
+    colunas = {}
+    for nome in df.columns:
+        serie = df[nome]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos = serie.cat.codes.to_numpy().view()
+            codigos.flags.writeable = False
+            colunas[nome] = pd.Categorical.from_codes(codigos, dtype=serie.dtype, validate=False)
+        elif isinstance(serie.dtype, np.dtype):
+            valores = serie.to_numpy().view()
+            valores.flags.writeable = False
+            colunas[nome] = valores
+        else:
+            colunas[nome] = serie.array.copy()
+    return pd.DataFrame(colunas, index=df.index, copy=False)
+
+
+def memoria(df):
+    """Bytes ocupados pelo DataFrame (inclui o conteúdo dos textos)."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class DatasetSessao:
+
+    def __init__(self, data, memoria_max_mb=None):
+        """
+        Compacta `data` e guarda o resultado. Com `memoria_max_mb`, recusa
+        (ValueError) datasets cuja cópia compactada, mais o espaço das
+        previsões, passe do limite.
+        """
+        dados = compactar(data.drop(columns=COLUNA_PREVISAO, errors="ignore"))
+        self.memoria_max = int(memoria_max_mb * MB) if memoria_max_mb else None
+        self.memoria_dados = memoria(dados)
+
+        # As previsões (float64 por linha) entram na conta desde o carregamento
+        necessario = self.memoria_dados + len(dados) * np.dtype(np.float64).itemsize
+        if self.memoria_max is not None and necessario > self.memoria_max:
+            raise ValueError(
+                f"Dataset grande demais para uma sessão: {necessario / MB:.0f} MB após compactar "
+                f"(limite de {self.memoria_max / MB:.0f} MB)."
+            )
+
+        self._dados = dados
+        self.memoria_original = memoria(data)
+        self.versao = uuid.uuid4().hex
+        self.predicoes = None
+        self.intervalos = None
+        self.versao_predicoes = None
+
+    def __len__(self):
+        return len(self._dados)
+
+    @property
+    def colunas(self):
+        return self._dados.columns
+
+    def visao(self, colunas=None):
+        """
+        Visão só de leitura dos dados, sem cópia. Com Copy-on-Write uma
+        alteração nela cria cópia própria; sem ele os arrays são somente
+        leitura (quem precisar alterar faz .copy()).
+        """
+        dados = self._dados if colunas is None else self._dados[list(colunas)]
+        return dados.copy(deep=False) if _copy_on_write() else _somente_leitura(dados)
+
+    def coluna(self, nome):
+        """Array numpy de uma coluna, marcado como somente leitura."""
+        valores = self._dados[nome].to_numpy().view()
+        valores.flags.writeable = False
+        return valores
+
+    def definir_predicoes(self, predicoes, intervalos=None):
+        """
+        Guarda as previsões (uma por linha, na ordem do dataset) e, se houver,
+        a faixa P10/P50/P90 de cada uma; gera uma nova versão delas.
+        """
+        predicoes = np.array(predicoes, dtype=np.float64)
+        if predicoes.shape != (len(self),):
+            raise ValueError(f"Esperada uma previsão por sprint ({len(self)}), recebido {predicoes.shape}.")
+        if intervalos is not None:
+            # float32: a precisão dos valores das folhas da floresta
+            intervalos = np.array(intervalos, dtype=np.float32)
+            if intervalos.shape != (len(self), len(COLUNAS_INTERVALO)):
+                raise ValueError(f"Esperados {len(COLUNAS_INTERVALO)} quantis por sprint, recebido {intervalos.shape}.")
+            intervalos.flags.writeable = False
+        predicoes.flags.writeable = False
+        self.predicoes = predicoes
+        self.intervalos = intervalos
+        self.versao_predicoes = uuid.uuid4().hex
+
+    def com_predicoes(self, colunas=None):
+        """
+        Visão dos dados com a coluna de previsões ao lado (NaN antes da
+        estimativa) e, quando calculadas, as colunas P10/P50/P90.
+        """
+        calculadas = [COLUNA_PREVISAO] + COLUNAS_INTERVALO
+        dados = self.visao(None if colunas is None else [c for c in colunas if c not in calculadas])
+        predicoes = self.predicoes if self.predicoes is not None else np.full(len(self), np.nan)
+        dados[COLUNA_PREVISAO] = predicoes
+        if self.intervalos is not None:
+            for i, nome in enumerate(COLUNAS_INTERVALO):
+                if colunas is None or nome in colunas:
+                    dados[nome] = self.intervalos[:, i]
+        return dados if colunas is None else dados[list(colunas)]
+
+    def memoria_bytes(self):
+        """Bytes guardados por esta sessão: dados compactados mais as previsões (e a faixa)."""
+        calculados = [a for a in (self.predicoes, self.intervalos) if a is not None]
+        return self.memoria_dados + sum(a.nbytes for a in calculados)
@@ -0,0 +1,128 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from scripts_app import artefatos
+from scripts_app.cache_predicoes import chaves_linhas
+
+try:
+    import shap
+except ImportError:  # dependência opcional: sem ela o app só não mostra as explicações
+    shap = None
+
+# -------------------------------
+# Explicações das estimativas (TreeSHAP)
+# -------------------------------
+# O TreeExplainer é montado uma vez por versão do modelo (via registro de
+# artefatos, que recarrega quando o arquivo muda) e só explica as linhas
+# pedidas: as selecionadas na tabela ou a página visível. As contribuições
+# ficam num cache em memória do processo, pela versão do modelo + hash da
+# linha de features, e as linhas que faltam passam pelo TreeSHAP num lote só.
+# O cálculo pode rodar numa thread de fundo para não travar a página.
+
+MAX_LINHAS_CACHE = 200_000
+
+# Uma thread: as explicações de todas as sessões entram numa fila só
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explicacoes")
+
+
+def shap_disponivel():
+    return shap is not None
+
+
+def carregar_explicador(model_path):
+    """Carregador para o registro de artefatos: TreeExplainer do modelo do arquivo."""
+    return shap.TreeExplainer(artefatos.load_model(model_path))
+
+
+class CacheExplicacoes:
+    """Contribuições por (versão do modelo, hash da linha), com despejo LRU acima de `max_linhas`."""
+
+    def __init__(self, max_linhas=MAX_LINHAS_CACHE):
+        self.max_linhas = max_linhas
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def buscar(self, versao, chaves):
+        """Dict posição -> contribuições para as chaves que estão no cache."""
+        encontrados = {}
+        with self._lock:
+            for i, chave in enumerate(chaves):
+                valor = self._itens.get((versao, chave))
+                if valor is not None:
+                    self._itens.move_to_end((versao, chave))
+                    encontrados[i] = valor
+            self.acertos += len(encontrados)
+            self.falhas += len(chaves) - len(encontrados)
+        return encontrados
+
+    def guardar(self, versao, chaves, valores):
+        with self._lock:
+            for chave, valor in zip(chaves, valores):
+                self._itens[(versao, chave)] = valor
+                self._itens.move_to_end((versao, chave))
+            while len(self._itens) > self.max_linhas:
+                self._itens.popitem(last=False)
+
+    def estatisticas(self):
+        with self._lock:
+            return {"entradas": len(self._itens), "acertos": self.acertos, "falhas": self.falhas}
+
+
+_cache = CacheExplicacoes()
+
+
+def obter_cache():
+    return _cache
+
+
+def explicar(explicador, versao, X, cache=None):
+    """
+    (contribuições linhas x features, valor base) para a matriz X do modelo.
+    Linhas já explicadas vêm do cache; as demais (sem repetição) passam pelo
+    TreeSHAP numa chamada só.
+    """
+    cache = cache or _cache
+    X = np.asarray(X, dtype=np.float32)
+    chaves = chaves_linhas(X)
+    contribuicoes = np.empty(X.shape, dtype=np.float64)
+
+    encontrados = cache.buscar(versao, chaves)
+    for i, valor in encontrados.items():
+        contribuicoes[i] = valor
+
+    faltando = np.array([i for i in range(len(X)) if i not in encontrados], dtype=np.intp)
+    if len(faltando):
+        unicas, primeira, inverso = np.unique(chaves[faltando], return_index=True, return_inverse=True)
+        valores = np.asarray(explicador.shap_values(X[faltando[primeira]]), dtype=np.float64)
+        contribuicoes[faltando] = valores[inverso.ravel()]
+        cache.guardar(versao, unicas, valores)
+
+    base = float(np.ravel(explicador.expected_value)[0])
+    return contribuicoes, base
+
+
+def _explicar_modelo(model_path, X):
+    artefato = artefatos.obter(model_path, carregar_explicador)
+    return explicar(artefato.valor, artefato.versao, X)
+
+
+def explicar_linhas(model_path, X, segundo_plano=True):
+    """
+    Future com (contribuições, valor base) das linhas de X. Em segundo plano o
+    cálculo vai para a fila de explicações e a página segue sem esperar;
+    senão roda aqui mesmo e o Future já volta pronto.
+    """
+    if segundo_plano:
+        return _executor.submit(_explicar_modelo, model_path, X)
+
+    futuro = Future()
+    try:
+        futuro.set_result(_explicar_modelo(model_path, X))
+    except Exception as e:
+        futuro.set_exception(e)
+    return futuro
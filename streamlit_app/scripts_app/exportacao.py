@@ -0,0 +1,158 @@
+import gzip
+import os
+import uuid
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from scripts_app.io_datasets import para_tabela
+
+# -------------------------------
+# Exportação dos resultados (botão "📥 Baixar resultados")
+# -------------------------------
+# O arquivo só é gerado quando alguém pede o download, e é escrito em blocos
+# de linhas direto no disco (já comprimido), sem montar o arquivo inteiro em
+# memória. Cada arquivo fica em cache pela versão do dataset + versão das
+# previsões: pedir de novo o mesmo download só relê o arquivo pronto.
+# Exportações grandes são divididas em partes de até LINHAS_POR_PARTE linhas,
+# cada uma um arquivo completo: o botão de download do Streamlit guarda o
+# arquivo inteiro em memória, então a sessão só carrega a parte escolhida.
+
+FORMATOS = {
+    "csv.gz": {"rotulo": "CSV (gzip)", "mime": "application/gzip", "compressao": "gzip"},
+    "csv.zst": {"rotulo": "CSV (zstd)", "mime": "application/zstd", "compressao": "zstd"},
+    "parquet": {"rotulo": "Parquet", "mime": "application/vnd.apache.parquet", "compressao": None},
+}
+
+TAMANHO_BLOCO = 250_000
+LINHAS_POR_PARTE = 1_000_000
+# gzip rápido: o nível padrão do pyarrow (9) leva ~10x mais tempo para um arquivo ~20% menor
+NIVEL_GZIP = 1
+MAX_ARQUIVOS = 20  # exportações mais antigas da pasta são apagadas acima disso
+
+
+def caminhos_exportacao(pasta, dataset, formato, linhas_por_parte=LINHAS_POR_PARTE):
+    """
+    Arquivos da exportação de `dataset` (versão dos dados + das previsões) em
+    `formato`: um só, ou um por parte de até `linhas_por_parte` linhas.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato não suportado: {formato}. Use um de {list(FORMATOS)}.")
+    base = f"{dataset.versao}_{dataset.versao_predicoes}"
+    n_partes = max(1, -(-len(dataset) // linhas_por_parte))
+    if n_partes == 1:
+        return [os.path.join(pasta, f"{base}.{formato}")]
+    return [os.path.join(pasta, f"{base}.parte{k + 1}de{n_partes}.{formato}") for k in range(n_partes)]
+
+
+def blocos_tabela(df, tamanho_bloco=TAMANHO_BLOCO):
+    """Blocos de linhas de `df` como tabelas do pyarrow, já no esquema tipado."""
+    for inicio in range(0, len(df), tamanho_bloco):
+        yield para_tabela(df.iloc[inicio:inicio + tamanho_bloco])
+
+
+def _sem_dicionarios(tabela):
+    # O CSV recebe o texto das categorias
+    for i, campo in enumerate(tabela.schema):
+        if pa.types.is_dictionary(campo.type):
+            tabela = tabela.set_column(i, campo.name, tabela.column(i).cast(campo.type.value_type))
+    return tabela
+
+
+def _saida_comprimida(destino, compressao):
+    if compressao == "gzip":
+        return gzip.open(destino, "wb", compresslevel=NIVEL_GZIP)
+    return pa.CompressedOutputStream(destino, compressao)
+
+
+def gravar_csv(blocos, destino, compressao="gzip"):
+    """CSV comprimido (gzip/zstd), escrito bloco a bloco."""
+    escritor = None
+    with _saida_comprimida(destino, compressao) as saida:
+        for tabela in blocos:
+            tabela = _sem_dicionarios(tabela)
+            if escritor is None:
+                escritor = pa_csv.CSVWriter(saida, tabela.schema,
+                                            write_options=pa_csv.WriteOptions(quoting_style="needed"))
+            escritor.write_table(tabela)
+        if escritor is not None:
+            escritor.close()
+    return destino
+
+
+def gravar_parquet_blocos(blocos, destino):
+    """Parquet (zstd) com um row group por bloco."""
+    escritor = None
+    for tabela in blocos:
+        if escritor is None:
+            escritor = pq.ParquetWriter(destino, tabela.schema, compression="zstd")
+        escritor.write_table(tabela)
+    if escritor is not None:
+        escritor.close()
+    return destino
+
+
+def _limpar(pasta, max_arquivos=MAX_ARQUIVOS):
+    """
+    Mantém só as `max_arquivos` exportações usadas mais recentemente (as
+    partes de uma exportação saem juntas). Outra sessão pode apagar arquivos
+    ao mesmo tempo: os que somem no meio são ignorados.
+    """
+    exportacoes = {}
+    for nome in os.listdir(pasta):
+        if nome.endswith(".tmp"):
+            continue
+        caminho = os.path.join(pasta, nome)
+        try:
+            uso = os.path.getmtime(caminho)
+        except FileNotFoundError:
+            continue
+        chave = nome.split(".")[0]  # versão dos dados + das previsões
+        usos, caminhos = exportacoes.setdefault(chave, ([], []))
+        usos.append(uso)
+        caminhos.append(caminho)
+
+    ordem = sorted(exportacoes.values(), key=lambda exportacao: max(exportacao[0]), reverse=True)
+    for _, caminhos in ordem[max_arquivos:]:
+        for caminho in caminhos:
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+
+
+def exportar(dataset, formato, pasta, tamanho_bloco=TAMANHO_BLOCO, linhas_por_parte=LINHAS_POR_PARTE):
+    """
+    Caminhos dos arquivos (um por parte) com os dados + previsões de
+    `dataset` em `formato`. Gera os arquivos só se ainda não existem para
+    estas versões; a escrita vai para temporários que só são renomeados no
+    fim, então um download nunca vê um arquivo pela metade.
+    """
+    caminhos = caminhos_exportacao(pasta, dataset, formato, linhas_por_parte)
+    try:
+        for caminho in caminhos:
+            os.utime(caminho)  # conta como uso recente na limpeza
+        return caminhos
+    except FileNotFoundError:
+        pass  # ainda não gerada (ou apagada por outra sessão)
+
+    os.makedirs(pasta, exist_ok=True)
+    dados = dataset.com_predicoes()
+    temporarios = [f"{caminho}.{uuid.uuid4().hex}.tmp" for caminho in caminhos]
+    try:
+        for k, temporario in enumerate(temporarios):
+            blocos = blocos_tabela(dados.iloc[k * linhas_por_parte:(k + 1) * linhas_por_parte], tamanho_bloco)
+            if formato == "parquet":
+                gravar_parquet_blocos(blocos, temporario)
+            else:
+                gravar_csv(blocos, temporario, FORMATOS[formato]["compressao"])
+        for temporario, caminho in zip(temporarios, caminhos):
+            os.replace(temporario, caminho)
+    finally:
+        for temporario in temporarios:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+    _limpar(pasta)
+    return caminhos
@@ -1,48 +1,265 @@
+import codecs
+import json
+import os
 import re
+import shutil
+import sys
+import tempfile
 import requests
 import pandas as pd
 
-def get_trello_cards_public(url: str) -> pd.DataFrame:
+TAMANHO_BLOCO = 5000  # registros por bloco
+TAMANHO_LEITURA = 1 << 20  # bytes lidos por vez
+
+# Chaves do JSON do board necessárias para montar os registros dos cards
+CHAVES_REFERENCIA = {"lists", "members", "customFields"}
+
+_ESPACOS = re.compile(r"[ \t\n\r]*")
+
+
+# -------------------------------
+# Leitor incremental de JSON
+# -------------------------------
+# Lê o arquivo em pedaços e decodifica um valor por vez com o decodificador
+# em C do módulo json. Arrays são percorridos elemento a elemento, então a
+# memória fica limitada ao pedaço lido mais o maior elemento — e não ao
+# arquivo inteiro. Valores ignorados (ex.: actions, checklists) são
+# decodificados e descartados na hora.
+
+class _LeitorJSON:
+
+    def __init__(self, arquivo, tamanho_leitura=TAMANHO_LEITURA):
+        self.arquivo = arquivo
+        self.tamanho_leitura = tamanho_leitura
+        self.decodificador = codecs.getincrementaldecoder("utf-8")()
+        self.json = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.fim = False
+
+    def _carregar(self, minimo=0):
+        dados = self.arquivo.read(max(self.tamanho_leitura, minimo))
+        self.fim = not dados
+        self.buf = self.buf[self.pos:] + self.decodificador.decode(dados, final=self.fim)
+        self.pos = 0
+
+    def proximo(self):
+        """Pula espaços e retorna o próximo caractere sem consumi-lo ('' no fim)."""
+        while True:
+            self.pos = _ESPACOS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or self.fim:
+                return self.buf[self.pos:self.pos + 1]
+            self._carregar()
+
+    def consumir(self, esperado):
+        if self.proximo() != esperado:
+            raise ValueError(f"JSON inválido: esperado '{esperado}' na posição {self.pos}")
+        self.pos += 1
+
+    def valor(self):
+        """Decodifica o próximo valor completo, lendo mais do arquivo se ele estiver cortado."""
+        self.proximo()
+        while True:
+            try:
+                valor, fim = self.json.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fim:
+                    raise
+                # Elementos maiores que o pedaço: a leitura dobra a cada tentativa
+                self._carregar(minimo=len(self.buf))
+                continue
+            # Um número no fim do buffer pode continuar no próximo pedaço
+            if fim == len(self.buf) and not self.fim:
+                self._carregar(minimo=len(self.buf))
+                continue
+            self.pos = fim
+            return valor
+
+    def elementos(self):
+        """Gera os elementos do array atual, um por vez."""
+        self.consumir("[")
+        if self.proximo() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.valor()
+            if self.proximo() == "]":
+                self.pos += 1
+                return
+            self.consumir(",")
+
+    def chaves(self):
+        """Gera as chaves do objeto atual; quem itera deve consumir o valor de cada uma."""
+        self.consumir("{")
+        if self.proximo() == "}":
+            self.pos += 1
+            return
+        while True:
+            chave = self.valor()
+            self.consumir(":")
+            yield chave
+            if self.proximo() == "}":
+                self.pos += 1
+                return
+            self.consumir(",")
+
+    def pular(self):
+        if self.proximo() == "[":
+            for _ in self.elementos():
+                pass
+        else:
+            self.valor()
+
+
+# -------------------------------
+# Registros
+# -------------------------------
+
+def _em_blocos(registros, tamanho_bloco):
+    bloco = []
+    for registro in registros:
+        bloco.append(registro)
+        if len(bloco) >= tamanho_bloco:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+
+def _referencias(leitor, chave, referencias):
+    """Guarda só o necessário de lists, members e customFields."""
+    if chave == "lists":
+        referencias["lists"] = {lst["id"]: lst.get("name") for lst in leitor.elementos()}
+    elif chave == "members":
+        referencias["members"] = {m["id"]: m.get("fullName", "") for m in leitor.elementos()}
+    elif chave == "customFields":
+        referencias["customFields"] = {
+            campo["id"]: (campo.get("name"), {
+                opcao["id"]: list(opcao.get("value", {}).values())[0]
+                for opcao in campo.get("options", []) if opcao.get("value")
+            })
+            for campo in leitor.elementos()
+        }
+
+
+def _registro_card(card, referencias):
+    listas = referencias.get("lists", {})
+    membros = referencias.get("members", {})
+    campos = referencias.get("customFields", {})
+
+    card_data = {
+        "list_id": card.get("idList"),
+        "list_name": listas.get(card.get("idList"), "Unknown"),
+        "card_id": card.get("id"),
+        "card_name": card.get("name"),
+        "card_url": f"https://trello.com/c/{card.get('shortLink')}",
+        "card_due": card.get("due"),
+        "card_labels": ", ".join([label.get("name", "") for label in card.get("labels", [])]),
+        "card_members": ", ".join([membros.get(m, "") for m in card.get("idMembers", [])]),
+    }
+
+    for cfi in card.get("customFieldItems", []):
+        field_name, opcoes = campos.get(cfi.get("idCustomField"), (f"custom_{cfi.get('idCustomField')}", {}))
+        value = cfi.get("value")
+        if value:
+            card_data[f"custom_{field_name}"] = list(value.values())[0]  # pode ser texto, número, etc.
+        elif cfi.get("idValue"):
+            card_data[f"custom_{field_name}"] = opcoes.get(cfi["idValue"], cfi["idValue"])
+
+    return card_data
+
+
+def iterar_cartoes_arquivo(caminho, tamanho_bloco=TAMANHO_BLOCO, tamanho_leitura=TAMANHO_LEITURA):
     """
-    Recebe link público do Trello e retorna um DataFrame com cards e listas.
-    Funciona sem autenticação (somente boards públicos).
+    Gera blocos (listas de dicts) com os cards de um export JSON do board.
+    Aceita o JSON do board (https://trello.com/b/<id>.json) ou uma lista de
+    registros já planos (ex.: tests/storypoints_bugs_ciclo.json).
+
+    No export do Trello os cards vêm antes de lists/members/customFields;
+    nesse caso a primeira leitura só coleta essas referências e uma segunda
+    leitura do arquivo gera os cards.
     """
+    referencias = {}
+    cards_pendentes = False
+
+    with open(caminho, "rb") as arquivo:
+        leitor = _LeitorJSON(arquivo, tamanho_leitura)
+
+        # Formato plano: os elementos já são os registros
+        if leitor.proximo() == "[":
+            yield from _em_blocos(leitor.elementos(), tamanho_bloco)
+            return
+
+        for chave in leitor.chaves():
+            if chave in CHAVES_REFERENCIA:
+                _referencias(leitor, chave, referencias)
+            elif chave == "cards" and CHAVES_REFERENCIA <= referencias.keys():
+                registros = (_registro_card(card, referencias) for card in leitor.elementos())
+                yield from _em_blocos(registros, tamanho_bloco)
+            elif chave == "cards":
+                cards_pendentes = True
+                leitor.pular()
+            else:
+                leitor.pular()
+
+    if not cards_pendentes:
+        return
+
+    with open(caminho, "rb") as arquivo:
+        leitor = _LeitorJSON(arquivo, tamanho_leitura)
+        for chave in leitor.chaves():
+            if chave == "cards":
+                registros = (_registro_card(card, referencias) for card in leitor.elementos())
+                yield from _em_blocos(registros, tamanho_bloco)
+                return
+            leitor.pular()
+
+
+def _board_id(url):
     # Regex para validar link público do Trello
     public_regex = r"^https://trello\.com/b/([a-zA-Z0-9]+)/?.*$"
     match = re.match(public_regex, url)
-    
+
     if not match:
         raise ValueError("Link inválido! Formato esperado: https://trello.com/b/<BOARD_ID>/<BOARD_NAME>")
+    return match.group(1)
 
-    board_id = match.group(1)
+
+def iterar_cartoes_publicos(url_ou_caminho, tamanho_bloco=TAMANHO_BLOCO, tamanho_leitura=TAMANHO_LEITURA):
+    """
+    Como `iterar_cartoes_arquivo`, mas aceita também o link público do board:
+    o JSON é baixado em pedaços para um arquivo temporário e lido de lá.
+    """
+    if os.path.exists(url_ou_caminho):
+        yield from iterar_cartoes_arquivo(url_ou_caminho, tamanho_bloco, tamanho_leitura)
+        return
+
+    board_id = _board_id(url_ou_caminho)
     print(f" Board ID detectado: {board_id}")
 
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, f"{board_id}.json")
+        with requests.get(f"https://trello.com/b/{board_id}.json", stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            with open(caminho, "wb") as arquivo:
+                shutil.copyfileobj(response.raw, arquivo, tamanho_leitura)
+
+        yield from iterar_cartoes_arquivo(caminho, tamanho_bloco, tamanho_leitura)
+
+
+def get_trello_cards_public(url: str) -> pd.DataFrame:
+    """
+    Recebe link público do Trello (ou caminho de um export JSON salvo) e
+    retorna um DataFrame com cards e listas.
+    Funciona sem autenticação (somente boards públicos).
+    """
+    if not os.path.exists(url):
+        _board_id(url)
+
     try:
-        # 1. Obter listas do board público
-        lists_url = f"https://trello.com/b/{board_id}.json"
-        response = requests.get(lists_url)
-        response.raise_for_status()
-        data = response.json()
-
-        # O JSON do Trello público contém listas e cards
-        lists = {lst["id"]: lst["name"] for lst in data["lists"]}
-        all_cards = []
-
-        for card in data["cards"]:
-            list_name = lists.get(card.get("idList"), "Unknown")
-            card_data = {
-                "list_id": card.get("idList"),
-                "list_name": list_name,
-                "card_id": card.get("id"),
-                "card_name": card.get("name"),
-                "card_url": f"https://trello.com/c/{card.get('shortLink')}",
-                "card_due": card.get("due"),
-                "card_labels": ", ".join([label.get("name", "") for label in card.get("labels", [])]),
-            }
-            all_cards.append(card_data)
-
-        df = pd.DataFrame(all_cards)
-        return df
+        blocos = [pd.DataFrame(bloco) for bloco in iterar_cartoes_publicos(url)]
+        return pd.concat(blocos, ignore_index=True) if blocos else pd.DataFrame()
 
     except requests.exceptions.RequestException as err:
         print(f"Erro na requisição: {err}")
@@ -52,4 +269,5 @@ def get_trello_cards_public(url: str) -> pd.DataFrame:
         return pd.DataFrame()
 
 
-get_trello_cards_public("https://trello.com/b/DKf6KNh2/testeagileestimator")
+if __name__ == "__main__":
+    print(get_trello_cards_public(sys.argv[1] if len(sys.argv) > 1 else "https://trello.com/b/DKf6KNh2/testeagileestimator"))
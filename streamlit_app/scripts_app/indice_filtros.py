@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from scripts_app.dados_graficos import codigos_categoria
+
+# -------------------------------
+# Índice dos filtros da aba Visualizações
+# -------------------------------
+# Montado uma vez por dataset + previsões. Domínio e sprint viram códigos
+# inteiros (o filtro por lista de valores é uma consulta numa tabela de
+# booleanos por código), o número da sprint é extraído só dos sprint_ids
+# distintos, e as linhas ficam ordenadas pela produtividade prevista: o
+# filtro por intervalo é uma fatia achada com searchsorted, sem percorrer o
+# dataset inteiro.
+
+
+def numeros_sprint(ids):
+    """
+    Primeiro número de cada sprint_id ("Sprint_12" -> 12.0; sem número -> NaN).
+    O regex roda no pyarrow, bem mais rápido que o str.extract do pandas.
+    """
+    extraido = pc.extract_regex(pa.array(pd.Series(ids, copy=False).astype(str)), r"(?P<n>\d+)").field("n")
+    # Ids sem número voltam como texto vazio
+    extraido = pc.if_else(pc.equal(extraido, ""), pa.scalar(None, extraido.type), extraido)
+    return pc.cast(extraido, pa.float64()).to_numpy(zero_copy_only=False)
+
+
+class IndiceFiltros:
+
+    def __init__(self, data, coluna="produtividade_prevista"):
+        self.n = len(data)
+        # Só os domínios/sprints presentes aparecem nas opções dos filtros
+        dominios = data["tipo_dominio"]
+        if isinstance(dominios.dtype, pd.CategoricalDtype):
+            dominios = dominios.cat.remove_unused_categories()
+        self.codigos_dominio, self.dominios = codigos_categoria(dominios)
+        self.codigos_sprint, self.sprints = codigos_categoria(data["sprint_id"])
+        self.dominios, self.sprints = pd.Index(self.dominios), pd.Index(self.sprints)
+
+        # Número da sprint ("Sprint_12" -> 12): o regex roda só nos ids distintos
+        self.sprint_num = np.append(numeros_sprint(self.sprints), np.nan)[self.codigos_sprint]  # código -1 (ausente) -> NaN
+
+        # Permutação pela previsão (NaN vão para o fim e ficam fora de qualquer intervalo)
+        valores = data[coluna].to_numpy(dtype=np.float64)
+        self.ordem = np.argsort(valores, kind="stable")
+        self.valores_ordenados = valores[self.ordem]
+        validos = self.valores_ordenados[~np.isnan(self.valores_ordenados)]
+        self.minimo = float(validos[0]) if len(validos) else np.nan
+        self.maximo = float(validos[-1]) if len(validos) else np.nan
+
+    def memoria_bytes(self):
+        """Bytes dos arrays do índice (entra na memória da sessão)."""
+        arrays = [self.codigos_dominio, self.codigos_sprint, self.sprint_num, self.ordem, self.valores_ordenados]
+        return int(sum(a.nbytes for a in arrays) + self.sprints.memory_usage(deep=True))
+
+    @staticmethod
+    def _permitidos(categorias, selecionados):
+        """Tabela de booleanos por código: True para as categorias selecionadas."""
+        tabela = np.zeros(len(categorias) + 1, dtype=bool)  # última posição: código -1
+        indices = categorias.get_indexer(list(selecionados))
+        tabela[indices[indices >= 0]] = True
+        return tabela
+
+    def filtrar(self, faixa, dominios, sprints=None):
+        """
+        Posições (em ordem crescente) das linhas com a previsão dentro de
+        `faixa` (inclusive), o domínio em `dominios` e, se informado, a sprint
+        em `sprints`.
+        """
+        inicio = np.searchsorted(self.valores_ordenados, faixa[0], side="left")
+        fim = np.searchsorted(self.valores_ordenados, faixa[1], side="right")
+        candidatos = self.ordem[inicio:fim]
+
+        permitidos = self._permitidos(self.dominios, dominios)
+        # Com todos os domínios marcados (o padrão) a consulta por código é dispensada
+        if not permitidos[:-1].all():
+            candidatos = candidatos[permitidos[self.codigos_dominio[candidatos]]]
+        if sprints is not None:
+            candidatos = candidatos[self._permitidos(self.sprints, sprints)[self.codigos_sprint[candidatos]]]
+
+        # Volta para a ordem original das linhas com um bitmap (sem ordenar)
+        mascara = np.zeros(self.n, dtype=bool)
+        mascara[candidatos] = True
+        return np.flatnonzero(mascara)
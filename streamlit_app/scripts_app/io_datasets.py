@@ -0,0 +1,302 @@
+import os
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# -------------------------------
+# Leitura e escrita tipadas dos datasets (Parquet/Arrow)
+# -------------------------------
+# Os datasets de sprints seguem um esquema declarado: tipo_dominio como
+# categoria, datas como date32, contagens em inteiros pequenos e as demais
+# medidas em float32, exceto as que entram no modelo: essas ficam em
+# float64, como no treino, para que as previsões não mudem com o formato.
+# O formato principal é Parquet (um arquivo ou uma pasta particionada), lido
+# só com as colunas pedidas e com os filtros aplicados na leitura (linhas e
+# partições que não passam nem são carregadas). CSV continua aceito na
+# entrada e é convertido para o mesmo esquema; Excel é só uma exportação
+# opcional, gravada linha a linha.
+
+DOMINIO = pa.dictionary(pa.int8(), pa.string())
+
+# Sprints "brutas" (gerador, CSV do usuário, sprints montadas do Trello)
+ESQUEMA_SPRINTS = pa.schema([
+    ("sprint_id", pa.string()),
+    ("data_inicio", pa.date32()),
+    ("data_fim", pa.date32()),
+    ("qtd_membros", pa.int16()),
+    ("duracao_dias", pa.int16()),
+    ("cartoes_previstos", pa.int32()),
+    ("cartoes_entregues", pa.int32()),
+    ("story_points_previstos", pa.float32()),
+    ("story_points_entregues", pa.float32()),
+    ("tipo_dominio", DOMINIO),
+    # Entradas do modelo (direto ou via qtd_bugs/qtd_retrabalho e o scaler): float64 como no treino
+    ("complexidade_media", pa.float64()),
+    ("percentual_bugs", pa.float64()),
+    ("percentual_retrabalho", pa.float64()),
+    ("velocidade_passada", pa.float32()),
+    ("produtividade_estimada", pa.float64()),
+])
+
+# Dataset preparado para o treino (data_prepared*.parquet): domínio já
+# codificado pelo LabelEncoder e colunas escalonadas em float64
+ESQUEMA_PREPARADO = pa.schema([
+    ("qtd_membros", pa.int16()),
+    ("duracao_dias", pa.int16()),
+    ("cartoes_previstos", pa.int32()),
+    ("story_points_previstos", pa.float64()),
+    ("tipo_dominio", pa.int8()),
+    ("complexidade_media", pa.float64()),
+    ("percentual_bugs", pa.float64()),
+    ("percentual_retrabalho", pa.float64()),
+    ("velocidade_passada", pa.float32()),
+    ("produtividade_estimada", pa.float64()),
+])
+
+
+def esquema_para(colunas):
+    """Esquema pelo formato das colunas: com sprint_id são sprints; sem, o dataset preparado."""
+    return ESQUEMA_SPRINTS if "sprint_id" in colunas else ESQUEMA_PREPARADO
+
+
+def tipar(tabela, esquema=None):
+    """
+    Converte as colunas de `tabela` (pyarrow.Table) que existem no esquema
+    para o tipo declarado. Colunas fora do esquema (ex.: produtividade_prevista)
+    ficam como estão; colunas do esquema ausentes na tabela não são criadas.
+    """
+    esquema = esquema or esquema_para(tabela.column_names)
+    for campo in esquema:
+        if campo.name not in tabela.column_names:
+            continue
+        i = tabela.column_names.index(campo.name)
+        coluna = tabela.column(i)
+        if coluna.type == campo.type:
+            continue
+        if pa.types.is_dictionary(campo.type) and not pa.types.is_dictionary(coluna.type):
+            # Categoria sem nenhum valor (ex.: board sem domínio) chega do pandas como double/null
+            if coluna.null_count == len(coluna):
+                tabela = tabela.set_column(i, campo, pa.nulls(len(coluna), campo.type))
+                continue
+            coluna = coluna.cast(campo.type.value_type)
+        # Conversão segura: um float com fração numa coluna inteira gera erro em vez de truncar
+        tabela = tabela.set_column(i, campo, coluna.cast(campo.type))
+    return tabela
+
+
+def para_tabela(df, esquema=None):
+    # Sem os metadados do pandas, que restaurariam os dtypes originais no to_pandas
+    tabela = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+    return tipar(tabela, esquema)
+
+
+def para_pandas(tabela):
+    # Datas viram datetime64 (e não objetos date); dicionários viram Categorical
+    return tabela.to_pandas(date_as_object=False)
+
+
+def tipar_df(df, esquema=None):
+    """Atalho: aplica o esquema a um DataFrame já carregado."""
+    return para_pandas(para_tabela(df, esquema))
+
+
+# -------------------------------
+# Leitura
+# -------------------------------
+
+def _expressao(filtros):
+    """Aceita uma expressão do pyarrow ou filtros no formato [("coluna", "op", valor), ...]."""
+    if filtros is None or isinstance(filtros, pc.Expression):
+        return filtros
+    return pq.filters_to_expression(filtros)
+
+
+def _resolver(caminho):
+    """Se o Parquet não existir mas houver o CSV de mesmo nome, usa o CSV."""
+    if not os.path.exists(caminho) and caminho.endswith(".parquet"):
+        alternativo = caminho[:-len(".parquet")] + ".csv"
+        if os.path.exists(alternativo):
+            return alternativo
+    return caminho
+
+
+def _cabecalho(origem):
+    """Nomes das colunas de um CSV (lê só o primeiro bloco)."""
+    nomes = pa_csv.open_csv(origem, read_options=pa_csv.ReadOptions(block_size=1 << 16)).schema.names
+    if hasattr(origem, "seek"):
+        origem.seek(0)
+    return nomes
+
+
+def _opcoes_csv(esquema, colunas=None):
+    # Tipos simples já saem do parser; os dicionários (int8) são convertidos depois
+    tipos = {campo.name: campo.type for campo in esquema if not pa.types.is_dictionary(campo.type)}
+    return pa_csv.ConvertOptions(column_types=tipos, include_columns=colunas, strings_can_be_null=True)
+
+
+def _ler_csv(origem, colunas=None, esquema=None):
+    esquema = esquema or esquema_para(_cabecalho(origem))
+    return tipar(pa_csv.read_csv(origem, convert_options=_opcoes_csv(esquema, colunas)), esquema)
+
+
+def abrir_dataset(caminho):
+    """pyarrow.dataset de um arquivo Parquet ou de uma pasta (particionada em estilo hive ou não)."""
+    return ds.dataset(caminho, format="parquet", partitioning="hive")
+
+
+def ler_tabela(caminho, colunas=None, filtros=None, esquema=None):
+    """
+    Lê um dataset (Parquet, pasta particionada ou CSV) como pyarrow.Table já
+    tipada. `colunas` limita as colunas lidas; `filtros` é aplicado durante a
+    leitura do Parquet (partições e row groups fora do filtro são pulados).
+    """
+    caminho = _resolver(caminho)
+    expressao = _expressao(filtros)
+
+    if caminho.endswith(".csv"):
+        tabela = _ler_csv(caminho, esquema=esquema)
+        if expressao is not None:
+            tabela = tabela.filter(expressao)
+        return tabela.select(colunas) if colunas else tabela
+
+    tabela = abrir_dataset(caminho).to_table(columns=colunas, filter=expressao)
+    return tipar(tabela, esquema)
+
+
+def ler_dataset(caminho, colunas=None, filtros=None, esquema=None):
+    """Como `ler_tabela`, mas retorna um DataFrame."""
+    return para_pandas(ler_tabela(caminho, colunas, filtros, esquema))
+
+
+def iterar_dataset(caminho, tamanho_bloco=100_000, colunas=None, filtros=None, esquema=None):
+    """Gera DataFrames de até `tamanho_bloco` linhas, sem carregar o dataset inteiro."""
+    caminho = _resolver(caminho)
+    expressao = _expressao(filtros)
+
+    if caminho.endswith(".csv"):
+        esquema = esquema or esquema_para(_cabecalho(caminho))
+        # Os tipos são fixados pelo esquema (e não inferidos do primeiro bloco)
+        leitor = pa_csv.open_csv(caminho, read_options=pa_csv.ReadOptions(block_size=1 << 22),
+                                 convert_options=_opcoes_csv(esquema))
+        for lote in leitor:
+            tabela = tipar(pa.Table.from_batches([lote]), esquema)
+            if expressao is not None:
+                tabela = tabela.filter(expressao)
+            if colunas:
+                tabela = tabela.select(colunas)
+            for fatia in tabela.to_batches(max_chunksize=tamanho_bloco):
+                yield para_pandas(pa.Table.from_batches([fatia]))
+        return
+
+    lotes = abrir_dataset(caminho).to_batches(columns=colunas, filter=expressao, batch_size=tamanho_bloco)
+    for lote in lotes:
+        if lote.num_rows:
+            yield para_pandas(tipar(pa.Table.from_batches([lote]), esquema))
+
+
+def ler_upload(arquivo, nome=None):
+    """Arquivo enviado pelo usuário (objeto com .read/.seek), em CSV ou Parquet."""
+    nome = nome or getattr(arquivo, "name", "")
+    if nome.endswith(".parquet"):
+        return para_pandas(tipar(pq.read_table(arquivo)))
+    return para_pandas(_ler_csv(arquivo))
+
+
+def tamanho_upload(arquivo, nome=None):
+    """
+    Bytes que o upload ocupa ao ser lido, estimados sem ler os dados: o
+    tamanho descomprimido declarado no rodapé do Parquet ou o tamanho do CSV.
+    """
+    nome = nome or getattr(arquivo, "name", "")
+    if nome.endswith(".parquet"):
+        metadados = pq.ParquetFile(arquivo).metadata
+        arquivo.seek(0)
+        return sum(metadados.row_group(i).total_byte_size for i in range(metadados.num_row_groups))
+    tamanho = getattr(arquivo, "size", None)
+    if tamanho is None:
+        tamanho = arquivo.seek(0, os.SEEK_END)
+        arquivo.seek(0)
+    return tamanho
+
+
+# -------------------------------
+# Escrita
+# -------------------------------
+
+def gravar_parquet(df, caminho, particoes=None, esquema=None):
+    """
+    Grava `df` (DataFrame ou pyarrow.Table) em Parquet tipado. Sem
+    `particoes`, um único arquivo; com `particoes` (ex.: ["tipo_dominio"]),
+    uma pasta em estilo hive (tipo_dominio=Web/part-0.parquet, ...), cujas
+    partições não lidas são puladas pelos filtros de `ler_dataset`.
+    """
+    tabela = df if isinstance(df, pa.Table) else para_tabela(df, esquema)
+    tabela = tipar(tabela, esquema)
+
+    if not particoes:
+        pq.write_table(tabela, caminho, compression="zstd")
+        return caminho
+
+    ds.write_dataset(
+        tabela, caminho, format="parquet",
+        partitioning=ds.partitioning(tabela.select(particoes).schema, flavor="hive"),
+        existing_data_behavior="delete_matching",
+        file_options=ds.ParquetFileFormat().make_write_options(compression="zstd"),
+    )
+    return caminho
+
+
+def gravar_dataset(df, caminho, esquema=None):
+    """Grava pelo formato da extensão: .parquet (tipado) ou .csv."""
+    if caminho.endswith(".csv"):
+        df.to_csv(caminho, index=False, date_format="%Y-%m-%d")
+    else:
+        gravar_parquet(df, caminho, esquema=esquema)
+    return caminho
+
+
+def exportar_excel(df, caminho, aba="Sprints", largura_colunas=None, tamanho_bloco=50_000):
+    """
+    Exporta para .xlsx com o openpyxl em modo write-only: as linhas vão para o
+    arquivo conforme são escritas, em vez de montar a planilha inteira em
+    memória. Cabeçalho em negrito e largura das colunas pelo nome (ou
+    `largura_colunas`). `df` pode ser um DataFrame ou um iterável de blocos.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
+    blocos = [df] if hasattr(df, "columns") else df
+    livro = Workbook(write_only=True)
+    planilha = livro.create_sheet(aba)
+    cabecalho = None
+
+    for bloco in blocos:
+        if cabecalho is None:
+            cabecalho = list(bloco.columns)
+            # No modo write-only as larguras precisam vir antes da primeira linha
+            for i, nome in enumerate(cabecalho, start=1):
+                largura = (largura_colunas or {}).get(nome, len(str(nome)) + 2)
+                planilha.column_dimensions[get_column_letter(i)].width = largura
+            celulas = []
+            for nome in cabecalho:
+                celula = WriteOnlyCell(planilha, value=nome)
+                celula.font = Font(bold=True)
+                celulas.append(celula)
+            planilha.append(celulas)
+
+        for inicio in range(0, len(bloco), tamanho_bloco):
+            parte = bloco.iloc[inicio:inicio + tamanho_bloco]
+            # Datas como date e categorias como texto (o openpyxl não conhece os tipos do pandas)
+            for coluna in parte.columns:
+                if str(parte[coluna].dtype).startswith("datetime64"):
+                    parte = parte.assign(**{coluna: parte[coluna].dt.date})
+            for linha in parte.astype(object).itertuples(index=False, name=None):
+                planilha.append([None if valor != valor else valor for valor in linha])
+
+    livro.save(caminho)
+    return caminho
@@ -0,0 +1,192 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Especificação das features (treino e serving)
+# -------------------------------
+# Única definição das features do modelo: o app, a pontuação em lote e o
+# treino (scripts/treinar_modelo.py) montam a matriz a partir daqui. Ao mudar
+# uma conta ou a lista, suba VERSAO_FEATURES: ela entra na chave do cache de
+# matrizes do treino e no bundle do modelo.
+
+VERSAO_FEATURES = 1
+
+FEATURES_MODELO = ['produtividade_estimada',
+       'tipo_dominio', 'complexidade_media',
+       'qtd_bugs', 'qtd_retrabalho',
+       'carga_cartoes_por_membro']
+
+# Features calculadas: nome -> (coluna, operação, coluna)
+FEATURES_DERIVADAS = {
+    "qtd_bugs": ("percentual_bugs", "*", "cartoes_previstos"),
+    "qtd_retrabalho": ("percentual_retrabalho", "*", "cartoes_previstos"),
+    "carga_cartoes_por_membro": ("cartoes_previstos", "/", "qtd_membros"),
+}
+
+OPERACOES = {"*": np.multiply, "/": np.divide}
+
+COLUNAS_ENTRADA = ['produtividade_estimada', 'tipo_dominio', 'complexidade_media',
+       'percentual_bugs', 'percentual_retrabalho',
+       'cartoes_previstos', 'qtd_membros']
+
+
+def especificacao_features():
+    """Especificação serializável (vai para o bundle do modelo e para a chave do cache)."""
+    return {
+        "versao": VERSAO_FEATURES,
+        "features": list(FEATURES_MODELO),
+        "derivadas": {nome: list(conta) for nome, conta in FEATURES_DERIVADAS.items()},
+    }
+
+
+def _preencher_derivadas(coluna, X):
+    # Contas em float64, arredondadas uma vez para float32 ao gravar em X
+    for nome, (a, operacao, b) in FEATURES_DERIVADAS.items():
+        OPERACOES[operacao](coluna(a), coluna(b), out=X[:, FEATURES_MODELO.index(nome)], casting="same_kind")
+
+
+def matriz_features(data):
+    """
+    Matriz (linhas x features) float32 a partir do dataset preparado para o
+    treino (tipo_dominio já codificado e produtividade_estimada já
+    escalonada), na ordem de FEATURES_MODELO.
+    """
+    colunas = {}
+
+    def coluna(nome):
+        if nome not in colunas:
+            colunas[nome] = np.asarray(data[nome], dtype=np.float64)
+        return colunas[nome]
+
+    X = np.empty((len(data), len(FEATURES_MODELO)), dtype=np.float32, order="F")
+    for j, nome in enumerate(FEATURES_MODELO):
+        if nome not in FEATURES_DERIVADAS:
+            X[:, j] = coluna(nome)
+    _preencher_derivadas(coluna, X)
+    return X
+
+
+# -------------------------------
+# Pré-processamento compartilhado (app e scripts de pontuação em lote)
+# -------------------------------
+
+def input_metrics(data):
+
+    for nome, (a, operacao, b) in FEATURES_DERIVADAS.items():
+        data[nome] = OPERACOES[operacao](data[a], data[b])
+
+    return data[FEATURES_MODELO]
+
+def preprocess_input(data, scaler, label_encoder):
+
+    # realizando o encoding do domino e escalonamento da produtividade_estimada
+    data['tipo_dominio'] = label_encoder.transform(data['tipo_dominio'])
+    
+    columns_to_scale = ['produtividade_estimada','story_points_previstos']
+    data[columns_to_scale] = scaler.transform(data[columns_to_scale])
+
+    data = input_metrics(data)
+
+    return data
+
+
+# -------------------------------
+# Pipeline de features compilado
+# -------------------------------
+# Mesmo resultado de preprocess_input, mas sem DataFrames intermediários: a
+# tabela de domínios e a média/escala do scaler são lidas uma vez, e a matriz
+# float32 de 6 colunas do modelo é montada direto num array pré-alocado.
+
+class PipelineFeatures:
+
+    def __init__(self, scaler, label_encoder):
+        nomes = list(getattr(scaler, "feature_names_in_", ['produtividade_estimada']))
+        indice = nomes.index('produtividade_estimada')
+
+        self.media = float(scaler.mean_[indice]) if scaler.with_mean else 0.0
+        self.escala = float(scaler.scale_[indice]) if scaler.with_std else 1.0
+        self.classes = pd.Index(label_encoder.classes_)
+
+    def codificar_dominio(self, valores):
+        """
+        Código do LabelEncoder para cada valor; domínios desconhecidos viram NaN.
+        Fatoriza os valores primeiro, então a busca na tabela é feita só uma vez
+        por domínio distinto e não por linha.
+        """
+        if not isinstance(valores, (pd.Series, pd.Index, pd.Categorical)):
+            valores = np.asarray(valores)
+        codigos, unicos = pd.factorize(valores, use_na_sentinel=True)
+        tabela = self.classes.get_indexer(unicos).astype(np.float32)
+        tabela[tabela < 0] = np.nan
+
+        # Sentinela -1 (valor ausente) cai na última posição, que é NaN
+        tabela = np.append(tabela, np.float32(np.nan))
+        return tabela[codigos]
+
+    def transform(self, data, desconhecido="nan"):
+        """
+        Monta a matriz (linhas x 6) em float32 para o modelo.
+        Retorna (X, desconhecidos), onde `desconhecidos` marca as linhas cujo
+        tipo_dominio não existe no encoder. Com desconhecido="erro" essas linhas
+        geram ValueError, como no preprocess_input. Features infinitas sempre
+        geram ValueError, como no sklearn.
+        """
+        n = len(data[COLUNAS_ENTRADA[0]])
+        X = np.empty((n, len(FEATURES_MODELO)), dtype=np.float32, order="F")
+
+        colunas = {}
+
+        def coluna(nome):
+            if nome not in colunas:
+                colunas[nome] = np.asarray(data[nome], dtype=np.float64)
+            return colunas[nome]
+
+        # As contas são feitas em float64 e arredondadas uma vez para float32,
+        # exatamente como acontece no caminho DataFrame -> sklearn
+        np.divide(coluna('produtividade_estimada') - self.media, self.escala, out=X[:, 0], casting="same_kind")
+        X[:, 1] = self.codificar_dominio(data['tipo_dominio'])
+        X[:, 2] = coluna('complexidade_media')
+        _preencher_derivadas(coluna, X)
+
+        # O sklearn recusa infinito na entrada; a floresta compilada não, e
+        # devolveria uma previsão qualquer (ex.: qtd_membros = 0 na carga por membro)
+        infinitos = np.isinf(X)
+        if infinitos.any():
+            linhas, colunas_inf = np.nonzero(infinitos)
+            nomes = [FEATURES_MODELO[j] for j in np.unique(colunas_inf)]
+            raise ValueError(f"Valor infinito nas features {nomes} em {len(np.unique(linhas))} linha(s) "
+                             f"(a primeira é a {linhas.min()}); verifique qtd_membros = 0 ou valores fora da faixa.")
+
+        desconhecidos = np.isnan(X[:, 1])
+        if desconhecido == "erro" and desconhecidos.any():
+            valores = pd.unique(np.asarray(data['tipo_dominio'])[desconhecidos])
+            raise ValueError(f"Domínio(s) desconhecido(s) pelo encoder: {list(valores)}")
+
+        return X, desconhecidos
+
+
+def prever(model, X, desconhecidos, **kwargs):
+    """Previsões para as linhas válidas; linhas com domínio desconhecido ficam NaN."""
+    predicoes = np.full(len(X), np.nan)
+    if (~desconhecidos).any():
+        predicoes[~desconhecidos] = model.predict(X[~desconhecidos], **kwargs)
+    return predicoes
+
+
+# Faixa da estimativa: quantis das previsões das árvores da floresta
+QUANTIS_INTERVALO = (0.1, 0.5, 0.9)
+COLUNAS_INTERVALO = ["produtividade_p10", "produtividade_p50", "produtividade_p90"]
+
+
+def prever_intervalos(model, X, desconhecidos, quantis=QUANTIS_INTERVALO, **kwargs):
+    """
+    Como `prever`, mais os quantis das árvores por linha (linhas x len(quantis)).
+    Só para a floresta compilada, que tem as previsões individuais das árvores.
+    """
+    predicoes = np.full(len(X), np.nan)
+    intervalos = np.full((len(X), len(quantis)), np.nan)
+    if (~desconhecidos).any():
+        predicoes[~desconhecidos], intervalos[~desconhecidos] = model.predict_intervalos(
+            X[~desconhecidos], quantis, **kwargs
+        )
+    return predicoes, intervalos
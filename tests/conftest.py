@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Os testes importam os módulos do app (scripts_app) e os scripts como o app e os scripts fazem
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # tests/
+sys.path.append(os.path.join(BASE_DIR, "..", "streamlit_app"))
+sys.path.append(os.path.join(BASE_DIR, "..", "scripts"))
@@ -0,0 +1,12 @@
+import pandas as pd
+
+from scripts_app.ciclo_cartoes import datas_criacao
+
+
+def test_datas_criacao_ids_invalidos_viram_nat():
+    ids = ["689142d753d78083d0e88da8", "6891é2d753d78083d0e88da8", "ção", None, "abc", "689142d7çãoção"]
+    datas = datas_criacao(ids)
+
+    esperada = pd.Timestamp("2025-08-04 23:31:35", tz="UTC")
+    assert datas[0] == esperada and datas[5] == esperada
+    assert datas[1:5].isna().all()
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+
+from scripts_app.dados_graficos import histograma
+
+
+def test_histograma_com_muitos_dominios():
+    rng = np.random.default_rng(0)
+    dominios = [f"Domínio {i}" for i in range(12)]
+    df = pd.DataFrame({
+        "produtividade_prevista": rng.uniform(0, 10, 3000),
+        "tipo_dominio": pd.Categorical(rng.choice(dominios, 3000), categories=dominios),
+    })
+
+    resultado = histograma(df, bins=20)
+
+    assert resultado["qtd"].sum() == len(df)
+    assert set(resultado["tipo_dominio"]) == set(dominios)
+    por_dominio = resultado.groupby("tipo_dominio", observed=True)["qtd"].sum()
+    assert por_dominio.to_dict() == df["tipo_dominio"].value_counts().to_dict()
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts_app.dataset_sessao import DatasetSessao
+
+
+def _dataset():
+    return DatasetSessao(pd.DataFrame({
+        "sprint_id": [f"Sprint_{i}" for i in range(6)],
+        "tipo_dominio": ["Saúde", "Educação"] * 3,
+        "qtd_membros": [3, 4, 5, 6, 7, 8],
+        "complexidade_media": [1.5, 2.25, 3.1, 0.7, 2.0, 1.1],
+    }))
+
+
+@pytest.mark.parametrize("alterar", [
+    lambda v: v.loc.__setitem__((0, "complexidade_media"), 99.0),
+    lambda v: v.iloc.__setitem__((1, 2), 77),
+    lambda v: v["complexidade_media"].to_numpy().__setitem__(1, 77.0),
+    lambda v: v.loc.__setitem__((0, "tipo_dominio"), "Educação"),
+])
+def test_alterar_visao_nao_muda_os_dados_guardados(alterar):
+    dataset = _dataset()
+    antes = dataset.visao().copy()
+
+    visao = dataset.visao()
+    try:
+        alterar(visao)
+    except ValueError:
+        pass  # sem Copy-on-Write (pandas 2) os arrays da visão são somente leitura
+
+    pd.testing.assert_frame_equal(dataset.visao(), antes)
+
+
+def test_visao_nao_copia_os_dados():
+    dataset = _dataset()
+    visao = dataset.visao()
+    assert np.shares_memory(visao["complexidade_media"].to_numpy(), dataset.coluna("complexidade_media"))
+    assert visao["tipo_dominio"].dtype == "category"
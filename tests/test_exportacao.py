@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import pytest
+
+from scripts_app import exportacao
+from scripts_app.dataset_sessao import DatasetSessao
+
+
+@pytest.fixture
+def dataset():
+    n = 230
+    dataset = DatasetSessao(pd.DataFrame({
+        "sprint_id": [f"Sprint_{i}" for i in range(n)],
+        "tipo_dominio": ["Saúde", "Educação"] * (n // 2),
+        "qtd_membros": np.arange(n) % 7 + 1,
+    }))
+    dataset.definir_predicoes(np.linspace(0, 1, n))
+    return dataset
+
+
+@pytest.mark.parametrize("formato", list(exportacao.FORMATOS))
+def test_partes_sao_arquivos_completos(dataset, formato, tmp_path):
+    caminhos = exportacao.exportar(dataset, formato, str(tmp_path), tamanho_bloco=40, linhas_por_parte=100)
+
+    assert [os.path.basename(c).split(".")[1] for c in caminhos] == ["parte1de3", "parte2de3", "parte3de3"]
+    if formato == "parquet":
+        partes = [pq.read_table(c).to_pandas() for c in caminhos]
+    else:
+        partes = [pa_csv.read_csv(c).to_pandas() for c in caminhos]
+    assert [len(p) for p in partes] == [100, 100, 30]
+    juntas = pd.concat(partes, ignore_index=True)
+    assert juntas["sprint_id"].tolist() == dataset.visao()["sprint_id"].tolist()
+    np.testing.assert_allclose(juntas["produtividade_prevista"], dataset.predicoes)
+
+    # Pedir de novo só reaproveita os arquivos
+    antes = {c: os.stat(c).st_ino for c in caminhos}
+    assert exportacao.exportar(dataset, formato, str(tmp_path), linhas_por_parte=100) == caminhos
+    assert {c: os.stat(c).st_ino for c in caminhos} == antes
+
+
+def test_uma_parte_mantem_o_nome(dataset, tmp_path):
+    caminhos = exportacao.exportar(dataset, "csv.gz", str(tmp_path))
+    assert [os.path.basename(c) for c in caminhos] == [f"{dataset.versao}_{dataset.versao_predicoes}.csv.gz"]
+
+
+def test_limpar_remove_exportacoes_inteiras_e_tolera_arquivos_apagados(tmp_path, monkeypatch):
+    for i in range(4):
+        for nome in (f"v{i}_p.parte1de2.parquet", f"v{i}_p.parte2de2.parquet"):
+            (tmp_path / nome).write_bytes(b"x")
+            os.utime(tmp_path / nome, (1000 + i, 1000 + i))
+
+    # Outra sessão apaga um arquivo entre o listdir e o getmtime
+    getmtime = os.path.getmtime
+
+    def getmtime_concorrente(caminho):
+        if caminho.endswith("v3_p.parte2de2.parquet"):
+            os.remove(caminho)
+        return getmtime(caminho)
+
+    monkeypatch.setattr(exportacao.os.path, "getmtime", getmtime_concorrente)
+    exportacao._limpar(str(tmp_path), max_arquivos=2)
+
+    assert sorted(os.listdir(tmp_path)) == ["v2_p.parte1de2.parquet", "v2_p.parte2de2.parquet",
+                                            "v3_p.parte1de2.parquet"]
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from scripts_app.floresta_compilada import LINHAS_SKLEARN, FlorestaCompilada
+
+# As folhas ficam em float32 na floresta compilada: a média de centenas delas
+# difere do sklearn (float64) só no arredondamento
+TOLERANCIA = 1e-5
+
+
+@pytest.fixture(scope="module")
+def dados():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 6)).astype(np.float32)
+    X[:, 1] = rng.integers(0, 3, len(X))
+    y = 10 + 3 * X[:, 0] - 2 * X[:, 2] * X[:, 1] + rng.normal(scale=0.5, size=len(X))
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def modelo(dados):
+    X, y = dados
+    return RandomForestRegressor(n_estimators=60, max_depth=8, min_samples_leaf=2, random_state=1).fit(X, y)
+
+
+def _amostra(n, seed=1):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(scale=1.5, size=(n, 6)).astype(np.float32)
+    X[:, 1] = rng.integers(0, 3, n)
+    return X
+
+
+def test_predict_igual_ao_sklearn(modelo):
+    floresta = FlorestaCompilada.compilar(modelo)
+    X = _amostra(500)
+    assert np.abs(floresta.predict(X) - modelo.predict(X)).max() < TOLERANCIA
+
+
+def test_uma_linha_e_blocos_pequenos(modelo):
+    floresta = FlorestaCompilada.compilar(modelo)
+    X = _amostra(37)
+    esperado = modelo.predict(X)
+    assert np.abs(floresta.predict(X[:1]) - esperado[:1]).max() < TOLERANCIA
+    assert np.abs(floresta.predict(X, tamanho_bloco=5, n_jobs=2) - esperado).max() < TOLERANCIA
+
+
+def test_valores_ausentes_seguem_o_sklearn(dados):
+    X, y = dados
+    X = X.copy()
+    X[::7, 0] = np.nan
+    modelo = RandomForestRegressor(n_estimators=30, max_depth=6, random_state=2).fit(X, y)
+    floresta = FlorestaCompilada.compilar(modelo)
+
+    X_teste = _amostra(300, seed=3)
+    X_teste[::5, 0] = np.nan
+    assert np.abs(floresta.predict(X_teste) - modelo.predict(X_teste)).max() < TOLERANCIA
+
+
+def test_arquivo_mmap_da_as_mesmas_previsoes(modelo, tmp_path):
+    floresta = FlorestaCompilada.compilar(modelo)
+    caminho = tmp_path / "modelo.floresta"
+    floresta.salvar(caminho)
+    carregada = FlorestaCompilada.carregar(caminho)
+
+    X = _amostra(200)
+    assert carregada.modelo is None
+    np.testing.assert_array_equal(carregada.predict(X), floresta.predict(X))
+
+
+def test_lotes_grandes_usam_o_sklearn(modelo):
+    floresta = FlorestaCompilada.compilar(modelo)
+    X = _amostra(LINHAS_SKLEARN)
+    np.testing.assert_array_equal(floresta.predict(X, n_jobs=1), modelo.predict(X))
+
+
+def test_intervalos_iguais_aos_quantis_das_arvores(modelo):
+    floresta = FlorestaCompilada.compilar(modelo)
+    X = _amostra(150)
+    media, quantis = floresta.predict_intervalos(X, (0.1, 0.5, 0.9), tamanho_bloco=16)
+
+    arvores = np.stack([arvore.predict(X) for arvore in modelo.estimators_], axis=1)
+    assert np.abs(media - modelo.predict(X)).max() < TOLERANCIA
+    assert np.abs(quantis - np.quantile(arvores, [0.1, 0.5, 0.9], axis=1).T).max() < TOLERANCIA
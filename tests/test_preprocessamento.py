@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from scripts_app.preprocessamento import PipelineFeatures
+
+
+@pytest.fixture
+def pipeline():
+    scaler = StandardScaler().fit(pd.DataFrame({"produtividade_estimada": [10.0, 20.0, 30.0]}))
+    encoder = LabelEncoder().fit(["Educação", "Saúde"])
+    return PipelineFeatures(scaler, encoder)
+
+
+def _entrada(**colunas):
+    entrada = {
+        "produtividade_estimada": [12.0, 25.0, 18.0],
+        "tipo_dominio": ["Saúde", "Educação", "Varejo"],
+        "complexidade_media": [2.0, 3.5, 1.0],
+        "percentual_bugs": [0.1, 0.2, 0.0],
+        "percentual_retrabalho": [0.05, 0.0, 0.1],
+        "cartoes_previstos": [20.0, 35.0, 12.0],
+        "qtd_membros": [4.0, 5.0, 3.0],
+    }
+    entrada.update(colunas)
+    return pd.DataFrame(entrada)
+
+
+def test_dominio_desconhecido_vira_nan(pipeline):
+    X, desconhecidos = pipeline.transform(_entrada())
+    assert desconhecidos.tolist() == [False, False, True]
+    assert np.isfinite(X[~desconhecidos]).all()
+
+
+@pytest.mark.parametrize("colunas", [
+    {"qtd_membros": [4.0, 0.0, 3.0]},
+    {"complexidade_media": [2.0, np.inf, 1.0]},
+])
+def test_valor_infinito_e_recusado(pipeline, colunas):
+    with pytest.raises(ValueError, match="infinito"), np.errstate(divide="ignore"):
+        pipeline.transform(_entrada(**colunas))
@@ -0,0 +1,79 @@
+import json
+from collections import Counter
+
+import pandas as pd
+import pytest
+
+from push_public_trello_board import push_cards_to_trello
+from servidor_trello_local import BOARD_ID, iniciar_servidor
+
+
+@pytest.fixture
+def trello():
+    servidor, estado, base_url = iniciar_servidor()
+    yield estado, base_url
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _df():
+    return pd.DataFrame({
+        "list_name": ["Sprint_1", "Sprint_1", "Sprint_1", "Sprint_2", "Sprint_2", "Concluído"],
+        "card_name": ["Saúde", "Saúde", "Educação", "Saúde", "Finanças", "Teste concluido"],
+        "card_desc": ["a", "b", "c", "d", "e", "f"],
+    })
+
+
+def _cards_no_board(estado):
+    nomes_listas = {lst["id"]: lst["name"] for lst in estado.board["lists"]}
+    return Counter((nomes_listas[card["idList"]], card["name"]) for card in estado.board["cards"])
+
+
+def _push(base_url, df, **kwargs):
+    return push_cards_to_trello(df, BOARD_ID, "key", "token", base_url=base_url, max_workers=4, **kwargs)
+
+
+def test_pula_cards_existentes_e_nao_duplica_ao_rodar_de_novo(trello):
+    estado, base_url = trello
+    antes = len(estado.board["cards"])
+
+    # "Teste concluido" já está na lista Concluído do board
+    assert _push(base_url, _df()) == {"criados": 5, "pulados": 1, "falhas": 0}
+    assert _push(base_url, _df()) == {"criados": 0, "pulados": 6, "falhas": 0}
+
+    cards = _cards_no_board(estado)
+    assert len(estado.board["cards"]) == antes + 5
+    assert cards[("Sprint_1", "Saúde")] == 2
+    assert cards[("Concluído", "Teste concluido")] == 1
+
+
+def test_retoma_do_checkpoint(trello, tmp_path):
+    estado, base_url = trello
+    checkpoint = tmp_path / "push.checkpoint"
+    antes = len(estado.board["cards"])
+
+    _push(base_url, _df().iloc[:3], checkpoint=str(checkpoint))
+    assert _push(base_url, _df(), checkpoint=str(checkpoint)) == {"criados": 2, "pulados": 4, "falhas": 0}
+
+    linhas = [json.loads(linha) for linha in checkpoint.read_text(encoding="utf-8").splitlines()]
+    assert sorted(map(tuple, linhas)) == sorted([
+        (BOARD_ID, "Sprint_1", "Saúde", 0), (BOARD_ID, "Sprint_1", "Saúde", 1),
+        (BOARD_ID, "Sprint_1", "Educação", 0), (BOARD_ID, "Sprint_2", "Saúde", 0),
+        (BOARD_ID, "Sprint_2", "Finanças", 0),
+    ])
+    assert len(estado.board["cards"]) == antes + 5
+
+
+def test_5xx_depois_de_criar_nao_duplica(trello, tmp_path):
+    estado, base_url = trello
+    checkpoint = tmp_path / "push.checkpoint"
+    antes = len(estado.board["cards"])
+
+    # Os 3 primeiros POST /cards criam o card e respondem 500
+    estado.falhas_apos_criar = 3
+    assert _push(base_url, _df(), checkpoint=str(checkpoint)) == {"criados": 5, "pulados": 1, "falhas": 0}
+
+    assert estado.falhas_apos_criar == 0
+    assert len(estado.board["cards"]) == antes + 5
+    assert max(_cards_no_board(estado).values()) == 2  # só as duas ocorrências de Saúde em Sprint_1
+    assert len(checkpoint.read_text(encoding="utf-8").splitlines()) == 5
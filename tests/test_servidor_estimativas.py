@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from servidor_estimativas import validar_entrada
+
+
+def _entrada(**colunas):
+    entrada = {
+        "produtividade_estimada": [12.0, 25.0],
+        "tipo_dominio": ["Saúde", "Educação"],
+        "complexidade_media": [2.0, 3.5],
+        "percentual_bugs": [0.1, 0.2],
+        "percentual_retrabalho": [0.05, 0.0],
+        "cartoes_previstos": [20, 35],
+        "qtd_membros": ["4", 5],
+    }
+    entrada.update(colunas)
+    return pd.DataFrame(entrada)
+
+
+def test_numeros_viram_float64():
+    dados = validar_entrada(_entrada())
+    assert dados["qtd_membros"].tolist() == [4.0, 5.0]
+    assert dados["cartoes_previstos"].dtype == np.float64
+
+
+@pytest.mark.parametrize("colunas, mensagem", [
+    ({"qtd_membros": [4, 0]}, "maior que zero"),
+    ({"qtd_membros": [-2, 5]}, "maior que zero"),
+    ({"complexidade_media": [2.0, np.inf]}, "infinito"),
+    ({"cartoes_previstos": [20, "x"]}, "não numérico"),
+])
+def test_entrada_invalida_gera_value_error(colunas, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        validar_entrada(_entrada(**colunas))
@@ -0,0 +1,114 @@
+import random
+import time
+
+import pandas as pd
+import pytest
+import requests
+
+import extrair_cartoes_por_lista
+from servidor_trello_local import BOARD_ID, iniciar_servidor
+from trello_client import ClienteTrello, LimitadorTaxa
+
+
+@pytest.fixture
+def servidor():
+    iniciados = []
+
+    def iniciar(**kwargs):
+        servidor, estado, base_url = iniciar_servidor(**kwargs)
+        iniciados.append(servidor)
+        return estado, base_url
+
+    yield iniciar
+    for servidor in iniciados:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+@pytest.fixture
+def esperas(monkeypatch):
+    """Registra as esperas do cliente (backoff e Retry-After) sem deixar de esperar."""
+    registradas = []
+    dormir = time.sleep
+
+    def registrar(segundos):
+        registradas.append(segundos)
+        dormir(segundos)
+
+    monkeypatch.setattr("trello_client.time.sleep", registrar)
+    return registradas
+
+
+def test_429_e_refeito_ate_dar_certo(servidor, esperas):
+    random.seed(3)
+    estado, base_url = servidor(taxa_429=0.5)
+    cliente = ClienteTrello("key", "token", base_url=base_url, tentativas=30)
+    try:
+        for _ in range(20):
+            assert cliente.get(f"boards/{BOARD_ID}")["id"] == BOARD_ID
+    finally:
+        cliente.close()
+
+    assert estado.respostas_429 > 0
+    assert estado.requisicoes == 20 + estado.respostas_429
+    # Cada 429 espera o Retry-After do servidor antes da nova tentativa
+    assert esperas.count(0.05) == estado.respostas_429
+
+
+def test_429_desiste_depois_das_tentativas(servidor, esperas):
+    estado, base_url = servidor(taxa_429=1.0)
+    cliente = ClienteTrello("key", "token", base_url=base_url, tentativas=3)
+    try:
+        with pytest.raises(requests.exceptions.HTTPError) as erro:
+            cliente.get(f"boards/{BOARD_ID}")
+    finally:
+        cliente.close()
+
+    assert erro.value.response.status_code == 429
+    assert estado.requisicoes == 3
+    assert esperas == [0.05, 0.05]
+
+
+def test_backoff_exponencial_sem_resposta(esperas):
+    # Porta fechada: erro de conexão, esperas de backoff * 2**tentativa
+    cliente = ClienteTrello("key", "token", base_url="http://127.0.0.1:9/1", tentativas=4, backoff=0.01,
+                            limitador=LimitadorTaxa(capacidade=10, taxa=1000))
+    try:
+        with pytest.raises(requests.exceptions.ConnectionError):
+            cliente.get(f"boards/{BOARD_ID}")
+    finally:
+        cliente.close()
+
+    assert esperas == [0.01, 0.02, 0.04]
+
+
+def test_get_varios_agrupa_em_batch_na_ordem(servidor):
+    estado, base_url = servidor(multiplicar=10)
+    cliente = ClienteTrello("key", "token", base_url=base_url)
+    ids = [card["id"] for card in estado.board["cards"]][:25]
+    try:
+        cards = cliente.get_varios([(f"cards/{card_id}", {}) for card_id in ids])
+    finally:
+        cliente.close()
+
+    assert [card["id"] for card in cards] == ids
+    assert estado.requisicoes == 3  # 25 GETs em lotes de até 10
+
+
+def test_comentarios_paginados_com_before(servidor, monkeypatch, tmp_path):
+    estado, base_url = servidor(comentarios=250)
+    monkeypatch.setattr(extrair_cartoes_por_lista, "LIMITE_PAGINA_COMENTARIOS", 60)
+    monkeypatch.setenv("BOARD_ID", BOARD_ID)
+    monkeypatch.setenv("TRELLO_KEY", "key")
+    monkeypatch.setenv("TRELLO_TOKEN", "token")
+    monkeypatch.chdir(tmp_path)
+
+    cards = extrair_cartoes_por_lista.get_trello_cards("", base_url=base_url, store_path=None)
+    comentarios = pd.read_csv(tmp_path / "comentarios_por_cartao.csv", encoding="utf-8-sig")
+
+    # 100 comentários junto com o card e o resto em páginas de 60 (60, 60, 30)
+    assert cards["qtd_comentarios"].tolist() == [250] * len(estado.board["cards"])
+    assert len(comentarios) == 250 * len(estado.board["cards"])
+    assert comentarios["comment_id"].is_unique
+    esperados = {a["id"] for a in estado.board["actions"] if a["type"] == "commentCard"}
+    assert set(comentarios["comment_id"]) == esperados
@@ -0,0 +1,116 @@
+import pytest
+
+from servidor_trello_local import BOARD_ID, iniciar_servidor
+from trello_client import ClienteTrello
+from trello_store import conectar, ler_cartoes, sincronizar_board
+
+
+@pytest.fixture
+def trello():
+    servidor, estado, base_url = iniciar_servidor(comentarios=2)
+    cliente = ClienteTrello("key", "token", base_url=base_url)
+    yield estado, cliente
+    cliente.close()
+    servidor.shutdown()
+    servidor.server_close()
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = conectar(str(tmp_path / "trello.sqlite"))
+    yield conn
+    conn.close()
+
+
+def _comentarios(conn):
+    return dict(conn.execute("SELECT id, text FROM comments").fetchall())
+
+
+def test_delta_sem_mudancas_nao_busca_cards(trello, conn):
+    estado, cliente = trello
+    assert sincronizar_board(conn, cliente, BOARD_ID)["modo"] == "completa"
+
+    resumo = sincronizar_board(conn, cliente, BOARD_ID)
+    assert resumo == {"modo": "delta", "acoes": 0, "cards": 0, "removidos": 0}
+    assert len(ler_cartoes(conn, BOARD_ID)) == len(estado.board["cards"])
+
+
+def test_primeira_sync_baixa_so_comentarios_do_historico(trello, conn, monkeypatch):
+    estado, cliente = trello
+    estado.registrar_acao("updateCard", estado.board["cards"][0])
+    pedidos = []
+    get = cliente.get
+
+    def registrar(caminho, **params):
+        pedidos.append((caminho, params))
+        return get(caminho, **params)
+
+    monkeypatch.setattr(cliente, "get", registrar)
+
+    resumo = sincronizar_board(conn, cliente, BOARD_ID)
+
+    acoes = [params for caminho, params in pedidos if caminho.endswith("/actions")]
+    assert acoes == [{"limit": 1}, {"limit": 1000, "filter": "commentCard"}]
+    assert resumo["acoes"] == sum(a["type"] == "commentCard" for a in estado.board["actions"])
+    ultima = conn.execute("SELECT ultima_acao FROM sync_state WHERE board_id = ?", (BOARD_ID,)).fetchone()[0]
+    assert ultima == estado.board["actions"][0]["id"]
+    assert len(_comentarios(conn)) == resumo["acoes"]
+
+
+def test_comentarios_editados_e_apagados(trello, conn):
+    estado, cliente = trello
+    sincronizar_board(conn, cliente, BOARD_ID)
+    editado, apagado = [a for a in estado.board["actions"] if a["type"] == "commentCard"][:2]
+    card = next(c for c in estado.board["cards"] if c["id"] == editado["data"]["card"]["id"])
+
+    novo = estado.registrar_acao("commentCard", card, text="Comentário novo")
+    estado.registrar_acao("updateComment", card, action={"id": editado["id"], "text": "Texto editado"})
+    estado.registrar_acao("deleteComment", card, action={"id": apagado["id"]})
+    estado.registrar_acao("updateComment", card, action={"id": novo["id"], "text": "Novo editado"})
+    sincronizar_board(conn, cliente, BOARD_ID)
+
+    comentarios = _comentarios(conn)
+    assert comentarios[editado["id"]] == "Texto editado"
+    assert comentarios[novo["id"]] == "Novo editado"
+    assert apagado["id"] not in comentarios
+
+
+def test_etiqueta_renomeada_chega_aos_cards(trello, conn):
+    estado, cliente = trello
+    sincronizar_board(conn, cliente, BOARD_ID)
+    etiqueta = estado.board["cards"][0]["labels"][0]
+
+    etiqueta["name"] = "Defeitos"
+    estado.board["actions"].insert(0, {
+        "id": estado.novo_id(), "type": "updateLabel", "date": "2030-01-01T00:00:00.000Z",
+        "data": {"label": {"id": etiqueta["id"], "name": "Defeitos"}, "old": {"name": "Bugs"}},
+        "memberCreator": {"fullName": "agile_estimator"},
+    })
+    resumo = sincronizar_board(conn, cliente, BOARD_ID)
+
+    assert resumo["cards"] == len(estado.board["cards"])
+    assert set(ler_cartoes(conn, BOARD_ID)["card_labels"]) == {"Defeitos"}
+
+
+def test_card_movido_ou_404_sai_da_base(trello, conn):
+    estado, cliente = trello
+    sincronizar_board(conn, cliente, BOARD_ID)
+    movido, sumido, alterado = estado.board["cards"][:3]
+
+    # Movido para outro board: a action fica no board de origem e o card responde com o novo idBoard
+    movido["idBoard"] = "6891356a0000000000000000"
+    estado.registrar_acao("moveCardFromBoard", movido)
+    # Apagado depois da action que o tocou: a busca responde 404
+    estado.registrar_acao("updateCard", sumido)
+    estado.board["cards"].remove(sumido)
+    alterado["name"] = "Renomeado"
+    estado.registrar_acao("updateCard", alterado)
+
+    resumo = sincronizar_board(conn, cliente, BOARD_ID)
+    cards = ler_cartoes(conn, BOARD_ID)
+
+    assert resumo["removidos"] == 2
+    assert set(cards["card_id"]) == {alterado["id"]}
+    assert cards["card_name"].tolist() == ["Renomeado"]
+    assert conn.execute("SELECT COUNT(*) FROM comments WHERE card_id IN (?, ?)",
+                        (movido["id"], sumido["id"])).fetchone()[0] == 0